@@ -10,6 +10,7 @@ from model import config_constants
 from contextlib import asynccontextmanager
 from dotenv import load_dotenv
 import os
+import time
 
 
 @asynccontextmanager
@@ -55,8 +56,11 @@ async def node_usage_prediction(request: Request):
 
 
 def load_models():
-    for metric in config_constants.METRICS:
-        model_proxy.create_model(metric)
+    start = time.perf_counter()
+    load_times = model_proxy.create_models(config_constants.METRICS)
+    print("Models loaded in {:.3f} s".format(time.perf_counter() - start))
+    for metric, load_time in load_times.items():
+        print("  {}: {:.3f} s".format(metric, load_time))
 
 
 if __name__ == "__main__":
@@ -11,3 +11,4 @@ CPU_USAGE_METRIC = "cpu_usage_node"
 RAM_USAGE_METRIC = "ram_usage_node"
 POWER_USAGE_METRIC = "power_usage_node"
 METRICS = [CPU_USAGE_METRIC, RAM_USAGE_METRIC, POWER_USAGE_METRIC]
+MODELS_LOAD_WORKERS = 4
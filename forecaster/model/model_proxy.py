@@ -5,11 +5,14 @@
 
 from model.model import Model
 from model import config_constants
+from concurrent.futures import ThreadPoolExecutor
+import time
 import pandas as pd
 
 
 class ModelProxy:
-    _models = []
+    # Models indexed by (metric, model type)
+    _models = {}
 
     def __init__(self, model_type):
         self._model_type = model_type
@@ -19,7 +22,19 @@ class ModelProxy:
 
     def create_model(self, metric):
         model = Model(metric, self._model_type)
-        self._models.append(model)
+        self._models[(metric, self._model_type)] = model
+
+    def create_models(self, metrics, workers=config_constants.MODELS_LOAD_WORKERS):
+        """
+        Load the models of the metrics in parallel, returning the load time of each one.
+        """
+        def load(metric):
+            start = time.perf_counter()
+            self.create_model(metric)
+            return time.perf_counter() - start
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return dict(zip(metrics, executor.map(load, metrics)))
 
     def get_predictions(self, input_data, metric, to_json=False):
         input_data_df = self._json_to_df_input_data(input_data)
@@ -41,10 +56,10 @@ class ModelProxy:
         return predictions_json
 
     def _get_model(self, metric):
-        for model in self._models:
-            if model.metric == metric and model.model_type == self._model_type:
-                return model
-        raise Exception("Requested model not found.")
+        model = self._models.get((metric, self._model_type))
+        if model is None:
+            raise Exception("Requested model not found.")
+        return model
 
     def _json_to_df_input_data(self, input_data):
         input_data_df = pd.json_normalize(input_data)
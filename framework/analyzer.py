@@ -11,15 +11,37 @@ import matplotlib.pyplot as plt
 from configuration.config_manager import ConfigManager
 from model.model_proxy import ModelProxy
 from utils.utils import flatten
-import json
+from utils.results_file import load_results_file
+from utils.compact_instance import load_instance
 from cli.cli import get_analyzer_and_simulator_args
 
 config_manager = ConfigManager()
 model_manager = ModelProxy()
 
+def build_groups_matrix():
+    """
+    Build the membership matrix of the functions (rows) in the groups (columns),
+    used to transform the rates of the functions in the rates of the groups
+    """
+    groups_matrix = np.zeros((len(config_manager.FUNCTION_NAMES), len(config_manager.GROUPS)), dtype=np.int64)
+    for g, functions in enumerate(config_manager.GROUPS.values()):
+        for f, func in enumerate(config_manager.FUNCTION_NAMES):
+            if func in functions:
+                groups_matrix[f, g] = 1
+    return groups_matrix
+
+groups_matrix = build_groups_matrix()
+
 def calculate_rates_globally(function_rate_x_node, df_presence, config_file, strategy_name):
-    # It contains the number of requests rejected in this instant for each function
-    func_reject_num = {}
+    """
+    Calculate success rate, reject rate and number of rejected requests of each function,
+    mean and max power consumption and number of overloaded nodes of an instant
+    The requests are discarded from all the nodes at the same time: at each step the nodes that
+    are still overloaded remove a percentage of their load and are predicted again with a single batch
+    """
+    nodes = df_presence.index
+    presence = df_presence[config_manager.FUNCTION_NAMES].to_numpy()
+    rates = function_rate_x_node.loc[nodes, config_manager.FUNCTION_NAMES].to_numpy(dtype=np.int64)
 
     # It contains the success rate of this instant for each function
     success_rate = {}
@@ -28,83 +50,73 @@ def calculate_rates_globally(function_rate_x_node, df_presence, config_file, str
     reject_rate = {}
 
     # Reject the requests of the functions that are not deployed in the node
-    for f in config_manager.FUNCTION_NAMES:
-        func_reject_num[f] = 0
-        for index, row in df_presence.iterrows():
-            if df_presence.loc[index, f] == 0:
-                func_reject_num[f] += function_rate_x_node.loc[index, f]
+    rejected_requests = (rates * (presence == 0)).sum(axis=0)
+
+    # Reset the rate of the functions that are not deployed on the nodes
+    rate_only_present_functions = rates * presence
+
+    # Node type of each node, used as feature and to check the max power usage
+    nodes_types = [config_file[index]["node_type"] for index in nodes]
+    nodes_types_in_models = np.array([config_manager.NODES_TYPES_IN_MODELS[node_type] for node_type in nodes_types])
+    max_power_usage = np.array([config_manager.MAX_POWER_USAGE[node_type] for node_type in nodes_types])
+
+    def predict_nodes(nodes_rows):
+        # Features of the nodes, in group format, used to predict all of them with a single batch
+        features_matrix = np.zeros((len(nodes_rows), len(config_manager.GROUPS) + 1))
+        features_matrix[:, :-1] = rate_only_present_functions[nodes_rows] @ groups_matrix
+        features_matrix[:, -1] = nodes_types_in_models[nodes_rows]
+        predictions = model_manager.get_node_predictions_batch(features_matrix)
+        return predictions["power_usage_node"], predictions["overloaded_node"]
+
+    nodes_rows = np.arange(0, len(nodes))
+    node_power_consumption, overload = predict_nodes(nodes_rows)
+    node_power_consumption = node_power_consumption.copy()
+    overload = overload.copy()
 
-    # Average consumption of the node in the current istant
-    node_avg_power_consumption = 0
-    # Max consumption of the nodes in the current istant
-    max_power_consumption = 0
     # Overloaded nodes counter
-    overloaded_nodes = 0
-    
-    # Iterate over all the node
-    for index, row in df_presence.iterrows():
-        # Reset the rate of the functions that are not deployed on the node
-        rate_only_present_functions = function_rate_x_node.loc[index] * df_presence.loc[index]
-        # Obtains data in group format
-        features_data = model_manager.transform_functions_in_groups(rate_only_present_functions)
-
-        # Add the information about the node type
-        node_type = config_file[index]["node_type"]
-        features_data["node_type"] = config_manager.NODES_TYPES_IN_MODELS[node_type]
-
-        node_predictions = model_manager.get_node_predictions(features_data)
-        node_power_consumption = node_predictions["power_usage_node"].iloc[0]
-        overload = node_predictions["overloaded_node"].iloc[0]
-
-        if overload == 1:
-            overloaded_nodes += 1
-
-        # Percentage of load to discard
-        load_discard_percentage = 0.05
-        while overload == 1 or (strategy_name == "power_saving_strategy" and node_power_consumption > config_manager.MAX_POWER_USAGE[node_type]) :
-            # Calculate the the percentage value for each element
-            percentage_values = [round(element * load_discard_percentage) for element in rate_only_present_functions]
-
-            # If all calculated values are 0, then increment the percentage 
-            while all(value == 0 for value in percentage_values):
-                load_discard_percentage += 0.01
-                
-                # Calculate the new values
-                percentage_values = [round(element * load_discard_percentage) for element in rate_only_present_functions]                
-
-            # Remove a percentage of the requests for each function > 0 
-            for i in range(0, len(rate_only_present_functions)):
-                if rate_only_present_functions[i] > 0:
-                    # Calculate the rate to remove for the selected function
-                    rate_to_remove = percentage_values[i]
-                    
-                    # Remove the rate of the function from the node
-                    rate_only_present_functions[i] -= rate_to_remove
-
-                    # Count the removed rate in the total reject req
-                    func_reject_num[rate_only_present_functions.index[i]] += rate_to_remove
-            
-            # Return features data in the correct from to be predicted
-            features_data = model_manager.transform_functions_in_groups(rate_only_present_functions)
- 
-            # Add the information about the node type
-            features_data["node_type"] = config_manager.NODES_TYPES_IN_MODELS[config_file[index]["node_type"]]
-            
-            node_predictions = model_manager.get_node_predictions(features_data)
-
-            node_power_consumption = node_predictions["power_usage_node"].iloc[0]
-            overload = node_predictions["overloaded_node"].iloc[0]
-
-        if node_power_consumption > max_power_consumption:
-            max_power_consumption = node_power_consumption
-        
-        # Add the node consumption to the total
-        node_avg_power_consumption += node_power_consumption
-
-
-    # Get the average consumption for node
+    overloaded_nodes = int(np.sum(overload == 1))
+
+    def must_discard(rows):
+        return (overload[rows] == 1) | ((strategy_name == "power_saving_strategy") & (node_power_consumption[rows] > max_power_usage[rows]))
+
+    # Percentage of load to discard of each node
+    load_discard_percentage = np.full(len(nodes), 0.05)
+    discarding_rows = nodes_rows[must_discard(nodes_rows)]
+    while len(discarding_rows) > 0:
+        # Calculate the the percentage value for each element
+        percentage_values = np.round(rate_only_present_functions[discarding_rows] * load_discard_percentage[discarding_rows, None]).astype(np.int64)
+
+        # If all calculated values of a node are 0, then increment its percentage
+        all_zero = np.all(percentage_values == 0, axis=1)
+        while np.any(all_zero):
+            load_discard_percentage[discarding_rows[all_zero]] += 0.01
+
+            # Calculate the new values
+            percentage_values[all_zero] = np.round(rate_only_present_functions[discarding_rows[all_zero]] *
+                                                   load_discard_percentage[discarding_rows[all_zero], None]).astype(np.int64)
+            all_zero = np.all(percentage_values == 0, axis=1)
+
+        # Remove a percentage of the requests for each function > 0, counting them in the total reject req
+        percentage_values *= rate_only_present_functions[discarding_rows] > 0
+        rate_only_present_functions[discarding_rows] -= percentage_values
+        rejected_requests += percentage_values.sum(axis=0)
+
+        # Predict again only the nodes that discarded requests
+        node_power_consumption[discarding_rows], overload[discarding_rows] = predict_nodes(discarding_rows)
+        discarding_rows = discarding_rows[must_discard(discarding_rows)]
+
+    # Max consumption of the nodes in the current istant
+    max_power_consumption = max(0, np.max(node_power_consumption))
+
+    # Average consumption of the node in the current istant, added in the order of the nodes
+    node_avg_power_consumption = 0
+    for power_consumption in node_power_consumption:
+        node_avg_power_consumption += power_consumption
     node_avg_power_consumption /= len(df_presence)
-    
+
+    # It contains the number of requests rejected in this instant for each function
+    func_reject_num = dict(zip(config_manager.FUNCTION_NAMES, rejected_requests))
+
     # Calculate the success and the reject rate for each function
     total_invoc_rate_x_function = function_rate_x_node.sum(axis = 0)
     for func in func_reject_num:
@@ -134,6 +146,7 @@ def export_for_minute_overloaded_nodes(overloaded_for_algo):
     plt.grid()
     
     plt.savefig(create_path_if_not_exists(config_manager.ANALYZER_OUTPUT_PATH).joinpath("comparison_nodes.png"))
+    plt.close()
 
 
 def export_for_minute_rates(func, rates):
@@ -164,6 +177,7 @@ def export_for_minute_rates(func, rates):
     plt.grid()
     
     plt.savefig(create_path_if_not_exists(config_manager.ANALYZER_OUTPUT_PATH).joinpath("comparison_{}.png".format(func)))
+    plt.close()
 
 
 def export_index_comparison_table(df):
@@ -178,18 +192,10 @@ def create_path_if_not_exists(path):
         os.makedirs(path)
     return path
 
-def main():
-    kargs = get_analyzer_and_simulator_args()
-    model_manager.set_model_type(kargs["modeltype"])
-    rates_for_algo = {}
-    overloaded_for_algo = {}
-    index_comparison = pd.DataFrame(index=config_manager.INDEX_TO_COMPARE)
-
-    # Read the instance file
-    instance_file = config_manager.OUTPUT_INSTANCE_JSON_FILE_PATH
-    with open(instance_file) as f:
-        config_file = json.load(f)
-
+def build_presence_table(config_file):
+    """
+    Build the table of the functions (columns) deployed on each node (rows)
+    """
     # Initialize DataFrame
     df_presence = pd.DataFrame(0, index=config_manager.FUNCTION_NAMES, columns=[])
 
@@ -203,185 +209,291 @@ def main():
             ]
             df_presence[node_key] = df_presence.index.isin(node_functions).astype(int)
 
-    df_presence = df_presence.sort_index(axis=1).T
+    return df_presence.sort_index(axis=1).T
 
-    # Used only for initialization
-    for func in config_manager.FUNCTION_NAMES:
-        rates_for_algo[func] = {}
+class StreamingAnalyzer:
+    """
+    Analyzer that accumulates the statistics of each strategy minute by minute,
+    so that the simulation can pass the forwarding tables as soon as they are produced
+    """
 
-    # For each strategy type, for each minute and for each function read data exported
-    # by the simulation and use them to calculate rates and indexes for comparison
-    for algo in config_manager.STRATEGIES:
-        x_func_success_rate = {}
-        x_func_reject_rate = {}
-        x_func_reject_num = {}
-        x_node_power_consumption = []
-        x_node_max_power_consumption = []
-        x_overloaded_nodes_counter = []
-
-        # Initialize dictionary of rates for all functions
+    def __init__(self, config_file, model_type, strategies=None):
+        ModelProxy.preload_models([model_type])
+        model_manager.set_model_type(model_type)
+        self._config_file = config_file
+        self.strategies = strategies if strategies is not None else config_manager.STRATEGIES
+
+        # Keys of the nodes, in the order of the forwarding tensors
+        self._nodes_keys = [config_manager.NODE_KEY_PREFIX + str(i) for i in range(0, config_file["nodes_number"])]
+        self._df_presence = build_presence_table(config_file)
+
+        # Statistics of each strategy, with a value for each minute
+        self._x_func_success_rate = {}
+        self._x_func_reject_rate = {}
+        self._x_func_reject_num = {}
+        self._x_node_power_consumption = {}
+        self._x_node_max_power_consumption = {}
+        self._x_overloaded_nodes_counter = {}
+        for algo in self.strategies:
+            self._x_func_success_rate[algo] = {func: [] for func in config_manager.FUNCTION_NAMES}
+            self._x_func_reject_rate[algo] = {func: [] for func in config_manager.FUNCTION_NAMES}
+            self._x_func_reject_num[algo] = {func: [] for func in config_manager.FUNCTION_NAMES}
+            self._x_node_power_consumption[algo] = []
+            self._x_node_max_power_consumption[algo] = []
+            self._x_overloaded_nodes_counter[algo] = []
+
+    def add_minute(self, strategy, minute, fwd_requests):
+        """
+        Hook called at the end of each minute with the forwarding matrices of a strategy,
+        one for each function indexed by (node from, node to), either sparse or dense
+        """
+        # Requests received by each node are the sums over the nodes that forward them
+        received_requests = [np.asarray(fwd_matrix.sum(axis=0)).ravel() for fwd_matrix in fwd_requests]
+        function_rate_x_node = pd.DataFrame(np.column_stack(received_requests), index=self._nodes_keys,
+                                            columns=config_manager.FUNCTION_NAMES)
+        self.add_minute_rates(strategy, minute, function_rate_x_node)
+
+    def add_minute_rates(self, strategy, minute, function_rate_x_node):
+        """
+        Update the statistics of a strategy with the table of the rates of each function
+        that each node has after the exchanges. Minutes must be added in order
+        """
+        print("ALGO {} - MINUTE {}".format(strategy, minute))
+        print(">>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>")
+
+        sr, rr, rn, an, mc, on = calculate_rates_globally(function_rate_x_node, self._df_presence, self._config_file, strategy)
+        self._x_node_power_consumption[strategy].append(an)
+        self._x_node_max_power_consumption[strategy].append(mc)
+        self._x_overloaded_nodes_counter[strategy].append(on)
+
+        for func in sr:
+            self._x_func_success_rate[strategy][func].append(sr[func])
+            self._x_func_reject_rate[strategy][func].append(rr[func])
+            self._x_func_reject_num[strategy][func].append(rn[func])
+
+        print("<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<")
+
+    def get_rates_for_algo(self):
+        """
+        Success rates of each minute, for each function and strategy
+        """
+        return {func: {algo: self._x_func_success_rate[algo][func] for algo in self.strategies}
+                for func in config_manager.FUNCTION_NAMES}
+
+    def get_overloaded_for_algo(self):
+        """
+        Number of overloaded nodes of each minute, for each strategy
+        """
+        return {algo: self._x_overloaded_nodes_counter[algo] for algo in self.strategies}
+
+    def get_index_comparison(self):
+        """
+        Calculate the indexes used to compare the strategies from the accumulated statistics
+        Returns the index comparison table
+        """
+        index_comparison = pd.DataFrame(index=config_manager.INDEX_TO_COMPARE)
+
+        for algo in self.strategies:
+            x_func_success_rate = self._x_func_success_rate[algo]
+            x_func_reject_num = self._x_func_reject_num[algo]
+            x_node_power_consumption = self._x_node_power_consumption[algo]
+            x_node_max_power_consumption = self._x_node_max_power_consumption[algo]
+
+            print("STATS FOR ALGO {}".format(algo))
+            # Metrics prints
+
+            ##### SUCCESS RATES METRICS #####
+            # Mean success rate
+            mean_success_rate = np.mean([np.mean(srates) for k, srates in x_func_success_rate.items()]) * 100
+            print("     > Mean success rate: {:0.2f}%".format(
+                mean_success_rate
+            ))
+
+            # Mean node consumption
+            mean_node_consumption = sum(x_node_power_consumption) / len(x_node_power_consumption)        
+            print("     > Mean node power consumption: {:0.2f}%".format(
+                mean_node_consumption
+            ))
+
+            # Max node consumption
+            max_node_consumption = max(x_node_max_power_consumption)    
+            print("     > Max node power consumption: {:0.2f}%".format(
+                max_node_consumption
+            ))
+
+            # Success rate variance
+            # flat_list = [i * 100 for i in flatten(list(x_func_success_rate.values()))]
+            # success_rate_variance = np.var(flat_list)
+            # print("     > Success rate variance: {:0.2f}".format(success_rate_variance))
+
+            # Success rate median
+            flat_list = flatten(list(x_func_success_rate.values()))
+            success_rate_median = np.median(flat_list) * 100
+            print("     > Success rate median: {:0.2f}%".format(success_rate_median))
+
+            # Success rate percentile
+            # flat_list = flatten(list(x_func_success_rate.values()))
+            # success_rate_percentile = np.percentile(flat_list, config_manager.ANALYSIS_PERCENTILE) * 100
+            # print("     > Success rate {}% percentile: {:0.2f}%".format(
+            #         config_manager.ANALYSIS_PERCENTILE,
+            #         success_rate_percentile
+            #     )
+            # )
+
+            ##### SUCCESS RATES (STRESS PERIOD) METRICS #####
+            # Mean success rate calculated during high traffic period
+            mid_instant = math.floor(config_manager.SIMULATION_MINUTES / 2)
+            low = mid_instant - 1
+            high = mid_instant + 1
+            mean_success_rate_stress_period = np.mean([np.mean(srates[low:high]) for k, srates in x_func_success_rate.items()]) * 100
+            print("         > Mean success rate during stress period: {:0.2f}%".format(
+                mean_success_rate_stress_period
+            ))
+
+            # Success rate variance (stress period)
+            # flat_list = [i * 100 for i in flatten([item[1:6] for item in list(x_func_success_rate.values())])]
+            # success_rate_stress_period_variance = np.var(flat_list)
+            # print("         > Success rate variance during stress period (from minute 1 to 5): {:0.2f}"
+            #     .format(success_rate_stress_period_variance))
+
+            # Success rate median (stress period)
+            flat_list = flatten([item[low:high] for item in list(x_func_success_rate.values())])
+            success_rate_stress_period_median = np.median(flat_list) * 100
+            print("         > Success rate median during stress period: {:0.2f}%"
+                .format(success_rate_stress_period_median))
+
+            # Success rate percentile (stress period)
+            # flat_list = flatten([item[1:6] for item in list(x_func_success_rate.values())])
+            # success_rate_stress_period_percentile = np.percentile(flat_list, config_manager.ANALYSIS_PERCENTILE) * 100
+            # print("         > Success rate {}% percentile during stress period (from minute 1 to 5): {:0.2f}%"
+            #     .format(
+            #         config_manager.ANALYSIS_PERCENTILE,
+            #         success_rate_stress_period_percentile
+            #     )
+            # )
+
+            ##### REJECT RATES METRICS #####
+            # Total rejected requests num calculated for each algorithm across minutes
+            total_reject_requests = np.sum([np.sum(rejnums) for k, rejnums in x_func_reject_num.items()])
+            print("     > Total rejected requests: {} req".format(
+                total_reject_requests
+            ))
+
+            # Reject number variance
+            # flat_list = flatten(list(x_func_reject_num.values()))
+            # reject_number_variance = np.var(flat_list)
+            # print("     > Reject num variance: {:0.2f}".format(reject_number_variance))
+
+            # Reject number median
+            # flat_list = flatten(list(x_func_reject_num.values()))
+            # reject_number_median = np.median(flat_list)
+            # print("     > Reject num median: {:0.2f}".format(reject_number_median))
+
+            # Reject number percentile
+            # flat_list = flatten(list(x_func_reject_num.values()))
+            # reject_number_percentile = np.percentile(flat_list, config_manager.ANALYSIS_PERCENTILE)
+            # print("     > Reject num {}% percentile: {:0.2f}".format(
+            #         config_manager.ANALYSIS_PERCENTILE,
+            #         reject_number_percentile
+            #     )
+            # )
+
+            print("----------------------------------------------------------------------------")
+
+            index_comparison[algo] = [
+                mean_success_rate,
+                success_rate_median,
+                mean_success_rate_stress_period,
+                success_rate_stress_period_median,
+                mean_node_consumption,
+                max_node_consumption,
+                total_reject_requests
+            ]
+
+        return index_comparison.T
+
+def complete_analysis(streaming_analyzer, export=True):
+    """
+    Calculate the index comparison table from a streaming analyzer that received all
+    the minutes of the simulation, and export plots and table
+    :param: export allow to export plots and index comparison table
+    Returns the index comparison table
+    """
+    index_comparison = streaming_analyzer.get_index_comparison()
+
+    if export:
+        # Export print for comparison
+        rates_for_algo = streaming_analyzer.get_rates_for_algo()
         for func in config_manager.FUNCTION_NAMES:
-            x_func_success_rate[func] = []
-            x_func_reject_rate[func] = []
-            x_func_reject_num[func] = []
+            export_for_minute_rates(func, rates_for_algo[func])
+
+        # Creates plot of overloaded nodes
+        export_for_minute_overloaded_nodes(streaming_analyzer.get_overloaded_for_algo())
+
+    # Export index comparison table
+    print("> INDEX COMPARISON TABLE")
+    print(index_comparison)
+    if export:
+        export_index_comparison_table(index_comparison)
+
+    print("> PREDICTIONS CACHE STATS: {}".format(ModelProxy.get_cache_stats()))
 
-        print("-------------------------- ALGO {} --------------------------".format(algo))
+    return index_comparison
 
+def analyze(config_file, model_type, fwd_tables=None, export=True, strategies=None):
+    """
+    Analyze the forwarding tables produced by the simulation of an instance and
+    calculate the indexes used to compare the strategies
+    :param: config_file is the instance dictionary
+    :param: fwd_tables are the forwarding matrices returned by the simulation, indexed by strategy and minute.
+            If not passed, the tables exported by the simulation are read from disk
+    :param: export allow to export plots and index comparison table
+    :param: strategies are the strategies to analyze (all the strategies by default)
+    Returns the index comparison table
+    """
+    streaming_analyzer = StreamingAnalyzer(config_file, model_type, strategies)
+
+    # For each strategy type, for each minute and for each function read data exported
+    # by the simulation and use them to calculate rates and indexes for comparison
+    for algo in streaming_analyzer.strategies:
         # Create path for recover tables        
         base_path = config_manager.SIMULATION_TABLES_OUTPUT_PATH.joinpath(algo)
 
         for minute in range(0, config_manager.SIMULATION_MINUTES):
-            print("MINUTE {}".format(minute))
-            print(">>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>")
+            if fwd_tables is not None:
+                streaming_analyzer.add_minute(algo, minute, fwd_tables[algo][minute])
+                continue
 
             # Complete path for load tables
             path = base_path.joinpath("minute_" + str(minute))
 
             # Table which contains the rates after the exchanges of each function that each node has
             function_rate_x_node = pd.DataFrame()
-            
+
             # For each minute and foreach function load dataframe
             for func in config_manager.FUNCTION_NAMES:
                 df = pd.read_csv(path.joinpath(func + ".csv"), delimiter='\t', header=0, index_col=0)
                 function_rate_x_node[func] = df.sum(axis=0)
- 
-            sr, rr, rn, an, mc, on = calculate_rates_globally(function_rate_x_node, df_presence, config_file, algo)
-            x_node_power_consumption.append(an)
-            x_node_max_power_consumption.append(mc)
-            x_overloaded_nodes_counter.append(on)
-
-
-            for func in sr:
-                x_func_success_rate[func].append(sr[func])
-                x_func_reject_rate[func].append(rr[func])
-                x_func_reject_num[func].append(rn[func])
-                rates_for_algo[func][algo] = x_func_success_rate[func]
-
-            print("<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<")
-
-        overloaded_for_algo[algo] = x_overloaded_nodes_counter
-        print("STATS FOR ALGO {}".format(algo))
-        # Metrics prints
-
-        ##### SUCCESS RATES METRICS #####
-        # Mean success rate
-        mean_success_rate = np.mean([np.mean(srates) for k, srates in x_func_success_rate.items()]) * 100
-        print("     > Mean success rate: {:0.2f}%".format(
-            mean_success_rate
-        ))
-
-        # Mean node consumption
-        mean_node_consumption = sum(x_node_power_consumption) / len(x_node_power_consumption)        
-        print("     > Mean node power consumption: {:0.2f}%".format(
-            mean_node_consumption
-        ))
-
-        # Max node consumption
-        max_node_consumption = max(x_node_max_power_consumption)    
-        print("     > Max node power consumption: {:0.2f}%".format(
-            max_node_consumption
-        ))
-
-        # Success rate variance
-        # flat_list = [i * 100 for i in flatten(list(x_func_success_rate.values()))]
-        # success_rate_variance = np.var(flat_list)
-        # print("     > Success rate variance: {:0.2f}".format(success_rate_variance))
-
-        # Success rate median
-        flat_list = flatten(list(x_func_success_rate.values()))
-        success_rate_median = np.median(flat_list) * 100
-        print("     > Success rate median: {:0.2f}%".format(success_rate_median))
-
-        # Success rate percentile
-        # flat_list = flatten(list(x_func_success_rate.values()))
-        # success_rate_percentile = np.percentile(flat_list, config_manager.ANALYSIS_PERCENTILE) * 100
-        # print("     > Success rate {}% percentile: {:0.2f}%".format(
-        #         config_manager.ANALYSIS_PERCENTILE,
-        #         success_rate_percentile
-        #     )
-        # )
-
-        ##### SUCCESS RATES (STRESS PERIOD) METRICS #####
-        # Mean success rate calculated during high traffic period
-        mid_instant = math.floor(config_manager.SIMULATION_MINUTES / 2)
-        low = mid_instant - 1
-        high = mid_instant + 1
-        mean_success_rate_stress_period = np.mean([np.mean(srates[low:high]) for k, srates in x_func_success_rate.items()]) * 100
-        print("         > Mean success rate during stress period: {:0.2f}%".format(
-            mean_success_rate_stress_period
-        ))
-
-        # Success rate variance (stress period)
-        # flat_list = [i * 100 for i in flatten([item[1:6] for item in list(x_func_success_rate.values())])]
-        # success_rate_stress_period_variance = np.var(flat_list)
-        # print("         > Success rate variance during stress period (from minute 1 to 5): {:0.2f}"
-        #     .format(success_rate_stress_period_variance))
-
-        # Success rate median (stress period)
-        flat_list = flatten([item[low:high] for item in list(x_func_success_rate.values())])
-        success_rate_stress_period_median = np.median(flat_list) * 100
-        print("         > Success rate median during stress period: {:0.2f}%"
-            .format(success_rate_stress_period_median))
-
-        # Success rate percentile (stress period)
-        # flat_list = flatten([item[1:6] for item in list(x_func_success_rate.values())])
-        # success_rate_stress_period_percentile = np.percentile(flat_list, config_manager.ANALYSIS_PERCENTILE) * 100
-        # print("         > Success rate {}% percentile during stress period (from minute 1 to 5): {:0.2f}%"
-        #     .format(
-        #         config_manager.ANALYSIS_PERCENTILE,
-        #         success_rate_stress_period_percentile
-        #     )
-        # )
-
-        ##### REJECT RATES METRICS #####
-        # Total rejected requests num calculated for each algorithm across minutes
-        total_reject_requests = np.sum([np.sum(rejnums) for k, rejnums in x_func_reject_num.items()])
-        print("     > Total rejected requests: {} req".format(
-            total_reject_requests
-        ))
-
-        # Reject number variance
-        # flat_list = flatten(list(x_func_reject_num.values()))
-        # reject_number_variance = np.var(flat_list)
-        # print("     > Reject num variance: {:0.2f}".format(reject_number_variance))
-
-        # Reject number median
-        # flat_list = flatten(list(x_func_reject_num.values()))
-        # reject_number_median = np.median(flat_list)
-        # print("     > Reject num median: {:0.2f}".format(reject_number_median))
-
-        # Reject number percentile
-        # flat_list = flatten(list(x_func_reject_num.values()))
-        # reject_number_percentile = np.percentile(flat_list, config_manager.ANALYSIS_PERCENTILE)
-        # print("     > Reject num {}% percentile: {:0.2f}".format(
-        #         config_manager.ANALYSIS_PERCENTILE,
-        #         reject_number_percentile
-        #     )
-        # )
-
-        print("----------------------------------------------------------------------------")
-
-        index_comparison[algo] = [
-            mean_success_rate,
-            success_rate_median,
-            mean_success_rate_stress_period,
-            success_rate_stress_period_median,
-            mean_node_consumption,
-            max_node_consumption,
-            total_reject_requests
-        ]
-
-    # Export print for comparison
-    for func in config_manager.FUNCTION_NAMES:
-        export_for_minute_rates(func, rates_for_algo[func])
-
-    # Creates plot of overloaded nodes
-    export_for_minute_overloaded_nodes(overloaded_for_algo)
 
-    # Export index comparison table
-    print("> INDEX COMPARISON TABLE")
-    print(index_comparison.T)
-    export_index_comparison_table(index_comparison.T)
+            streaming_analyzer.add_minute_rates(algo, minute, function_rate_x_node)
+
+    return complete_analysis(streaming_analyzer, export)
+
+def main():
+    kargs = get_analyzer_and_simulator_args()
+
+    # Read the instance file
+    config_file = load_instance(kargs["instanceformat"])
+
+    # Tables exported in a single file are loaded all together
+    fwd_tables = None
+    if kargs["outputformat"] == "npz":
+        results = load_results_file(config_manager.SIMULATION_RESULTS_FILE)
+        if results["functions"] != config_manager.FUNCTION_NAMES:
+            raise Exception("Results file has been exported with different functions")
+        fwd_tables = results["fwd_tables"]
+
+    analyze(config_file, kargs["modeltype"], fwd_tables)
 
 
 # Call main program.
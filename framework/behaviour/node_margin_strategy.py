@@ -4,7 +4,7 @@
 # AUTHORS file for more information.
 
 from .strategy import Strategy
-import copy
+import numpy as np
 import math
 
 
@@ -18,6 +18,12 @@ class NodeMarginStrategy(Strategy):
         # Represents the percentage of usage that is possible forward to each neighbour
         self._margin_percentage_out = {}
 
+        # Planner used to choose the load to forward to each neighbour
+        self._planner = self._config_manager.NODE_MARGIN_PLANNER
+
+        # Features vector of the original load of each neighbour
+        self._neighbours_features = {}
+
     def run(self) -> dict:
         return self.__loop()
 
@@ -28,40 +34,30 @@ class NodeMarginStrategy(Strategy):
     def set_logger(self, logger):
         self._logger = logger
 
+    def compute_margins(self) -> dict:
+        """
+        Calculate the margins of all the nodes, that the minute context shares with all the agents
+        """
+        self.__compute_margins()
+        return self._margin_percentage_in
+
+    def set_planner(self, planner):
+        self._planner = planner
+
     def __loop(self) -> dict:
         self._calculate_margin()
         self._exchange()
         return self._calculate_weights()
     
-    # Get all the functions deployed in the selected node
-    def __get_deployed_functions(self, actual_node):
-        functions_deployed = []
-        for k, value in self._config_json[actual_node]["load"].items():
-            if "USAGE" in k:
-                for i in range(0, len(value["functions"])):
-                    functions_deployed.append(value["functions"][i]["function_name"])
-        return functions_deployed
-    
-    # Get the number of neigh with at least one function in common with the actual node
-    def __neigh_with_at_least_one_fun_in_common(self, actual_node):
-        functions_deployed = self.__get_deployed_functions(actual_node)
-
-        num = 0
-        for neigh in self._config_json[actual_node]["neighbours"]:
-            found = False
-            for k, value in self._config_json[neigh]["load"].items():
-                if "USAGE" in k:
-                    for i in range(0, len(value["functions"])):
-                        if value["functions"][i]["function_name"] in functions_deployed:
-                            num += 1
-                            found = True
-                            break
-                if found == True:
-                    break
-        return num
-                        
     # Calculates the margin for each node in the net
     def _calculate_margin(self):
+        # Margins are the same for all the agents of the minute, so they are calculated only once
+        if self._minute_context is not None:
+            self._margin_percentage_in = self._minute_context.get_margins(self._config_manager.NODE_MARGIN_STRATEGY)
+        else:
+            self.__compute_margins()
+
+    def __compute_margins(self):
         for node, node_infos in self._config_json.items():
             self._margin_percentage_in[node] = {}
             self._margin_percentage_in[node]["node_type"] = node_infos["node_type"]
@@ -72,7 +68,7 @@ class NodeMarginStrategy(Strategy):
                 self._margin_percentage_in[node]["load"] = {}
                 for group, values in node_infos["load"].items():
                     self._margin_percentage_in[node]["load"][group] = values["total_rate"]
-                neigh_num = self.__neigh_with_at_least_one_fun_in_common(node)
+                neigh_num = self._count_neighbours_with_common_functions(node)
                 ##print(neigh_num)
                 if neigh_num == 0:
                     self._margin_percentage_in[node]["margin"] = 0
@@ -126,7 +122,8 @@ class NodeMarginStrategy(Strategy):
         self._logger.info("Margin percentage out: {}".format(logger_dict))
 
     def _calculate_weights(self):
-        w = {}
+        if self._planner == "binary_search":
+            return self._calculate_weights_binary_search()
 
         # Extract loads data of the node from the config file
         original_requests_groups, original_requests_functions = self._get_load_for_groups_and_functions(self._config_json[self._id])
@@ -134,27 +131,30 @@ class NodeMarginStrategy(Strategy):
         # Add the information about the type of the node
         original_requests_groups["node_type"] = self._config_manager.NODES_TYPES_IN_MODELS[self._config_json[self._id]["node_type"]]
 
-        # Get a copy for each original dictionary
-        remained_requests_groups = copy.deepcopy(original_requests_groups)          
-        remained_requests_functions = copy.deepcopy(original_requests_functions)
+        # Features vector of the load remained in the node, updated in place, and a copy of the original functions load
+        remained_requests_vector = self._model_proxy.build_features_vector(original_requests_groups)
+        remained_requests_functions = dict(original_requests_functions)
 
         # List of functions deployed on the node
         node_functions = list(original_requests_functions.keys())
 
         # For each neighbour with margin > 0, list of the functions deployed in common with the current node
         # If a neighbour does not have any function in common, it is not considered
-        functions_in_common = self.__get_common_functions(node_functions)
+        functions_in_common = self.__get_common_functions()
         #print("Functions in common:", functions_in_common)
 
         # List of the neighbours available to receive load
         neighbours = list(functions_in_common.keys())
 
         # For each neighbour and for each function in common, contains the load forwarded by the current node
+        # The same load is kept for each group in a features vector, updated in place
         fwd_to_neigh = {}
+        fwd_to_neigh_vectors = {}
         for neigh, list_of_fun in functions_in_common.items():
             fwd_to_neigh[neigh] = {}
             for i in range(0, len(list_of_fun)):
                 fwd_to_neigh[neigh][list_of_fun[i]] = 0
+            fwd_to_neigh_vectors[neigh] = np.zeros_like(remained_requests_vector)
 
         #print("Fwd to neigh original", fwd_to_neigh)
 
@@ -183,12 +183,7 @@ class NodeMarginStrategy(Strategy):
 
                 # Check if there're still requests to remove from the selected function
                 if remained_requests_functions[func_to] > 0:
-                    # Extracts the load of the selected neighbour (this information has been forwarded toghether with the information about the margin) 
-                    original_node_to_features = copy.deepcopy(self._margin_percentage_out[node_to]["load"])
-                    # Add node type 
-                    original_node_to_features["node_type"] = self._config_manager.NODES_TYPES_IN_MODELS[self._margin_percentage_out[node_to]["node_type"]]
-
-                    original_node_to_predictions = self._model_proxy.get_node_predictions(original_node_to_features)
+                    original_node_to_predictions = self.__get_original_node_predictions(node_to)
 
                     # Calculate the percentage usage for each node metric
                     original_node_to_percentage = self.__calculate_usage_node(original_node_to_predictions, self._margin_percentage_out[node_to]["node_type"])
@@ -197,20 +192,13 @@ class NodeMarginStrategy(Strategy):
                     # Calculate load to transfer
                     load_to_transfer = math.ceil(remained_requests_functions[func_to] * 0.01)
                     # Check if the selected "node_to" can receive the load
+                    func_column = self._get_column_of_function(func_to)
                     fwd_to_neigh[node_to][func_to] += load_to_transfer
+                    fwd_to_neigh_vectors[node_to][func_column] += load_to_transfer
                     #print("Fwd to neigh after trying to send a new request", fwd_to_neigh)
 
-                    # Get the correspondent group data of the current load chosen to be forwarded at "node_to"
-                    group_data = self._model_proxy.transform_functions_in_groups(fwd_to_neigh[node_to])
-                    # Add the original load present in "node_to"
-                    for group in self._margin_percentage_out[node_to]["load"]:
-                        group_data["rate_group_" + group].iloc[0] += self._margin_percentage_out[node_to]["load"][group]
-
-                    # Add the information about the node type (it is forwarded togheter with the margin percentage)
-                    group_data["node_type"] = self._config_manager.NODES_TYPES_IN_MODELS[self._margin_percentage_out[node_to]["node_type"]]
-
-                    #Get prediction using the new features
-                    node_to_predictions = self._model_proxy.get_node_predictions(group_data)
+                    # Get prediction using the original load of "node_to" (with its node type) plus the load forwarded to it
+                    node_to_predictions = self._model_proxy.get_node_predictions_vector(self.__get_neighbour_features(node_to) + fwd_to_neigh_vectors[node_to])
 
                     # Calculate the percentage usage for each node metric
                     node_to_percentage = self.__calculate_usage_node(node_to_predictions, self._margin_percentage_out[node_to]["node_type"])
@@ -219,17 +207,17 @@ class NodeMarginStrategy(Strategy):
                     if self._margin_percentage_out[node_to]["margin"] >= node_to_percentage - original_node_to_percentage:
                         remained_requests_functions[func_to] -= load_to_transfer
                         #print("New load after removing one request:", remained_requests_functions)
-                        group_to_discard = self._get_group_of_function(func_to)
-                        remained_requests_groups[group_to_discard] -= load_to_transfer
+                        remained_requests_vector[func_column] -= load_to_transfer
                         #Get prediction using the new features
-                        node_predictions = self._model_proxy.get_node_predictions(remained_requests_groups)
+                        node_predictions = self._model_proxy.get_node_predictions_vector(remained_requests_vector)
 
                         # Check if the current node is still in overload
-                        overload = node_predictions["overloaded_node"].iloc[0]
+                        overload = node_predictions["overloaded_node"]
                         #print("Is the node still in overload?:" + str(overload))
                     else:
                         # Cancel the transfer of the request
                         fwd_to_neigh[node_to][func_to] -= 1
+                        fwd_to_neigh_vectors[node_to][func_column] -= 1
 
                         # Node_to cannot accept requests from func_to so remove the function from the possibilities
                         functions_in_common[node_to].remove(func_to)
@@ -263,7 +251,137 @@ class NodeMarginStrategy(Strategy):
                         iterator[node_to] = 0
             else:
                 break
-        
+
+        return self.__build_weights(node_functions, original_requests_functions, remained_requests_functions, fwd_to_neigh)
+
+    def _calculate_weights_binary_search(self):
+        """
+        Alternative planner that, for each neighbour and function in common, searches with a
+        bisection the largest load that the neighbour can receive within its margin, and then
+        the smallest part of it that solves the overload of the current node.
+        It assumes that the usage of a node grows with its load
+        """
+        # Extract loads data of the node from the config file
+        original_requests_groups, original_requests_functions = self._get_load_for_groups_and_functions(self._config_json[self._id])
+
+        # Add the information about the type of the node
+        original_requests_groups["node_type"] = self._config_manager.NODES_TYPES_IN_MODELS[self._config_json[self._id]["node_type"]]
+
+        remained_requests_vector = self._model_proxy.build_features_vector(original_requests_groups)
+        remained_requests_functions = dict(original_requests_functions)
+        node_functions = list(original_requests_functions.keys())
+
+        # For each neighbour with margin > 0, list of the functions deployed in common with the current node
+        functions_in_common = self.__get_common_functions()
+
+        # For each neighbour and for each function in common, contains the load forwarded by the current node
+        fwd_to_neigh = {}
+        fwd_to_neigh_vectors = {}
+        for neigh, list_of_fun in functions_in_common.items():
+            fwd_to_neigh[neigh] = {func: 0 for func in list_of_fun}
+            fwd_to_neigh_vectors[neigh] = np.zeros_like(remained_requests_vector)
+
+        overload = self._config_json[self._id]["node_metrics"]["overloaded_node"]
+        for node_to, list_of_fun in functions_in_common.items():
+            if overload == 0:
+                break
+
+            # Usage of the neighbour before receiving any load
+            original_node_to_predictions = self.__get_original_node_predictions(node_to)
+            original_node_to_percentage = self.__calculate_usage_node(original_node_to_predictions, self._margin_percentage_out[node_to]["node_type"])
+
+            for func_to in list_of_fun:
+                if overload == 0:
+                    break
+                if remained_requests_functions[func_to] == 0:
+                    continue
+
+                # Largest load of the function that "node_to" can receive
+                func_column = self._get_column_of_function(func_to)
+                max_load = self.__search_max_transferable_load(node_to, func_column, fwd_to_neigh_vectors[node_to],
+                                                               remained_requests_functions[func_to], original_node_to_percentage)
+                if max_load == 0:
+                    continue
+
+                # Smallest part of the load that solves the overload of the current node
+                load_to_transfer, overload = self.__search_min_load_to_solve_overload(remained_requests_vector, func_column, max_load)
+
+                fwd_to_neigh[node_to][func_to] += load_to_transfer
+                fwd_to_neigh_vectors[node_to][func_column] += load_to_transfer
+                remained_requests_functions[func_to] -= load_to_transfer
+                remained_requests_vector[func_column] -= load_to_transfer
+
+        return self.__build_weights(node_functions, original_requests_functions, remained_requests_functions, fwd_to_neigh)
+
+    # Get the predictions of "node_to" with its own load
+    def __get_original_node_predictions(self, node_to):
+        # Baseline predictions of the neighbours are shared by all the agents of the minute
+        if self._minute_context is not None:
+            return self._minute_context.get_baseline_predictions(node_to)
+
+        return self._model_proxy.get_node_predictions_vector(self.__get_neighbour_features(node_to))
+
+    # Get the features vector of the original load of "node_to"
+    def __get_neighbour_features(self, node_to):
+        if node_to not in self._neighbours_features:
+            # Extracts the load of the selected neighbour (this information has been forwarded toghether with the information about the margin) 
+            original_node_to_features = dict(self._margin_percentage_out[node_to]["load"])
+            # Add node type 
+            original_node_to_features["node_type"] = self._config_manager.NODES_TYPES_IN_MODELS[self._margin_percentage_out[node_to]["node_type"]]
+            self._neighbours_features[node_to] = self._model_proxy.build_features_vector(original_node_to_features)
+        return self._neighbours_features[node_to]
+
+    # Check if "node_to" can receive the load forwarded to it without exceeding its margin
+    def __can_receive(self, node_to, fwd_to_node_vector, original_node_to_percentage):
+        # Add the original load of "node_to" to the load forwarded to it
+        node_to_predictions = self._model_proxy.get_node_predictions_vector(self.__get_neighbour_features(node_to) + fwd_to_node_vector)
+        node_to_percentage = self.__calculate_usage_node(node_to_predictions, self._margin_percentage_out[node_to]["node_type"])
+        return self._margin_percentage_out[node_to]["margin"] >= node_to_percentage - original_node_to_percentage
+
+    # Bisection of the largest load of a function (up to "max_load") that "node_to" can receive
+    # The load is added to the column "func_column" of the features vector forwarded to "node_to"
+    def __search_max_transferable_load(self, node_to, func_column, fwd_to_node_vector, max_load, original_node_to_percentage):
+        already_forwarded = fwd_to_node_vector[func_column]
+        candidate_fwd = fwd_to_node_vector.copy()
+
+        candidate_fwd[func_column] = already_forwarded + max_load
+        if self.__can_receive(node_to, candidate_fwd, original_node_to_percentage):
+            return max_load
+
+        # "low" is always accepted, "high" is always refused
+        low, high = 0, max_load
+        while high - low > 1:
+            mid = (low + high) // 2
+            candidate_fwd[func_column] = already_forwarded + mid
+            if self.__can_receive(node_to, candidate_fwd, original_node_to_percentage):
+                low = mid
+            else:
+                high = mid
+        return low
+
+    # Bisection of the smallest load (up to "max_load") to remove from the column "group_column" to solve the overload of the node
+    # Returns the load and the overload state of the node after removing it
+    def __search_min_load_to_solve_overload(self, remained_requests_vector, group_column, max_load):
+        candidate_groups = remained_requests_vector.copy()
+
+        candidate_groups[group_column] = remained_requests_vector[group_column] - max_load
+        if self._model_proxy.get_node_predictions_vector(candidate_groups)["overloaded_node"] == 1:
+            return max_load, 1
+
+        # The node is overloaded removing "low" and not overloaded removing "high"
+        low, high = 0, max_load
+        while high - low > 1:
+            mid = (low + high) // 2
+            candidate_groups[group_column] = remained_requests_vector[group_column] - mid
+            if self._model_proxy.get_node_predictions_vector(candidate_groups)["overloaded_node"] == 1:
+                low = mid
+            else:
+                high = mid
+        return high, 0
+
+    # Build the weights of each function from the requests forwarded to each neighbour
+    def __build_weights(self, node_functions, original_requests_functions, remained_requests_functions, fwd_to_neigh):
+        w = {}
         for fun in node_functions:
             w[fun] = {}
             # Obtain total number of requests of the selected function
@@ -287,13 +405,12 @@ class NodeMarginStrategy(Strategy):
         return w
     
     # Calculate functions in common with each node in the net
-    def __get_common_functions(self, current_node_functions):
+    def __get_common_functions(self):
         common_functions = {}
         for node in self._config_json:
             if node == self._id or not node in self._config_json[self._id]["neighbours"] or self._margin_percentage_out[node]["margin"] == 0:
                 continue
-            node_functions = self.__get_deployed_functions(node)
-            temp_common_functions = list(set(node_functions).intersection(current_node_functions))
+            temp_common_functions = self._get_common_functions(self._id, node)
             if len(temp_common_functions) > 0:
                 common_functions[node] = temp_common_functions
         return common_functions
@@ -304,11 +421,11 @@ class NodeMarginStrategy(Strategy):
         fwd_req = True
         for metric, values in self._config_manager.MAX_RESOURCES_USAGE.items():
             # If at least one metric is higher than the considered max value, then the request cannot be forwarded
-            if predictions[metric].iloc[0] > values[node_type]:
+            if predictions[metric] > values[node_type]:
                 fwd_req = False
                 break
             else:
-                usage_percentage[metric] = (predictions[metric].iloc[0] * 100) / values[node_type]
+                usage_percentage[metric] = (predictions[metric] * 100) / values[node_type]
         if fwd_req:
             # Obtain a single value of the node usage mediating over all the node metrics
             total_usage_percentage = 0
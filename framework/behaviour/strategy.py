@@ -16,12 +16,18 @@ class Strategy(ABC):
         # Model manager is passed from simulation context
         self._model_proxy = None
 
+        # Read-only view of the minute shared by all the agents, if provided by the simulation
+        self._minute_context = None
+
     @abstractmethod
     def run(self) -> dict:
         pass
 
     def set_model_proxy(self, model_manager: ModelProxy):
         self._model_proxy = model_manager
+
+    def set_minute_context(self, minute_context):
+        self._minute_context = minute_context
     
     # Get load for each group and function in the node reading the config file
     def _get_load_for_groups_and_functions(self, config_json):
@@ -36,6 +42,41 @@ class Strategy(ABC):
     
     # Get the name of the group of the function passed
     def _get_group_of_function(self, function_name):
+        if self._minute_context is not None:
+            return self._minute_context.instance_index.function_group[function_name]
         for group, functions in self._config_manager.GROUPS.items():
             if function_name in functions:
                 return group
+
+    # Get the position of the group of the function passed in the features vector
+    def _get_column_of_function(self, function_name):
+        return self._config_manager.GROUPS_COLUMNS_NAMES.index("rate_group_" + self._get_group_of_function(function_name))
+
+    # Get all the functions deployed in the selected node, in the order of the function names
+    def _get_deployed_functions(self, actual_node):
+        # Functions deployed on each node are indexed once for the whole instance
+        if self._minute_context is not None:
+            return self._minute_context.instance_index.get_deployed_functions(actual_node)
+        functions_deployed = []
+        for k, value in self._config_json[actual_node]["load"].items():
+            if "USAGE" in k:
+                for i in range(0, len(value["functions"])):
+                    functions_deployed.append(value["functions"][i]["function_name"])
+        return [func for func in self._config_manager.FUNCTION_NAMES if func in functions_deployed]
+
+    # Get the functions deployed in both the nodes, in the order of the function names
+    def _get_common_functions(self, node_a, node_b):
+        if self._minute_context is not None:
+            return self._minute_context.instance_index.get_common_functions(node_a, node_b)
+        functions_deployed_b = self._get_deployed_functions(node_b)
+        return [func for func in self._get_deployed_functions(node_a) if func in functions_deployed_b]
+
+    # Get the number of neigh with at least one function in common with the actual node
+    def _count_neighbours_with_common_functions(self, actual_node):
+        if self._minute_context is not None:
+            return self._minute_context.instance_index.count_neighbours_with_common_functions(actual_node)
+        num = 0
+        for neigh in self._config_json[actual_node]["neighbours"]:
+            if len(self._get_common_functions(actual_node, neigh)) > 0:
+                num += 1
+        return num
@@ -4,6 +4,7 @@
 # AUTHORS file for more information.
 
 import argparse
+import os
 from configuration.config_manager import ConfigManager
 
 config_manager = ConfigManager()
@@ -15,10 +16,37 @@ def analyzer_and_simulator_arguments():
     parser =argparse.ArgumentParser()
     parser.add_argument('-m', '--modeltype', type=str, default="regression", required=False,
                         help="Optional parameter used to choose the model type to use during the simulation (regression, quantile005, quantile095). Default value is \"regression\"")
+    parser.add_argument('-w', '--workers', type=int, default=1, required=False,
+                        help="Optional parameter that represent the number of processes used by the simulator to run the agents. Default value is 1 (sequential execution)")
+    parser.add_argument('-f', '--outputformat', type=str, default="csv", required=False,
+                        help="Optional parameter used to choose the format of the tables exported by the simulator and read by the analyzer (csv, npz). Default value is \"csv\"")
+    parser.add_argument('-i', '--instanceformat', type=str, default="json", required=False,
+                        help="Optional parameter used to choose the format of the instance to read (json, compact). Default value is \"json\"")
     
     args = parser.parse_args()
     if args.modeltype != "regression" and args.modeltype != "quantile005" and args.modeltype != "quantile095":
         raise parser.error("Model type can only be \"regression\" \"quantile005\" or \"quantile095\"")
+    if args.outputformat not in config_manager.SIMULATION_OUTPUT_FORMATS:
+        raise parser.error("Output format can only be \"csv\" or \"npz\"")
+    if args.instanceformat not in config_manager.INSTANCE_FORMATS:
+        raise parser.error("Instance format can only be \"json\" or \"compact\"")
+    if args.workers <= 0:
+        raise parser.error("Workers number must be integer, greater than 0")
+    return args
+
+
+def lookup_tables_compiler_arguments():
+    """
+        Method used to handle arguments passed by terminal to the lookup tables compiler
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-m', '--modeltype', nargs='+', type=str, default=config_manager.MODEL_TYPES, required=False,
+                        help="Optional param that represent the model types to compile (regression, quantile005, quantile095). Default are all of them")
+
+    args = parser.parse_args()
+    for model_type in args.modeltype:
+        if model_type not in config_manager.MODEL_TYPES:
+            raise parser.error("Model type can only be \"regression\" \"quantile005\" or \"quantile095\"")
     return args
 
 
@@ -36,9 +64,15 @@ def simulation_controller_arguments():
                         help="Optional param that represent the number of experiment to perform. If not setted, it will be executed just one experiment")
     parser.add_argument('-m', '--modeltype', type=str, default="regression", required=False,
                         help="Optional parameter used to choose the model type to use during the simulation (regression, quantile005, quantile095). Default value is \"regression\"")
+    parser.add_argument('-w', '--workers', type=int, default=1, required=False,
+                        help="Optional parameter that represent the number of processes used by the simulator to run the agents. Default value is 1 (sequential execution)")
+    parser.add_argument('-a', '--noartefacts', action='store_true', required=False,
+                        help="Optional flag used to not write on disk the instances, the simulation outputs and the agent logs of each experiment, only the final results tables are exported")
     
     args = parser.parse_args()
     
+    if args.workers <= 0:
+        raise parser.error("Workers number must be integer, greater than 0")
     if args.modeltype != "regression" and args.modeltype != "quantile005" and args.modeltype != "quantile095":
         raise parser.error("Model type can only be \"regression\" \"quantile005\" or \"quantile095\"")
     if args.nodesnum != -1 and args.nodesnum <= 0:
@@ -70,9 +104,21 @@ def parse_arguments():
                         help="Optional param that represent probability of creating an edge")
     parser.add_argument('-o', '--overloaded', type=int, default=-1, required=False,
                         help="Optional param that represent the percentages of overloaded node to test on the same instance")
+    parser.add_argument('-f', '--format', type=str, default="json", required=False,
+                        help="Optional param that represent the format of the exported instance (json, compact). Default value is \"json\"")
+    parser.add_argument('-t', '--topology', type=str, default="gnp", required=False,
+                        help="Optional param that represent the generator of the network graph (gnp, fast_gnp, geometric, knn). Default value is \"gnp\"")
+    parser.add_argument('-l', '--loadgen', type=str, default="legacy", required=False,
+                        help="Optional param that represent the generator of the loads of the nodes (legacy, vectorized). Default value is \"legacy\"")
 
     args = parser.parse_args()
 
+    if args.loadgen not in config_manager.LOAD_GENERATORS:
+        raise parser.error("Load generator can only be \"legacy\" or \"vectorized\"")
+    if args.topology not in config_manager.GRAPH_TOPOLOGIES:
+        raise parser.error("Topology can only be \"gnp\" \"fast_gnp\" \"geometric\" or \"knn\"")
+    if args.format not in config_manager.INSTANCE_FORMATS:
+        raise parser.error("Instance format can only be \"json\" or \"compact\"")
     if args.nodesnum != -1 and args.nodesnum <= 0:
         raise parser.error("Nodes number must be integer, greater than 0")
     if args.seed != -1 and args.seed <= 0:
@@ -84,6 +130,94 @@ def parse_arguments():
     return args
 
 
+def sweep_runner_arguments():
+    """
+        Method used to handle arguments passed by terminal to the sweep runner
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-n', '--nodesnum', nargs='+', type=int, default=[10], required=False,
+                        help="Optional param that represent the numbers of nodes of the grid. Default value is 10")
+    parser.add_argument('-p', '--edgeprob', nargs='+', type=float, default=[0.1], required=False,
+                        help="Optional param that represent the probabilities of creating an edge of the grid. Default value is 0.1")
+    parser.add_argument('-o', '--overloaded', nargs='+', type=int, default=[30, 60, 90], required=False,
+                        help="Optional param that represent the percentages of overloaded node of the grid. Default values are 30, 60, 90")
+    parser.add_argument('-m', '--modeltype', nargs='+', type=str, default=["regression"], required=False,
+                        help="Optional param that represent the model types of the grid (regression, quantile005, quantile095). Default value is \"regression\"")
+    parser.add_argument('-t', '--strategies', nargs='+', type=str, default=config_manager.STRATEGIES, required=False,
+                        help="Optional param that represent the strategies of the grid. Default are all of them")
+    parser.add_argument('-s', '--seeds', nargs='+', type=int, required=True,
+                        help="Represent the seeds of the grid, used to generate the instances")
+    parser.add_argument('-w', '--workers', type=int, default=os.cpu_count(), required=False,
+                        help="Optional param that represent the number of processes used to run the cells of the grid. Default value is the number of CPUs")
+    parser.add_argument('-r', '--results', type=str, default=str(config_manager.SWEEP_RUNNER_OUTPUT_PATH), required=False,
+                        help="Optional param that represent the directory of the results store. Completed cells found in the store are not executed again")
+    parser.add_argument('-l', '--loadgen', type=str, default="legacy", required=False,
+                        help="Optional param that represent the generator of the loads of the instances (legacy, vectorized), use a different results store for each generator. Default value is \"legacy\"")
+
+    args = parser.parse_args()
+    if args.loadgen not in config_manager.LOAD_GENERATORS:
+        raise parser.error("Load generator can only be \"legacy\" or \"vectorized\"")
+    for nodes_num in args.nodesnum:
+        if nodes_num <= 0:
+            raise parser.error("Nodes number must be integer, greater than 0")
+    for edge_prob in args.edgeprob:
+        if edge_prob < 0.0 or edge_prob > 1.0:
+            raise parser.error("Edge probability must be a float number between 0 and 1")
+    for rate in args.overloaded:
+        if rate < 0 or rate > 100:
+            raise parser.error("Overloaded percentage must be integer, grater eq than 0 and lower eq than 100")
+    for model_type in args.modeltype:
+        if model_type not in config_manager.MODEL_TYPES:
+            raise parser.error("Model type can only be \"regression\" \"quantile005\" or \"quantile095\"")
+    for strategy in args.strategies:
+        if strategy not in config_manager.STRATEGIES:
+            raise parser.error("Strategy can only be one of {}".format(", ".join(config_manager.STRATEGIES)))
+    for seed in args.seeds:
+        if seed <= 0:
+            raise parser.error("Seed must be an integer, greater than 0")
+    if args.workers <= 0:
+        raise parser.error("Workers number must be integer, greater than 0")
+    return args
+
+
+def node_margin_planner_benchmark_arguments():
+    """
+        Method used to handle arguments passed by terminal to the node margin planner benchmark
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-m', '--modeltype', type=str, default="regression", required=False,
+                        help="Optional parameter used to choose the model type to use during the benchmark (regression, quantile005, quantile095). Default value is \"regression\"")
+    parser.add_argument('-i', '--instanceformat', type=str, default="json", required=False,
+                        help="Optional parameter used to choose the format of the instance to read (json, compact). Default value is \"json\"")
+
+    args = parser.parse_args()
+    if args.modeltype not in config_manager.MODEL_TYPES:
+        raise parser.error("Model type can only be \"regression\" \"quantile005\" or \"quantile095\"")
+    if args.instanceformat not in config_manager.INSTANCE_FORMATS:
+        raise parser.error("Instance format can only be \"json\" or \"compact\"")
+    return args
+
+
+def instance_converter_arguments():
+    """
+        Method used to handle arguments passed by terminal to the instance converter
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-t', '--to', type=str, required=True,
+                        help="Format of the converted instance (json, compact)")
+    parser.add_argument('-i', '--input', type=str, default=None, required=False,
+                        help="Optional param that represent the instance to convert. Default is the output of the instance generator in the other format")
+    parser.add_argument('-o', '--output', type=str, default=None, required=False,
+                        help="Optional param that represent the path of the converted instance. Default is the output of the instance generator in the selected format")
+
+    args = parser.parse_args()
+    if args.to not in config_manager.INSTANCE_FORMATS:
+        raise parser.error("Instance format can only be \"json\" or \"compact\"")
+    if args.input is not None and not os.path.exists(args.input):
+        raise parser.error("Instance to convert does not exist")
+    return args
+
+
 def get_args():
     """
         Returns dictionary created with key-value params passed to program.
@@ -98,3 +232,19 @@ def get_analyzer_and_simulator_args():
 def get_simulation_controller_args():
     kargs = dict(simulation_controller_arguments()._get_kwargs())
     return kargs
+
+def get_sweep_runner_args():
+    kargs = dict(sweep_runner_arguments()._get_kwargs())
+    return kargs
+
+def get_node_margin_planner_benchmark_args():
+    kargs = dict(node_margin_planner_benchmark_arguments()._get_kwargs())
+    return kargs
+
+def get_instance_converter_args():
+    kargs = dict(instance_converter_arguments()._get_kwargs())
+    return kargs
+
+def get_lookup_tables_compiler_args():
+    kargs = dict(lookup_tables_compiler_arguments()._get_kwargs())
+    return kargs
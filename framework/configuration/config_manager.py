@@ -23,6 +23,10 @@ class ConfigManager(object):
     OUTPUT_INSTANCE_PATH = output_dir.joinpath("instance_gen_output")
     OUTPUT_INSTANCE_JSON_FILE_PATH = OUTPUT_INSTANCE_PATH.joinpath("instance.json") # Path for output instance json file
     OUTPUT_INSTANCE_GRAPH_FILE_PATH = OUTPUT_INSTANCE_PATH.joinpath("graph.png")
+    OUTPUT_INSTANCE_COMPACT_PATH = OUTPUT_INSTANCE_PATH.joinpath("instance_compact") # Directory of the instance in compact binary format
+    INSTANCE_FORMATS = ["json", "compact"] # Formats of the instance exported by the instance generator
+    GRAPH_TOPOLOGIES = ["gnp", "fast_gnp", "geometric", "knn"] # Generators of the network graph of the instance
+    LOAD_GENERATORS = ["legacy", "vectorized"] # Generators of the loads of the nodes of the instance
     DATA_DIR = simulation_dir.joinpath("data")  # Directory that contains experiment files
 
     NODES_TYPES = ["HEAVY", "MID", "LIGHT"] # Nodes types used in experiments
@@ -35,10 +39,20 @@ class ConfigManager(object):
     FUNCTION_GROUPS = 4 # Number of groups of functions
     GROUP_KEY_PREFIX = "group_"
     GROUPS_MAX_RATES = [70, 200, 70, 50] # Max rates for each group of function
+    NODES_MAX_RATES = {"HEAVY": {"LOW_USAGE": 400, "HIGH_USAGE": 90, "MEDIUM_USAGE": 200},
+                       "MID": {"LOW_USAGE": 570, "HIGH_USAGE": 80, "MEDIUM_USAGE": 200},
+                       "LIGHT": {"LOW_USAGE": 330, "HIGH_USAGE": 40, "MEDIUM_USAGE": 180}} # Max rates of each group for overloaded nodes
     INITIAL_LOAD_STEPS = 2 # Number of instances for increasing load
     MODEL_BASE_PATH = '../metrics_predictions/system-forecaster-models/groups/'
     SCALER_BASE_PATH = '../metrics_predictions/scalers/groups/'
     GROUP_FILE_PATH = '../metrics_predictions/group_list.json' # group_list path
+    PREDICTIONS_CACHE_SIZE = 200000 # Max number of node predictions kept in the ModelProxy cache (0 disables it)
+    LOOKUP_TABLES_BASE_PATH = '../metrics_predictions/lookup-tables/groups/' # Predictions precompiled on the integer load grid
+    USE_LOOKUP_TABLES = True # Answer predictions with the lookup tables, when they have been compiled
+    USE_MODEL_FAST_PATH = True # Evaluate scalers and models with NumPy arrays instead of the sklearn/pandas path, when supported
+    VALIDATE_MODEL_FAST_PATH = False # Check that each fast path prediction is equal to the sklearn one (slow, for debugging)
+    MODEL_REGISTRY_LOAD_WORKERS = 4 # Threads used to load the joblib files of the models in parallel
+    MODEL_REGISTRY_MMAP_MODE = "r" # Memory map mode of the NumPy arrays in the joblib files (None to read them in memory)
     
     # Read group_list file
     with open(GROUP_FILE_PATH, 'r') as json_file:
@@ -64,6 +78,13 @@ class ConfigManager(object):
         for function in functions:
             FUNCTION_NAMES.append(function)
     
+    # Max rate of each group covered by the lookup tables (the highest rate that can be generated for a node)
+    LOOKUP_TABLES_MAX_RATES = {}
+    for group in GROUPS:
+        LOOKUP_TABLES_MAX_RATES[group] = 0
+        for max_rates in NODES_MAX_RATES.values():
+            LOOKUP_TABLES_MAX_RATES[group] = max(LOOKUP_TABLES_MAX_RATES[group], max_rates[group])
+
     # Parameters for Node Margin Strategy
     MAX_RESOURCES_USAGE = {"cpu_usage_node": {"HEAVY": 460, "MID": 290, "LIGHT": 150}, 
                             "ram_usage_node": {"HEAVY": 6000000000, "MID": 5500000000, "LIGHT": 4100000000}, 
@@ -80,11 +101,15 @@ class ConfigManager(object):
     EQUAL_STRATEGY = STRATEGIES[1]
     NODE_MARGIN_STRATEGY = STRATEGIES[2]
     POWER_SAVING_STRATEGY = STRATEGIES[3]
+    NODE_MARGIN_PLANNERS = ["greedy", "binary_search"] # Planners used by node margin strategy to forward the load
+    NODE_MARGIN_PLANNER = NODE_MARGIN_PLANNERS[0]
 
     SIMULATION_OUTPUT_DIR = output_dir.joinpath("simulation_output")
     SIMULATION_COMPLETE_CONFIGURATION_OUTPUT_PATH = SIMULATION_OUTPUT_DIR.joinpath("minute_config")
     SIMULATION_TABLES_OUTPUT_PATH = SIMULATION_OUTPUT_DIR.joinpath("reports")
     SIMULATION_AGENT_LOGGING_BASE_PATH = SIMULATION_OUTPUT_DIR.joinpath("logs")
+    SIMULATION_OUTPUT_FORMATS = ["csv", "npz"] # Formats of the tables exported by the simulation
+    SIMULATION_RESULTS_FILE = SIMULATION_OUTPUT_DIR.joinpath("results.npz") # Single file with all the tables, used by "npz" format
 
     # Constant used in analyzer
     ANALYSIS_PERCENTILE = 90
@@ -111,6 +136,12 @@ class ConfigManager(object):
     SIMULATION_CONTROLLER_ARCHIVE_PATH = output_dir.joinpath("archive")
     SIMULATION_CONTROLLER_ARCHIVE_COMPARISON_FILE_NAME = "final_comparison.txt"
 
+    # Constants used in sweep runner
+    SWEEP_RUNNER_OUTPUT_PATH = output_dir.joinpath("sweep_runner_output")
+    SWEEP_RUNNER_CELLS_DIR_NAME = "cells" # Directory of the results store with a file for each completed cell
+    SWEEP_RUNNER_OUTPUT_FILE_NAME = "sweep_results.csv"
+    SWEEP_RUNNER_OUTPUT_MEAN_FILE_NAME = "sweep_mean_results.csv"
+
     def __new__(self):
         # if is not define create new instance otherwise return only instance of thi class.
         if not isinstance(self._config_manager, self):
@@ -0,0 +1,63 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+# Copyright 2021-2025 The DFaaS Authors. All rights reserved.
+# This file is licensed under the AGPL v3.0 or later license. See LICENSE and
+# AUTHORS file for more information.
+
+from configuration.config_manager import ConfigManager
+
+class InstanceIndex:
+    """
+    Compact index of an instance, built once and shared by all the minutes of the simulation.
+    The functions deployed on each node are stored as a bitset (bit i is the i-th function
+    of FUNCTION_NAMES), so the functions in common between two nodes are a bitwise AND
+    """
+
+    __config_manager = ConfigManager()
+
+    def __init__(self, config_file):
+        self.functions = list(self.__config_manager.FUNCTION_NAMES)
+        self._functions_bits = {func: 1 << i for i, func in enumerate(self.functions)}
+
+        # Group of each function
+        self.function_group = {}
+        for group, functions in self.__config_manager.GROUPS.items():
+            for func in functions:
+                self.function_group[func] = group
+
+        # Functions deployed on each node (the same in all the minutes) and neighbours of each node
+        self.deployed_mask = {}
+        self.neighbours = {}
+        for node, node_infos in config_file.items():
+            if self.__config_manager.NODE_KEY_PREFIX not in node:
+                continue
+            mask = 0
+            for group, values in node_infos["load"][0].items():
+                for function_info in values["functions"]:
+                    mask |= self._functions_bits[function_info["function_name"]]
+            self.deployed_mask[node] = mask
+            self.neighbours[node] = tuple(node_infos["neighbours"])
+
+    def get_functions(self, mask):
+        """
+        Method used to get the list of the functions of a bitset, in the order of FUNCTION_NAMES
+        """
+        return [func for i, func in enumerate(self.functions) if mask >> i & 1]
+
+    def get_deployed_functions(self, node):
+        """
+        Method used to get the list of the functions deployed on a node
+        """
+        return self.get_functions(self.deployed_mask[node])
+
+    def get_common_functions(self, node_a, node_b):
+        """
+        Method used to get the list of the functions deployed on both the nodes
+        """
+        return self.get_functions(self.deployed_mask[node_a] & self.deployed_mask[node_b])
+
+    def count_neighbours_with_common_functions(self, node):
+        """
+        Method used to get the number of neighbours with at least one function in common with the node
+        """
+        mask = self.deployed_mask[node]
+        return sum(1 for neigh in self.neighbours[node] if self.deployed_mask[neigh] & mask)
@@ -0,0 +1,41 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+# Copyright 2021-2025 The DFaaS Authors. All rights reserved.
+# This file is licensed under the AGPL v3.0 or later license. See LICENSE and
+# AUTHORS file for more information.
+
+from factory.strategy_factory import StrategyFactory
+from model.model_proxy import ModelProxy
+
+class MinuteContext:
+    """
+    Read-only view of a minute of the simulation, shared by all the agents.
+    The values that do not depend on the agent (margins of each strategy and baseline
+    predictions of each node) are computed only once, the index of the instance is shared by all the minutes
+    """
+
+    def __init__(self, minute_config, instance_index):
+        self._minute_config = minute_config
+        self.instance_index = instance_index
+
+        # Margins of each strategy and baseline predictions of each node, calculated when requested
+        self._margins = {}
+        self._baseline_predictions = {}
+
+    def get_margins(self, strategy_type):
+        """
+        Method used to get the margins of all the nodes calculated by a strategy
+        :strategy_type: the strategy that calculates the margins
+        """
+        if strategy_type not in self._margins:
+            strategy = StrategyFactory.create_strategy(strategy_type, None, self._minute_config, self)
+            self._margins[strategy_type] = strategy.compute_margins()
+        return self._margins[strategy_type]
+
+    def get_baseline_predictions(self, node):
+        """
+        Method used to get the predictions of a node with its own load, in the same
+        format returned by ModelProxy.get_node_predictions_vector
+        """
+        if node not in self._baseline_predictions:
+            self._baseline_predictions[node] = ModelProxy.build_predictions_record(self._minute_config[node]["node_metrics"])
+        return self._baseline_predictions[node]
@@ -12,10 +12,18 @@ from configuration.config_manager import ConfigManager
 
 class StrategyFactory():
     @staticmethod
-    def create_strategy(strategy_type, node_key, final_config):
+    def create_strategy(strategy_type, node_key, final_config, minute_context=None):
         """
         Create strategy based on type passed as first parameter
+        The minute context, if passed, is shared with the strategy
         """
+        strategy = StrategyFactory._build_strategy(strategy_type, node_key, final_config)
+        if strategy is not None:
+            strategy.set_minute_context(minute_context)
+        return strategy
+
+    @staticmethod
+    def _build_strategy(strategy_type, node_key, final_config):
         # Important: the list of neighbours is supposed to be already present in a node in the reality
         # So it is not a message to forward between the nodes
         
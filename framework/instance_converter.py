@@ -0,0 +1,40 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+# Copyright 2021-2025 The DFaaS Authors. All rights reserved.
+# This file is licensed under the AGPL v3.0 or later license. See LICENSE and
+# AUTHORS file for more information.
+
+import json
+import time
+from configuration.config_manager import ConfigManager
+from utils.compact_instance import export_compact_instance, load_instance
+from cli.cli import get_instance_converter_args
+
+config_manager = ConfigManager()
+
+def main():
+    kargs = get_instance_converter_args()
+    print(kargs)
+
+    # The instance is read in the other format
+    if kargs["to"] == "compact":
+        input_format = "json"
+        output_path = kargs["output"] if kargs["output"] is not None else config_manager.OUTPUT_INSTANCE_COMPACT_PATH
+    else:
+        input_format = "compact"
+        output_path = kargs["output"] if kargs["output"] is not None else config_manager.OUTPUT_INSTANCE_JSON_FILE_PATH
+
+    start = time.perf_counter()
+    instance = load_instance(input_format, kargs["input"])
+    print("> INSTANCE READ IN {:0.3f} s".format(time.perf_counter() - start))
+
+    start = time.perf_counter()
+    if kargs["to"] == "compact":
+        export_compact_instance(instance, output_path)
+    else:
+        with open(output_path, 'w', encoding='utf-8') as f:
+            json.dump(instance.to_json(), f, ensure_ascii=False, indent=4)
+    print("> INSTANCE CONVERTED IN {:0.3f} s: {}".format(time.perf_counter() - start, output_path))
+
+# Call main program.
+if __name__ == "__main__":
+    main()
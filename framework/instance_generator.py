@@ -13,6 +13,7 @@ import math
 from cli.cli import get_args
 from itertools import combinations, groupby
 from configuration.config_manager import ConfigManager
+from utils.compact_instance import export_compact_instance
 import pandas as pd
 
 config_manager = ConfigManager()
@@ -57,9 +58,7 @@ def generate_configs(nodes_number, overloaded_max_percentage, seed):
             # TODO: puoi usare il choice del net_gen al posto del sample
             functions_groups[group] = net_gen.choice(config_manager.GROUPS[group], num_elements_to_choose, replace=False)
 
-        max_rates_o = {"HEAVY": {"LOW_USAGE": 400, "HIGH_USAGE": 90, "MEDIUM_USAGE": 200},
-                        "MID": {"LOW_USAGE": 570, "HIGH_USAGE": 80, "MEDIUM_USAGE": 200},
-                       "LIGHT": {"LOW_USAGE": 330, "HIGH_USAGE": 40, "MEDIUM_USAGE": 180}}
+        max_rates_o = config_manager.NODES_MAX_RATES
 
         # Create a new dictionary with values as 15% of the original values
         max_rates_u = {key1: {key2: value * 0.15 for key2, value in inner_dict.items()} for key1, inner_dict in max_rates_o.items()}
@@ -139,6 +138,84 @@ def generate_configs(nodes_number, overloaded_max_percentage, seed):
 
 
 
+def generate_configs_vectorized(nodes_number, overloaded_max_percentage, seed):
+    """
+    Generate configurations with the same distribution of generate_configs, drawing the random values
+    of all the nodes, minutes, groups and functions with a few NumPy calls
+    The configurations are reproducible with the same seed, but differ from the ones of generate_configs,
+    because the random values are drawn in a different order
+    """
+    # Independent streams, since drawing whole arrays from two generators with the same seed gives the same values
+    net_seed, load_seed = np.random.SeedSequence(seed).spawn(2)
+    net_gen = np.random.default_rng(net_seed)
+    load_gen = np.random.default_rng(load_seed)
+
+    groups_names = list(config_manager.GROUPS.keys())
+    groups_number = len(groups_names)
+    minutes = config_manager.SIMULATION_MINUTES
+    functions_number = np.array([len(config_manager.GROUPS[group]) for group in groups_names])
+    max_functions = functions_number.max()
+
+    # Node types and groups of each node, the groups are the first ones of a random permutation
+    choices = net_gen.choice(config_manager.NODES_TYPES, nodes_number, p=config_manager.NODES_TYPE_PROBABILITY_DISTRIBUTION)
+    nodes_groups_number = net_gen.integers(1, 4, size=nodes_number)
+    groups_order = np.argsort(net_gen.random((nodes_number, groups_number)), axis=1)
+
+    # Functions of each group, chosen in the same way (the functions missing in a group are placed at the end)
+    functions_keys = net_gen.random((nodes_number, groups_number, max_functions))
+    functions_keys[:, np.arange(0, max_functions)[None, :] >= functions_number[:, None]] = np.inf
+    functions_order = np.argsort(functions_keys, axis=2)
+    groups_functions_number = net_gen.integers(1, functions_number + 1, size=(nodes_number, groups_number))
+
+    # Overloaded nodes, until the max number of overloaded nodes is reached
+    n_max_overload = round(overloaded_max_percentage * nodes_number)
+    overloaded = load_gen.random(nodes_number) <= overloaded_max_percentage
+    overloaded &= np.cumsum(overloaded) <= n_max_overload
+
+    # Max rate of each group of each node, 15% of the original values for the not overloaded nodes
+    max_rates = np.array([[config_manager.NODES_MAX_RATES[choice][group] for group in groups_names] for choice in choices], dtype=float)
+    max_rates[~overloaded] *= 0.15
+
+    # Triangle generation increasing until the middle simulation instant and decreasing after that
+    maximum_rate_instant = math.ceil(minutes/2)
+    instants = np.arange(0, minutes)
+    lower_steps = np.where(instants < maximum_rate_instant, instants, minutes - (instants + 1))
+    upper_steps = np.where(instants < maximum_rate_instant, instants + 1, minutes - instants)
+    steps_rates = (max_rates / maximum_rate_instant)[:, None, :]
+    groups_loads = load_gen.integers(np.floor(lower_steps[None, :, None] * steps_rates).astype(np.int64),
+                                     np.ceil(upper_steps[None, :, None] * steps_rates).astype(np.int64), endpoint=True)
+
+    # Random load of each function, normalized to sum up to the load of the group
+    loads = load_gen.integers(0, groups_loads[..., None], size=(*groups_loads.shape, max_functions), endpoint=True)
+    loads *= (np.arange(0, max_functions)[None, None, :] < groups_functions_number[:, :, None])[:, None]
+    loads_sum = loads.sum(axis=3, keepdims=True)
+    normalized_loads = np.where(loads_sum == 0, 0, loads * groups_loads[..., None] // np.maximum(loads_sum, 1))
+    # Adjust for rounding errors
+    normalized_loads[..., 0] += groups_loads - normalized_loads.sum(axis=3)
+
+    # Build the configurations with the same format of generate_configs
+    configurations = []
+    groups_loads, normalized_loads = groups_loads.tolist(), normalized_loads.tolist()
+    groups_order, nodes_groups_number = groups_order.tolist(), nodes_groups_number.tolist()
+    functions_order, groups_functions_number = functions_order.tolist(), groups_functions_number.tolist()
+    for node in range(0, nodes_number):
+        node_groups = groups_order[node][:nodes_groups_number[node]]
+        node_functions = {group: [config_manager.GROUPS[groups_names[group]][function]
+                                  for function in functions_order[node][group][:groups_functions_number[node][group]]]
+                          for group in node_groups}
+        node_config = {"node_type": str(choices[node]), "load": []}
+        for instant in range(0, minutes):
+            node_config["load"].append({
+                groups_names[group]: {
+                    "functions": [{"function_name": function_name, "function_rate": normalized_loads[node][instant][group][i]}
+                                  for i, function_name in enumerate(node_functions[group])],
+                    "total_rate": groups_loads[node][instant][group]
+                } for group in node_groups
+            })
+        configurations.append(node_config)
+
+    return configurations
+
 def gnp_random_connected_graph(n, p):
     """
     Generates a random undirected graph, similarly to an Erdős-Rényi
@@ -162,6 +239,185 @@ def gnp_random_connected_graph(n, p):
                 G.add_edge(*e)
     return G
 
+def fast_gnp_random_connected_graph(n, p, rng):
+    """
+    Generates a random connected graph with the same distribution of gnp_random_connected_graph
+    in O(N + E): each node is linked to a random node that follows it, and the pairs of nodes
+    linked with probability p are reached with geometric jumps, instead of testing each pair
+    """
+    keys = [el[0] for el in n]
+    nodes_number = len(keys)
+    G = nx.Graph()
+    G.add_nodes_from(n)
+    if p <= 0:
+        return G
+    if p >= 1:
+        return nx.complete_graph(n, create_using=G)
+
+    # Random edge from each node towards one of the following nodes
+    sources = np.arange(0, nodes_number - 1, dtype=np.int64)
+    forced_targets = rng.integers(sources + 1, nodes_number)
+
+    # Pairs (i, j) with i < j are numbered in row-major order, and the gap between two linked pairs is geometric
+    pairs_number = nodes_number * (nodes_number - 1) // 2
+    batch_size = max(1024, int(pairs_number * p * 1.1))
+    linked_pairs = []
+    last_pair = -1
+    while last_pair < pairs_number:
+        positions = last_pair + np.cumsum(rng.geometric(p, size=batch_size))
+        linked_pairs.append(positions[positions < pairs_number])
+        last_pair = positions[-1]
+    linked_pairs = np.concatenate(linked_pairs)
+
+    # Row i of the pairs starts at i * (2N - i - 1) / 2
+    rows_offsets = sources * (2 * nodes_number - sources - 1) // 2
+    rows = np.searchsorted(rows_offsets, linked_pairs, side="right") - 1
+    columns = linked_pairs - rows_offsets[rows] + rows + 1
+
+    edges = np.concatenate([np.column_stack([sources, forced_targets]), np.column_stack([rows, columns])])
+    add_edges(G, keys, edges)
+    return G
+
+def random_geometric_connected_graph(n, p, rng):
+    """
+    Generates a random geometric graph: nodes are placed uniformly in the unit square, where the
+    distance represents the latency, and linked when closer than a radius that gives about the same
+    mean degree of a gnp graph with probability p. Each disconnected component is linked to the
+    nearest node of the largest one
+    """
+    keys = [el[0] for el in n]
+    nodes_number = len(keys)
+    G = nx.Graph()
+    G.add_nodes_from(n)
+    if p <= 0 or nodes_number < 2:
+        return G
+    if p >= 1:
+        return nx.complete_graph(n, create_using=G)
+
+    points = rng.random((nodes_number, 2))
+    radius = math.sqrt(p * (nodes_number - 1) / (nodes_number * math.pi))
+    sources, targets, _ = close_pairs(points, radius)
+    add_edges(G, keys, np.column_stack([sources, targets]))
+    connect_components(G, keys, points)
+    return G
+
+def knn_connected_graph(n, p, rng):
+    """
+    Generates a k-nearest neighbours graph: nodes are placed uniformly in the unit square, where the
+    distance represents the latency, and each node is linked to the k = p * (N - 1) nearest ones.
+    Each disconnected component is linked to the nearest node of the largest one
+    """
+    keys = [el[0] for el in n]
+    nodes_number = len(keys)
+    G = nx.Graph()
+    G.add_nodes_from(n)
+    if p <= 0 or nodes_number < 2:
+        return G
+    if p >= 1:
+        return nx.complete_graph(n, create_using=G)
+
+    k = min(nodes_number - 1, max(1, round(p * (nodes_number - 1))))
+    points = rng.random((nodes_number, 2))
+
+    # Candidates are the nodes in a radius that contains about 4k nodes
+    sources, targets, distances = close_pairs(points, math.sqrt(4 * k / (nodes_number * math.pi)))
+    sources, targets = np.concatenate([sources, targets]), np.concatenate([targets, sources])
+    distances = np.concatenate([distances, distances])
+
+    # Keep the k nearest candidates of each node
+    order = np.lexsort((targets, distances, sources))
+    sources, targets = sources[order], targets[order]
+    candidates_number = np.bincount(sources, minlength=nodes_number)
+    rank = np.arange(0, len(sources)) - np.repeat(np.cumsum(candidates_number) - candidates_number, candidates_number)
+    edges = [np.column_stack([sources[rank < k], targets[rank < k]])]
+
+    # The few nodes with less than k candidates are compared with all the others
+    for node in np.nonzero(candidates_number < k)[0]:
+        node_distances = np.hypot(*(points - points[node]).T)
+        node_distances[node] = np.inf
+        nearest = np.argsort(node_distances, kind="stable")[:k]
+        edges.append(np.column_stack([np.full(k, node), nearest]))
+
+    add_edges(G, keys, np.concatenate(edges))
+    connect_components(G, keys, points)
+    return G
+
+def close_pairs(points, radius):
+    """
+    Find the pairs of points closer than radius, comparing only the points in the same or in
+    adjacent cells of a grid with side radius
+    Returns the indexes of the two points of each pair and their distance
+    """
+    cells_per_side = max(1, int(math.ceil(1 / radius)))
+    cells = np.minimum((points / radius).astype(np.int64), cells_per_side - 1)
+    cells_ids = cells[:, 0] * cells_per_side + cells[:, 1]
+    order = np.argsort(cells_ids, kind="stable")
+    sorted_cells_ids = cells_ids[order]
+
+    sources, targets = [], []
+    # Half of the adjacent cells, so that each pair of cells is compared only once
+    for dx, dy in [(0, 0), (0, 1), (1, -1), (1, 0), (1, 1)]:
+        neigh_x, neigh_y = cells[:, 0] + dx, cells[:, 1] + dy
+        valid = (neigh_x < cells_per_side) & (neigh_y >= 0) & (neigh_y < cells_per_side)
+        neigh_ids = neigh_x * cells_per_side + neigh_y
+        starts = np.searchsorted(sorted_cells_ids, neigh_ids, side="left")
+        counts = np.where(valid, np.searchsorted(sorted_cells_ids, neigh_ids, side="right") - starts, 0)
+
+        cell_sources = np.repeat(np.arange(0, len(points)), counts)
+        offsets = np.arange(0, counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        cell_targets = order[np.repeat(starts, counts) + offsets]
+        if dx == 0 and dy == 0:
+            same_cell = cell_sources < cell_targets
+            cell_sources, cell_targets = cell_sources[same_cell], cell_targets[same_cell]
+        sources.append(cell_sources)
+        targets.append(cell_targets)
+
+    sources, targets = np.concatenate(sources), np.concatenate(targets)
+    distances = np.hypot(*(points[sources] - points[targets]).T)
+    close = distances <= radius
+    return sources[close], targets[close], distances[close]
+
+def connect_components(G, keys, points):
+    """
+    Link each connected component of the graph to the nearest node of the largest component
+    """
+    indexes = {key: i for i, key in enumerate(keys)}
+    components = sorted((sorted(indexes[key] for key in component) for component in nx.connected_components(G)),
+                        key=len, reverse=True)
+    main_component = np.array(components[0])
+    for component in components[1:]:
+        best = None
+        for node in component:
+            distances = np.hypot(*(points[main_component] - points[node]).T)
+            nearest = np.argmin(distances)
+            if best is None or distances[nearest] < best[0]:
+                best = (distances[nearest], node, main_component[nearest])
+        G.add_edge(keys[best[1]], keys[best[2]])
+        main_component = np.concatenate([main_component, component])
+
+def add_edges(G, keys, edges):
+    """
+    Add to the graph the edges passed as pairs of node indexes, without duplicates and in sorted order
+    """
+    edges = np.unique(np.sort(edges, axis=1), axis=0)
+    G.add_edges_from((keys[i], keys[j]) for i, j in edges.tolist())
+
+def generate_graph(n, p, topology, seed):
+    """
+    Generate the graph of the nodes with the selected topology
+    The legacy "gnp" generator uses the random module, the others a NumPy generator with the passed seed
+    """
+    if topology == "gnp":
+        return gnp_random_connected_graph(n, p)
+    rng = np.random.default_rng(seed)
+    if topology == "fast_gnp":
+        return fast_gnp_random_connected_graph(n, p, rng)
+    if topology == "geometric":
+        return random_geometric_connected_graph(n, p, rng)
+    if topology == "knn":
+        return knn_connected_graph(n, p, rng)
+    raise Exception("Topology {} is not supported".format(topology))
+
 def plot_graph(G):
     """
     Plot graph and export on file
@@ -174,6 +430,7 @@ def plot_graph(G):
     if not os.path.exists(path):
         os.makedirs(path)
     plt.savefig(config_manager.OUTPUT_INSTANCE_GRAPH_FILE_PATH)
+    plt.close()
 
 def dict_key_substitution(data, old, new):
     """
@@ -255,38 +512,37 @@ def build_output_json(seed, nodes_num, edge_prob, overloaded_max_percentage, G):
 
     return instance
 
-def export_instance_file(instance):
+def export_instance_file(instance, instance_format="json"):
+    """
+    Export the instance as JSON file or as directory of arrays in compact format
+    """
+    if instance_format == "compact":
+        export_compact_instance(instance, config_manager.OUTPUT_INSTANCE_COMPACT_PATH)
+        return
     with open(config_manager.OUTPUT_INSTANCE_JSON_FILE_PATH, 'w', encoding='utf-8') as f:
         json.dump(instance, f, ensure_ascii=False, indent=4)
 
-def main():
-    # Get args passed as params
-    kargs = get_args()
-    print(kargs)
-    nodes_num = kargs["nodesnum"]
-    seed = kargs["seed"]
-    probability = kargs["edgeprob"]
-    overloaded_max_percentage = kargs["overloaded"]
-
-    # Assign default values to params if not defined
-    if nodes_num == -1:
-        nodes_num = 10
-    if seed == -1:
-        seed = np.random.randint(4097)
-    if probability == -1.0:
-        probability = 0.1
-    if overloaded_max_percentage == -1:
-        overloaded_max_percentage = 60
-
-    overloaded_max_percentage *= 0.01
-
+def generate_instance(nodes_num, probability, overloaded_max_percentage, seed, export=True, instance_format="json", topology="gnp",
+                      load_generator="legacy"):
+    """
+    Generate the instance with the passed parameters and return it as a dictionary,
+    with the same format of the instance file
+    :param: overloaded_max_percentage is expressed as a value between 0 and 1
+    :param: export allow to export the instance file and the graph image
+    :param: instance_format is the format of the exported instance (json, compact)
+    :param: topology is the generator of the graph (gnp, fast_gnp, geometric, knn)
+    :param: load_generator is the generator of the loads of the nodes (legacy, vectorized)
+    """
     #print(*(nodes_num, seed, probability, max_rates))
     # raise(Exception)
     random.seed(seed)
     np.random.seed(seed)
 
     # Load "nodes_num" configuration file
-    generated_configs = generate_configs(nodes_num, overloaded_max_percentage, seed)
+    if load_generator == "vectorized":
+        generated_configs = generate_configs_vectorized(nodes_num, overloaded_max_percentage, seed)
+    else:
+        generated_configs = generate_configs(nodes_num, overloaded_max_percentage, seed)
 
     # print(loaded_files)
     # Create a random graph with "nodes_num" nodes
@@ -297,10 +553,11 @@ def main():
         key = config_manager.NODE_KEY_PREFIX + str(i)
         nodes.append((key, {"config": config}))
     #print(nodes)
-    G = gnp_random_connected_graph(nodes, probability)
+    G = generate_graph(nodes, probability, topology, seed)
 
     # Export an image of graph
-    plot_graph(G)
+    if export:
+        plot_graph(G)
 
     # Print neighbor for each node
     # Utility print
@@ -312,7 +569,35 @@ def main():
     instance_json = build_output_json(seed, nodes_num, probability, overloaded_max_percentage, G)
 
     # Export instance file
-    export_instance_file(instance_json)
+    if export:
+        export_instance_file(instance_json, instance_format)
+
+    return instance_json
+
+def main():
+    # Get args passed as params
+    kargs = get_args()
+    print(kargs)
+    nodes_num = kargs["nodesnum"]
+    seed = kargs["seed"]
+    probability = kargs["edgeprob"]
+    overloaded_max_percentage = kargs["overloaded"]
+
+    # Assign default values to params if not defined
+    if nodes_num == -1:
+        nodes_num = 10
+    if seed == -1:
+        seed = np.random.randint(4097)
+    if probability == -1.0:
+        probability = 0.1
+    if overloaded_max_percentage == -1:
+        overloaded_max_percentage = 60
+
+    overloaded_max_percentage *= 0.01
+
+    # Generate and export the instance
+    generate_instance(nodes_num, probability, overloaded_max_percentage, seed, instance_format=kargs["format"],
+                      topology=kargs["topology"], load_generator=kargs["loadgen"])
 
 # Call the main program.
 if __name__ == "__main__":
@@ -0,0 +1,94 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+# Copyright 2021-2025 The DFaaS Authors. All rights reserved.
+# This file is licensed under the AGPL v3.0 or later license. See LICENSE and
+# AUTHORS file for more information.
+
+import os
+import json
+import time
+import numpy as np
+from configuration.config_manager import ConfigManager
+from model.model import Model
+from model.lookup_table_model import LookupTableModel
+from cli.cli import get_lookup_tables_compiler_args
+
+config_manager = ConfigManager()
+
+def get_grid_shape(max_rates):
+    """
+    Shape of the integer load grid: node types first, then the rates of each group (max rate included)
+    """
+    return (len(config_manager.NODES_TYPES_IN_MODELS), *[max_rates[group] + 1 for group in config_manager.GROUPS])
+
+def compile_table(metric, model_type, max_rates):
+    """
+    Evaluate a model over every point of the integer load grid and store the
+    predictions in a .npy table, that LookupTableModel reads with memory mapping
+    """
+    model = Model(metric, model_type)
+    shape = get_grid_shape(max_rates)
+    dtype = np.int8 if "overloaded" in metric else np.float64
+
+    path = LookupTableModel.table_path(metric, model_type)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    # The table is written in a temporary file, so that a partially compiled table is never used
+    tmp_path = path + ".tmp"
+    table = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=dtype, shape=shape)
+
+    # All the combinations of the rates of the groups after the first one
+    other_rates = np.indices(shape[2:]).reshape(len(shape) - 2, -1).T
+    features = np.zeros((len(other_rates), len(shape)))
+    features[:, 1:-1] = other_rates
+
+    # Predict a slice of the grid for each node type and each rate of the first group
+    for node_type in range(0, shape[0]):
+        features[:, -1] = node_type
+        for first_group_rate in range(0, shape[1]):
+            features[:, 0] = first_group_rate
+            table[node_type, first_group_rate] = np.ravel(model.predict(features)).reshape(shape[2:])
+
+    table.flush()
+    del table
+    os.replace(tmp_path, path)
+    return path
+
+def export_manifest(compiled_tables):
+    """
+    Export the description of the compiled tables, merged with the tables compiled by the previous runs
+    :param: compiled_tables are the entries of the compiled tables (fingerprint of the model and
+            max rates of the grid), indexed by their key in the manifest
+    """
+    manifest = LookupTableModel.load_manifest()
+    manifest["tables"].update(compiled_tables)
+    with open(LookupTableModel.manifest_path(), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=4)
+
+def main():
+    kargs = get_lookup_tables_compiler_args()
+    print(kargs)
+    max_rates = config_manager.LOOKUP_TABLES_MAX_RATES
+    print("> GRID SHAPE: {}".format(get_grid_shape(max_rates)))
+
+    compiled_tables = {}
+    for model_type in kargs["modeltype"]:
+        for metric in config_manager.PREDICTED_METRICS:
+            # The overloaded models do not depend on the model type
+            metric_model_type = model_type if "overloaded" not in metric else ""
+            key = LookupTableModel.table_key(metric, metric_model_type)
+            if key in compiled_tables:
+                continue
+
+            # The fingerprint links the table to the joblib files it is compiled from
+            fingerprint = LookupTableModel.get_model_fingerprint(metric, metric_model_type)
+            start = time.perf_counter()
+            path = compile_table(metric, metric_model_type, max_rates)
+            compiled_tables[key] = {"fingerprint": fingerprint, "max_rates": max_rates}
+            print("     > Compiled {} in {:0.2f} s".format(path, time.perf_counter() - start))
+
+            # The manifest is updated after each table, so that it describes the tables on disk even if a run is interrupted
+            export_manifest({key: compiled_tables[key]})
+
+# Call main program.
+if __name__ == "__main__":
+    main()
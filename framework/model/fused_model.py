@@ -0,0 +1,47 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+# Copyright 2021-2025 The DFaaS Authors. All rights reserved.
+# This file is licensed under the AGPL v3.0 or later license. See LICENSE and
+# AUTHORS file for more information.
+
+import numpy as np
+
+class FusedModel:
+    """
+    Class that predicts all the node metrics at once: the features are scaled only once
+    for all the models that share the same features scaler
+    """
+
+    def __init__(self, models, predictions_dtype):
+        """
+        :models: dict with the Model of each metric
+        :predictions_dtype: dtype of the structured array returned by predict
+        """
+        self.models = models
+        self._predictions_dtype = predictions_dtype
+
+        # Metrics grouped by the scaling of their features, the others are predicted one by one
+        self._scaling_groups = {}
+        self._single_metrics = []
+        for metric, model in models.items():
+            if model.supports_fast_path():
+                self._scaling_groups.setdefault(model.get_features_scaling_key(), []).append(metric)
+            else:
+                self._single_metrics.append(metric)
+
+    def predict(self, features_matrix):
+        """
+        Method used to predict all the metrics of a features matrix
+        :features_matrix: NumPy matrix with the rate of each group (in GROUPS_COLUMNS_NAMES order) followed by the node type
+        :return: structured array with a field for each metric
+        """
+        predictions = np.zeros(len(features_matrix), dtype=self._predictions_dtype)
+        for metrics in self._scaling_groups.values():
+            scaled_features = self.models[metrics[0]].scale_features(features_matrix)
+            for metric in metrics:
+                metric_predictions = self.models[metric].predict_scaled_features(scaled_features)
+                self.models[metric].validate_predictions(features_matrix, metric_predictions)
+                predictions[metric] = np.ravel(metric_predictions)
+
+        for metric in self._single_metrics:
+            predictions[metric] = np.ravel(self.models[metric].predict(features_matrix))
+        return predictions
@@ -0,0 +1,144 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+# Copyright 2021-2025 The DFaaS Authors. All rights reserved.
+# This file is licensed under the AGPL v3.0 or later license. See LICENSE and
+# AUTHORS file for more information.
+
+import os
+import json
+import hashlib
+import numpy as np
+import pandas as pd
+
+from configuration.config_manager import ConfigManager
+from model.model import Model
+
+class LookupTableModel:
+    """
+    Class that answers the predictions of a model by indexing the table precompiled
+    by lookup_tables_compiler.py over the integer load grid.
+    Rows outside the grid (or with non integer rates) are predicted by the original model
+    """
+
+    __config_manager = ConfigManager()
+
+    def __init__(self, metric, model_type):
+        self.metric = metric
+        self.model_type = model_type
+
+        # The grid must have been compiled with the same features of the models
+        entry = self.get_manifest_entry(metric, model_type)
+        if entry is None:
+            raise Exception("Lookup table of {} {} has not been compiled for the current features, run lookup_tables_compiler.py again".format(metric, model_type))
+
+        # Table indexed by [node_type, rate_group_1, ..., rate_group_n], memory mapped to load only the used pages
+        self.table = np.load(self.table_path(metric, model_type), mmap_mode="r")
+        if self.table.shape != (len(self.__config_manager.NODES_TYPES_IN_MODELS), *[entry["max_rates"][group] + 1 for group in self.__config_manager.GROUPS]):
+            raise Exception("Lookup table of {} {} does not match its manifest, run lookup_tables_compiler.py again".format(metric, model_type))
+
+        # Model used for the rows outside the grid, loaded only if needed
+        self._fallback_model = None
+
+    @classmethod
+    def table_path(cls, metric, model_type):
+        """
+        Method used to get the path of the table of a model
+        :metric: the metric predicted by the model
+        :model_type: the type of the model ("" for the overloaded metrics)
+        """
+        return os.path.join(cls.__config_manager.LOOKUP_TABLES_BASE_PATH, cls.table_key(metric, model_type))
+
+    @classmethod
+    def table_key(cls, metric, model_type):
+        """
+        Method used to get the key of the table of a model in the manifest (its path relative to the tables directory)
+        """
+        return os.path.join(metric, model_type, "table.npy")
+
+    @classmethod
+    def manifest_path(cls):
+        """
+        Method used to get the path of the manifest that describes the compiled tables
+        """
+        return os.path.join(cls.__config_manager.LOOKUP_TABLES_BASE_PATH, "manifest.json")
+
+    @classmethod
+    def load_manifest(cls):
+        """
+        Method used to load the manifest of the compiled tables
+        The tables are discarded if they have been compiled for different features or by an older compiler
+        """
+        manifest = {
+            "columns": [*cls.__config_manager.GROUPS_COLUMNS_NAMES, "node_type"],
+            "nodes_types": cls.__config_manager.NODES_TYPES_IN_MODELS,
+            "tables": {}
+        }
+        if not os.path.exists(cls.manifest_path()):
+            return manifest
+
+        with open(cls.manifest_path()) as f:
+            stored_manifest = json.load(f)
+        if stored_manifest.get("columns") == manifest["columns"] and stored_manifest.get("nodes_types") == manifest["nodes_types"] \
+                and isinstance(stored_manifest.get("tables"), dict):
+            manifest["tables"] = stored_manifest["tables"]
+        return manifest
+
+    @classmethod
+    def get_manifest_entry(cls, metric, model_type):
+        """
+        Method used to get the entry of the table of a model in the manifest (fingerprint of the model
+        and max rates of the grid), None if the table has not been compiled for the current features
+        """
+        return cls.load_manifest()["tables"].get(cls.table_key(metric, model_type))
+
+    @classmethod
+    def get_model_fingerprint(cls, metric, model_type):
+        """
+        Method used to get the fingerprint of the joblib files of a model (model and scalers),
+        that changes when one of them is retrained or replaced
+        """
+        digest = hashlib.sha256()
+        for name, path in sorted(Model.get_files(metric, model_type).items()):
+            if path is None:
+                continue
+            with open(path, "rb") as f:
+                digest.update(name.encode("utf-8") + hashlib.sha256(f.read()).digest())
+        return digest.hexdigest()
+
+    @classmethod
+    def is_compiled(cls, metric, model_type):
+        """
+        Method used to check if the table of a model has been compiled from the current joblib files of the model
+        """
+        if not os.path.exists(cls.table_path(metric, model_type)):
+            return False
+
+        entry = cls.get_manifest_entry(metric, model_type)
+        if entry is None or entry["fingerprint"] != cls.get_model_fingerprint(metric, model_type):
+            print("> LOOKUP TABLE {} IS STALE, the model is used instead (run lookup_tables_compiler.py again)".format(cls.table_key(metric, model_type)))
+            return False
+        return True
+
+    def predict(self, input_data):
+        columns = [*self.__config_manager.GROUPS_COLUMNS_NAMES, "node_type"]
+        if isinstance(input_data, pd.DataFrame):
+            features = input_data[columns].to_numpy(dtype=float)
+        else:
+            features = np.asarray(input_data, dtype=float).reshape(-1, len(columns))
+
+        # Move the node type in the first column, as in the table
+        indexes = np.roll(features, 1, axis=1)
+        in_grid = np.all((indexes == np.floor(indexes)) & (indexes >= 0) & (indexes < self.table.shape), axis=1)
+
+        predictions = np.empty(len(features), dtype=self.table.dtype)
+        grid_indexes = indexes[in_grid].astype(np.intp)
+        predictions[in_grid] = self.table[tuple(grid_indexes.T)]
+
+        if not np.all(in_grid):
+            if self._fallback_model is None:
+                self._fallback_model = Model(self.metric, self.model_type)
+            predictions[~in_grid] = np.ravel(self._fallback_model.predict(features[~in_grid]))
+
+        # Keep the same shape returned by Model
+        if "overloaded" in self.metric:
+            return predictions
+        return predictions.reshape(-1, 1)
@@ -6,6 +6,7 @@
 import joblib
 import pandas as pd
 import numpy as np
+from sklearn.preprocessing import MinMaxScaler
 
 from configuration.config_manager import ConfigManager
 
@@ -13,22 +14,160 @@ class Model:
 
     __config_manager = ConfigManager()
 
-    def __init__(self, metric, model_type):
+    def __init__(self, metric, model_type, loaded_files=None):
+        """
+        :metric: the metric predicted by the model
+        :model_type: the type of the model ("" for the overloaded metrics)
+        :loaded_files: dict with the content of the joblib files already loaded (by ModelRegistry), indexed by path
+        """
         self.metric = metric
         self.model_type = model_type
 
-        # Load the model by the joblib file produced by the forecaster
-        self.model = joblib.load(self.__config_manager.MODEL_BASE_PATH + metric + "/" + model_type + "/model.joblib")
+        # Load the model and the scalers by the joblib files produced by the forecaster, if not already loaded
+        files = self.get_files(metric, model_type)
+        loaded_files = loaded_files if loaded_files is not None else {}
+        self.model = loaded_files[files["model"]] if files["model"] in loaded_files else joblib.load(files["model"])
+        self.features_scaler = loaded_files[files["features_scaler"]] if files["features_scaler"] in loaded_files else joblib.load(files["features_scaler"])
+        if files["target_scaler"] is None:
+            self.target_scaler = None
+        else:
+            self.target_scaler = loaded_files[files["target_scaler"]] if files["target_scaler"] in loaded_files else joblib.load(files["target_scaler"])
+
+        # Parameters of scalers and model extracted in plain NumPy, None if the fast path is not supported
+        self._fast_path = self.__build_fast_path() if self.__config_manager.USE_MODEL_FAST_PATH else None
+
+    @classmethod
+    def get_files(cls, metric, model_type):
+        """
+        Method used to get the paths of the joblib files of model, features scaler and target scaler
+        :metric: the metric predicted by the model
+        :model_type: the type of the model ("" for the overloaded metrics)
+        """
+        files = {"model": cls.__config_manager.MODEL_BASE_PATH + metric + "/" + model_type + "/model.joblib"}
 
-        # For the overloaded metric, load only the scaler of the features
+        # For the overloaded metric, there is only the scaler of the features
         if "overloaded" in metric:
-            self.features_scaler = joblib.load(self.__config_manager.SCALER_BASE_PATH + "scaler_x/" + metric + ".joblib")
-            self.target_scaler = None
+            files["features_scaler"] = cls.__config_manager.SCALER_BASE_PATH + "scaler_x/" + metric + ".joblib"
+            files["target_scaler"] = None
         else:
-            self.features_scaler = joblib.load(self.__config_manager.SCALER_BASE_PATH + "scaler_x/features.joblib")
-            self.target_scaler = joblib.load(self.__config_manager.SCALER_BASE_PATH + "scaler_y/" + metric + ".joblib")
+            files["features_scaler"] = cls.__config_manager.SCALER_BASE_PATH + "scaler_x/features.joblib"
+            files["target_scaler"] = cls.__config_manager.SCALER_BASE_PATH + "scaler_y/" + metric + ".joblib"
+        return files
+
+    def __build_fast_path(self):
+        """
+        Method used to extract the fitted parameters of the scalers and of the model.
+        Returns None if scalers or model are not supported, so that the sklearn path is used
+        """
+        columns = [*self.__config_manager.GROUPS_COLUMNS_NAMES, "node_type"]
+        if not isinstance(self.features_scaler, MinMaxScaler) or list(getattr(self.features_scaler, "feature_names_in_", columns)) != columns:
+            return None
+        if self.target_scaler is not None and not isinstance(self.target_scaler, MinMaxScaler):
+            return None
+
+        fast_path = {
+            "features_scale": np.asarray(self.features_scaler.scale_, dtype=float),
+            "features_min": np.asarray(self.features_scaler.min_, dtype=float),
+            "features_clip": self.features_scaler.clip,
+            "features_range": self.features_scaler.feature_range
+        }
+        if self.target_scaler is not None:
+            fast_path["target_scale"] = float(self.target_scaler.scale_[0])
+            fast_path["target_min"] = float(self.target_scaler.min_[0])
+
+        # Tree models are evaluated by the LightGBM booster, linear models by their coefficients
+        if hasattr(self.model, "booster_"):
+            fast_path["booster"] = self.model.booster_
+        elif hasattr(self.model, "coef_") and not hasattr(self.model, "classes_"):
+            fast_path["coef"] = np.asarray(self.model.coef_, dtype=float).reshape(-1)
+            fast_path["intercept"] = float(np.ravel(self.model.intercept_)[0])
+        else:
+            return None
+        if hasattr(self.model, "classes_"):
+            fast_path["classes"] = np.asarray(self.model.classes_)
+        return fast_path
 
     def predict(self, input_data):
+        """
+        Method used to predict the metric of each row of the features
+        :input_data: DataFrame with the features columns, or NumPy matrix with the rate of each
+                     group (in GROUPS_COLUMNS_NAMES order) followed by the node type
+        """
+        if self._fast_path is None:
+            return self.__predict_sklearn(input_data)
+
+        predictions = self.predict_scaled_features(self.scale_features(input_data))
+        self.validate_predictions(input_data, predictions)
+        return predictions
+
+    def supports_fast_path(self):
+        """
+        Method used to check if the model can be evaluated with scale_features and predict_scaled_features
+        """
+        return self._fast_path is not None
+
+    def get_features_scaling_key(self):
+        """
+        Method used to get a key that is equal for all the models with the same features scaling
+        """
+        return (self._fast_path["features_scale"].tobytes(), self._fast_path["features_min"].tobytes(),
+                self._fast_path["features_clip"], tuple(self._fast_path["features_range"]))
+
+    def validate_predictions(self, input_data, predictions):
+        """
+        Method used to check that the fast path predictions are equal to the sklearn ones,
+        only if VALIDATE_MODEL_FAST_PATH is enabled
+        """
+        if self.__config_manager.VALIDATE_MODEL_FAST_PATH:
+            sklearn_predictions = self.__predict_sklearn(input_data)
+            if not np.array_equal(predictions, sklearn_predictions):
+                raise Exception("Fast path predictions of model {} {} differ from the sklearn ones".format(self.metric, self.model_type))
+
+    def scale_features(self, input_data):
+        """
+        Method used to scale the features as array operations, in the same order used by sklearn
+        :input_data: DataFrame or NumPy matrix of the features, as in predict
+        """
+        if isinstance(input_data, pd.DataFrame):
+            features = input_data[[*self.__config_manager.GROUPS_COLUMNS_NAMES, "node_type"]].to_numpy(dtype=float)
+        else:
+            features = np.array(input_data, dtype=float).reshape(-1, len(self.__config_manager.GROUPS_COLUMNS_NAMES) + 1)
+
+        # Scale input dataset
+        features *= self._fast_path["features_scale"]
+        features += self._fast_path["features_min"]
+        if self._fast_path["features_clip"]:
+            np.clip(features, self._fast_path["features_range"][0], self._fast_path["features_range"][1], out=features)
+        return features
+
+    def predict_scaled_features(self, features):
+        """
+        Method used to evaluate model and inverse scaling of the target as array operations,
+        in the same order used by sklearn so that the results are the same
+        :features: features already scaled by scale_features, not modified
+        """
+        if "booster" in self._fast_path:
+            scaled_predictions = self._fast_path["booster"].predict(features)
+        else:
+            scaled_predictions = features @ self._fast_path["coef"] + self._fast_path["intercept"]
+
+        # Classifiers return the class with the highest probability
+        if "classes" in self._fast_path:
+            if scaled_predictions.ndim == 1:
+                scaled_predictions = np.vstack((1. - scaled_predictions, scaled_predictions)).transpose()
+            return self._fast_path["classes"][np.argmax(scaled_predictions, axis=1)]
+
+        original_predictions = scaled_predictions.reshape(-1, 1)
+        original_predictions -= self._fast_path["target_min"]
+        original_predictions /= self._fast_path["target_scale"]
+        return np.round(original_predictions, 2)
+
+    def __predict_sklearn(self, input_data):
+        # The sklearn scaler expects the features names
+        if not isinstance(input_data, pd.DataFrame):
+            input_data = pd.DataFrame(np.asarray(input_data, dtype=float).reshape(-1, len(self.__config_manager.GROUPS_COLUMNS_NAMES) + 1),
+                                      columns=[*self.__config_manager.GROUPS_COLUMNS_NAMES, "node_type"])
+
         # Scale input dataset
         input_data_scaled = self.features_scaler.transform(input_data)
 
@@ -40,9 +179,3 @@ class Model:
         else:
             original_predictions = self.target_scaler.inverse_transform(scaled_predictions.reshape(-1,1))
             return np.round(original_predictions,2)
-        
-
-
-        
-
-    
@@ -5,6 +5,11 @@
 
 from configuration.config_manager import ConfigManager
 from model.model import Model
+from model.fused_model import FusedModel
+from model.model_registry import ModelRegistry
+from model.lookup_table_model import LookupTableModel
+from collections import OrderedDict
+import numpy as np
 import pandas as pd
 
 class ModelProxy:
@@ -12,29 +17,90 @@ class ModelProxy:
     Class used as handler of all the models created by the forecaster
     """
     _config_manager = ConfigManager()
-    _models = []
+
+    # Models already created, indexed by (metric, model type), with the model type "" for the overloaded metrics
+    _models = {}
+
+    # Registry used to load the joblib files of the models, created when the first model is loaded
+    _registry = None
+
+    # Evaluator of all the metrics for each model type, None if some models are lookup tables
+    _fused_models = {}
+
+    # LRU cache of the node predictions, shared by all the proxies (so by all strategies, agents and minutes).
+    # Keys are (model type, integer group rates + node type), values are the predictions of all the metrics
+    _predictions_cache = OrderedDict()
+    _cache_hits = 0
+    _cache_misses = 0
 
     def __init__(self):
         self._model_type = None
 
-    def _create_model(self, metric):
-        if "overloaded" not in metric:
-            return Model(metric, self._model_type)
-        else:
-            return Model(metric, "")
+    @classmethod
+    def _get_registry(cls):
+        if cls._registry is None:
+            cls._registry = ModelRegistry()
+        return cls._registry
+
+    @classmethod
+    def _get_model_key(cls, metric, model_type):
+        """
+        Method used to get the key of a model in the models dict
+        """
+        return (metric, model_type if "overloaded" not in metric else "")
+
+    @classmethod
+    def preload_models(cls, model_types, workers=None):
+        """
+        Method used to load in parallel all the models of the selected model types, before any prediction
+        :model_types: list of model types
+        :workers: number of threads used to load the files (MODEL_REGISTRY_LOAD_WORKERS by default)
+        Returns the load time of each file loaded until now
+        """
+        keys_to_load = []
+        for model_type in model_types:
+            for metric in cls._config_manager.PREDICTED_METRICS:
+                key = cls._get_model_key(metric, model_type)
+                if key in cls._models or key in keys_to_load:
+                    continue
+                # Prefer the precompiled lookup table of the model, if available
+                if cls._config_manager.USE_LOOKUP_TABLES and LookupTableModel.is_compiled(*key):
+                    cls._models[key] = LookupTableModel(*key)
+                else:
+                    keys_to_load.append(key)
+
+        cls._models.update(cls._get_registry().load(keys_to_load, workers))
+        return cls._get_registry().get_load_times()
+
+    def _create_model(self, key):
+        # Prefer the precompiled lookup table of the model, if available
+        if self._config_manager.USE_LOOKUP_TABLES and LookupTableModel.is_compiled(*key):
+            return LookupTableModel(*key)
+        return self._get_registry().load([key])[key]
         
     def _get_model(self, metric):
         """
-        Method used to find a particular model in the list
+        Method used to find a particular model, creating it the first time it is requested
         :metric: the metric predicted by the model
         """
-        for model in self._models:
-            if model.metric == metric and ("overloaded" in model.metric or model.model_type == self._model_type): 
-                return model
-        model = self._create_model(metric)
-        self._models.append(model)
+        key = self._get_model_key(metric, self._model_type)
+        model = self._models.get(key)
+        if model is None:
+            model = self._create_model(key)
+            self._models[key] = model
         return model
-        #raise Exception("It has not been possible to find the requested model") 
+
+    def _get_fused_model(self):
+        """
+        Method used to get the evaluator of all the metrics for the current model type
+        """
+        if self._model_type not in self._fused_models:
+            models = {metric: self._get_model(metric) for metric in self._config_manager.PREDICTED_METRICS}
+            if all(isinstance(model, Model) for model in models.values()):
+                self._fused_models[self._model_type] = FusedModel(models, self._predictions_dtype())
+            else:
+                self._fused_models[self._model_type] = None
+        return self._fused_models[self._model_type]
         
     
     def _process_input(self, input_data):
@@ -73,13 +139,141 @@ class ModelProxy:
         Method used get predictions of the all node metrics
         :input_data: features values
         """
-        predictions = pd.DataFrame(index=range(0,1))
-        
-        # Iterate over all the metric of the node
+        # Check if the features are already in the correct structure
+        if isinstance(input_data, np.ndarray):
+            features_row = input_data
+        elif isinstance(input_data, dict):
+            features_row = self.build_features_vector(input_data)
+        else:
+            features_row = input_data[[*self._config_manager.GROUPS_COLUMNS_NAMES, "node_type"]].to_numpy()[0]
+        return pd.DataFrame(self.get_node_predictions_batch(features_row))
+
+    def build_features_vector(self, input_data):
+        """
+        Method used to transform a features dict in the vector accepted by get_node_predictions_vector
+        :input_data: dict with the load of the groups and the node type
+        """
+        return self.build_features_matrix([input_data])[0]
+
+    def get_node_predictions_vector(self, features_vector):
+        """
+        Method used get predictions of the all node metrics for a single features vector, without building any DataFrame
+        :features_vector: NumPy vector with the rate of each group (in GROUPS_COLUMNS_NAMES order) followed by the node type
+        :return: record with a field for each metric in PREDICTED_METRICS
+        """
+        return self.get_node_predictions_batch(features_vector)[0]
+
+    @classmethod
+    def build_predictions_record(cls, node_metrics):
+        """
+        Method used to transform the metrics of a node in the record returned by get_node_predictions_vector
+        :node_metrics: dict with the value of each metric in PREDICTED_METRICS
+        """
+        values = tuple(node_metrics[metric] for metric in cls._config_manager.PREDICTED_METRICS)
+        return np.array([values], dtype=cls._predictions_dtype())[0]
+
+    def build_features_matrix(self, input_data_list):
+        """
+        Method used to transform a list of features dicts in the matrix accepted by get_node_predictions_batch
+        :input_data_list: list of dicts, each one with the load of the groups and the node type
+        """
+        features_matrix = np.zeros((len(input_data_list), len(self._config_manager.GROUPS) + 1))
+        for row, input_data in enumerate(input_data_list):
+            for column, group in enumerate(self._config_manager.GROUPS):
+                features_matrix[row, column] = input_data.get(group, 0)
+            features_matrix[row, -1] = input_data["node_type"]
+        return features_matrix
+
+    def get_node_predictions_batch(self, features_matrix):
+        """
+        Method used get predictions of the all node metrics for many rows of features at once.
+        Rows already in the predictions cache are not predicted again; the others require a single
+        scaler transform and a single model predict for each metric
+        :features_matrix: NumPy matrix with a row for each prediction, with the rate of each group
+                          (in GROUPS_COLUMNS_NAMES order) followed by the node type
+        :return: structured array with a field for each metric in PREDICTED_METRICS
+        """
+        features_matrix = np.asarray(features_matrix, dtype=float).reshape(-1, len(self._config_manager.GROUPS) + 1)
+        predictions = np.zeros(len(features_matrix), dtype=self._predictions_dtype())
+
+        # Only rows with integer rates are cached, since their number is bounded
+        cache_enabled = self._config_manager.PREDICTIONS_CACHE_SIZE > 0
+        cacheable = np.all(features_matrix == np.floor(features_matrix), axis=1) if cache_enabled else np.zeros(len(features_matrix), dtype=bool)
+        keys = {}
+        rows_to_predict = []
+        for row in range(0, len(features_matrix)):
+            if cacheable[row]:
+                key = (self._model_type, tuple(features_matrix[row].astype(np.int64).tolist()))
+                cached_predictions = self._predictions_cache.get(key)
+                if cached_predictions is not None:
+                    self._predictions_cache.move_to_end(key)
+                    ModelProxy._cache_hits += 1
+                    predictions[row] = cached_predictions
+                    continue
+                ModelProxy._cache_misses += 1
+                keys[row] = key
+            rows_to_predict.append(row)
+
+        if len(rows_to_predict) > 0:
+            predictions[rows_to_predict] = self._predict_matrix(features_matrix[rows_to_predict])
+            for row, key in keys.items():
+                self._cache_predictions(key, predictions[row].tolist())
+        return predictions
+
+    def _predict_matrix(self, features_matrix):
+        """
+        Method used to predict all the node metrics of a features matrix, without using the cache
+        :features_matrix: NumPy matrix with a row for each prediction
+        """
+        # Features are scaled once for all the metrics, unless the lookup tables are used
+        fused_model = self._get_fused_model()
+        if fused_model is not None:
+            return fused_model.predict(features_matrix)
+
+        predictions = np.zeros(len(features_matrix), dtype=self._predictions_dtype())
         for metric in self._config_manager.PREDICTED_METRICS:
-            predictions[metric] = self.get_predictions(input_data, metric)
+            predictions[metric] = np.ravel(self._get_model(metric).predict(features_matrix))
         return predictions
-    
+
+    def _cache_predictions(self, key, values):
+        """
+        Method used to insert predictions in the cache, evicting the least recently used entry when it is full
+        :key: (model type, features) tuple
+        :values: tuple with the predictions of all the metrics
+        """
+        self._predictions_cache[key] = values
+        self._predictions_cache.move_to_end(key)
+        if len(self._predictions_cache) > self._config_manager.PREDICTIONS_CACHE_SIZE:
+            self._predictions_cache.popitem(last=False)
+
+    @classmethod
+    def get_cache_stats(cls):
+        """
+        Method used to get hits, misses, hit rate and size of the predictions cache
+        """
+        requests = cls._cache_hits + cls._cache_misses
+        return {
+            "hits": cls._cache_hits,
+            "misses": cls._cache_misses,
+            "hit_rate": cls._cache_hits / requests if requests > 0 else 0.0,
+            "size": len(cls._predictions_cache)
+        }
+
+    @classmethod
+    def clear_cache(cls):
+        """
+        Method used to empty the predictions cache and reset its counters
+        """
+        cls._predictions_cache.clear()
+        cls._cache_hits = 0
+        cls._cache_misses = 0
+
+    @classmethod
+    def _predictions_dtype(cls):
+        """
+        Method used to get the dtype of the batch predictions (overloaded metrics are classes, the others are values)
+        """
+        return [(metric, np.int64 if "overloaded" in metric else np.float64) for metric in cls._config_manager.PREDICTED_METRICS]
 
     def transform_functions_in_groups(self, functions_data):
         """
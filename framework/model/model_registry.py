@@ -0,0 +1,81 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+# Copyright 2021-2025 The DFaaS Authors. All rights reserved.
+# This file is licensed under the AGPL v3.0 or later license. See LICENSE and
+# AUTHORS file for more information.
+
+import time
+import joblib
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+
+from configuration.config_manager import ConfigManager
+from model.model import Model
+
+class ModelRegistry:
+    """
+    Registry of the models produced by the forecaster. The manifest describes the joblib files
+    of each metric and model type; the files are loaded in parallel, and only once even if
+    shared by many models (e.g. the features scaler)
+    """
+
+    __config_manager = ConfigManager()
+
+    def __init__(self):
+        self.manifest = self.build_manifest()
+
+        # Content and load time of each joblib file already loaded, indexed by path
+        self._loaded_files = {}
+        self._load_times = {}
+
+    @classmethod
+    def build_manifest(cls):
+        """
+        Method used to describe the files of all the metrics and model types
+        Returns a dict indexed by (metric, model type), with the model type "" for the overloaded metrics
+        """
+        manifest = {}
+        for metric in cls.__config_manager.PREDICTED_METRICS:
+            # The overloaded models do not depend on the model type
+            model_types = [""] if "overloaded" in metric else cls.__config_manager.MODEL_TYPES
+            for model_type in model_types:
+                manifest[(metric, model_type)] = Model.get_files(metric, model_type)
+        return manifest
+
+    def load(self, entries, workers=None):
+        """
+        Method used to create the models of some entries of the manifest, loading their files in parallel
+        :entries: list of (metric, model type) keys of the manifest
+        :workers: number of threads used to load the files (MODEL_REGISTRY_LOAD_WORKERS by default)
+        Returns a dict with the Model of each entry
+        """
+        if workers is None:
+            workers = self.__config_manager.MODEL_REGISTRY_LOAD_WORKERS
+
+        paths = []
+        for entry in entries:
+            for path in self.manifest[entry].values():
+                if path is not None and path not in self._loaded_files and path not in paths:
+                    paths.append(path)
+
+        if len(paths) > 0:
+            with ThreadPoolExecutor(max_workers=min(workers, len(paths))) as executor:
+                for path, (content, load_time) in zip(paths, executor.map(self.__load_file, paths)):
+                    self._loaded_files[path] = content
+                    self._load_times[path] = load_time
+
+        return {entry: Model(entry[0], entry[1], self._loaded_files) for entry in entries}
+
+    def __load_file(self, path):
+        """
+        Method used to load a joblib file, returning its content and the load time
+        """
+        start = time.perf_counter()
+        content = joblib.load(path, mmap_mode=self.__config_manager.MODEL_REGISTRY_MMAP_MODE)
+        return content, time.perf_counter() - start
+
+    def get_load_times(self):
+        """
+        Method used to get the load time of each file, from the slowest one
+        """
+        load_times = pd.Series(self._load_times, name="Load time (s)", dtype=float)
+        return load_times.sort_values(ascending=False)
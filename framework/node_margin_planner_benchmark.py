@@ -0,0 +1,85 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+# Copyright 2021-2025 The DFaaS Authors. All rights reserved.
+# This file is licensed under the AGPL v3.0 or later license. See LICENSE and
+# AUTHORS file for more information.
+
+import logging
+import time
+import pandas as pd
+from agent.agent import Agent
+from configuration.config_manager import ConfigManager
+from factory.strategy_factory import StrategyFactory
+from context.minute_context import MinuteContext
+from context.instance_index import InstanceIndex
+from utils.compact_instance import load_instance
+from model.model_proxy import ModelProxy
+from simulation import build_minute_config
+from cli.cli import get_node_margin_planner_benchmark_args
+
+config_manager = ConfigManager()
+
+def count_predictions():
+    """
+    Number of node predictions requested to the model proxy (answered by the cache or by the models)
+    """
+    stats = ModelProxy.get_cache_stats()
+    return stats["hits"] + stats["misses"]
+
+def benchmark_planner(planner, minute_configs, instance_index, nodes_number, model_proxy):
+    """
+    Run the node margin strategy of all the nodes in all the minutes with the selected planner
+    Returns the number of predictions, the execution time and the requests forwarded to the neighbours
+    """
+    logger = logging.getLogger("node_margin_planner_benchmark")
+    logger.addHandler(logging.NullHandler())
+    logger.propagate = False
+
+    # Each planner starts with an empty cache
+    ModelProxy.clear_cache()
+    predictions_before = count_predictions()
+    forwarded_requests = 0
+
+    start = time.perf_counter()
+    for minute_config, invoc_rate_table in minute_configs:
+        minute_context = MinuteContext(minute_config, instance_index)
+        for id in range(0, nodes_number):
+            key = config_manager.NODE_KEY_PREFIX + str(id)
+            strategy = StrategyFactory.create_strategy(config_manager.NODE_MARGIN_STRATEGY, key, minute_config, minute_context)
+            strategy.set_planner(planner)
+            weights = Agent(id, logger, strategy, model_proxy).run()
+
+            # Requests of each function forwarded to the neighbours
+            for func, weights_x_node in weights.items():
+                rate = invoc_rate_table[config_manager.FUNCTION_NAMES.index(func), id]
+                forwarded_requests += sum(int(weight * rate) for node, weight in weights_x_node.items() if node != key)
+    execution_time = time.perf_counter() - start
+
+    return count_predictions() - predictions_before, execution_time, forwarded_requests
+
+def main():
+    kargs = get_node_margin_planner_benchmark_args()
+    print(kargs)
+
+    model_proxy = ModelProxy()
+    model_proxy.set_model_type(kargs["modeltype"])
+
+    # Read the instance produced by the instance generator
+    config_file = load_instance(kargs["instanceformat"])
+    nodes_number = config_file["nodes_number"]
+
+    # Configurations of all the minutes are built before the measurements
+    minute_configs = [build_minute_config(nodes_number, config_file, minute, model_proxy)
+                      for minute in range(0, config_manager.SIMULATION_MINUTES)]
+    instance_index = InstanceIndex(config_file)
+
+    results = pd.DataFrame(index=["Predictions", "Execution time (s)", "Forwarded requests"])
+    for planner in config_manager.NODE_MARGIN_PLANNERS:
+        print("> Benchmark of planner {}...".format(planner))
+        results[planner] = benchmark_planner(planner, minute_configs, instance_index, nodes_number, model_proxy)
+
+    print("> NODE MARGIN PLANNERS COMPARISON")
+    print(results.T)
+
+# Call main program.
+if __name__ == "__main__":
+    main()
@@ -4,15 +4,22 @@
 # AUTHORS file for more information.
 
 import logging
+import random
 import time
 import json
 import pandas as pd
 import numpy as np
+from scipy import sparse
 from agent.agent import Agent
 from configuration.config_manager import ConfigManager
 from factory.strategy_factory import StrategyFactory
+from context.minute_context import MinuteContext
+from context.instance_index import InstanceIndex
+from utils.compact_instance import load_instance
 from model.model_proxy import ModelProxy
 from cli.cli import get_analyzer_and_simulator_args
+from utils.results_file import export_results_file
+from concurrent.futures import ProcessPoolExecutor
 import os
 
 config_manager = ConfigManager()
@@ -27,63 +34,94 @@ def create_path_if_not_exists(path):
 def get_logger(name, log_file, level=logging.DEBUG):
     """
     Get logger for agent logging
+    If the log file is None the messages are discarded
     """
-    handler = logging.FileHandler(log_file)
+    handler = logging.FileHandler(log_file) if log_file is not None else logging.NullHandler()
     logger = logging.getLogger(name)
+    # Remove the handlers of a previous simulation executed in the same process
+    close_logger(logger)
     logger.setLevel(level)
     logger.addHandler(handler)
 
     return logger
 
-def complete_fwd_table(weights, invoc_rate_table):
+def close_logger(logger):
+    """
+    Close and remove all the handlers of a logger
+    """
+    for handler in list(logger.handlers):
+        handler.close()
+        logger.removeHandler(handler)
 
-    fwd_requests = {}
+def get_nodes_keys(nodes_number):
+    """
+    Keys of the nodes, in the order used to index the rows and the columns of the tensors
+    """
+    return [config_manager.NODE_KEY_PREFIX + str(i) for i in range(0, nodes_number)]
 
-    # Transform the weights in requests by applying weights * invoc_rate_table
+def build_weights_matrices(weights, nodes_number):
+    """
+    Build the sparse matrices of the weights of a strategy, one for each function, indexed by (node from, node to)
+    Only the weights towards the nodes reached by each node are stored
+    """
+    nodes_index = {key: i for i, key in enumerate(get_nodes_keys(nodes_number))}
+    functions_index = {func: f for f, func in enumerate(config_manager.FUNCTION_NAMES)}
+
+    rows = [[] for _ in config_manager.FUNCTION_NAMES]
+    columns = [[] for _ in config_manager.FUNCTION_NAMES]
+    values = [[] for _ in config_manager.FUNCTION_NAMES]
     for node_from, weights_x_func in weights.items():
-        fwd_requests[node_from] = {}
         for func, weights_x_node in weights_x_func.items():
-            fwd_requests[node_from][func] = {}
+            f = functions_index[func]
             for node_to, weight in weights_x_node.items():
-                fwd_requests[node_from][func][node_to] = int(weight * invoc_rate_table[node_from][func])
-        
+                rows[f].append(nodes_index[node_from])
+                columns[f].append(nodes_index[node_to])
+                values[f].append(weight)
 
-    # Fill forwarding table with missing functions
-    for node_from, weights_x_func in fwd_requests.items():
-        for f in config_manager.FUNCTION_NAMES:
-            if f not in list(weights_x_func.keys()):
-                fwd_requests[node_from][f] = {}
+    return [sparse.csr_matrix((np.asarray(values[f], dtype=np.float64), (np.asarray(rows[f], dtype=np.intp),
+                              np.asarray(columns[f], dtype=np.intp))), shape=(nodes_number, nodes_number))
+            for f in range(0, len(config_manager.FUNCTION_NAMES))]
 
-    # Set with all the nodes of the simulation
-    nodes_set = set(fwd_requests.keys())  
-
-    # Complete the forwarding table with all the missing nodes to forward requests
-    for node_from, weights_x_func in fwd_requests.items():
-        for func, weights_x_node in weights_x_func.items():
-            if func in config_manager.FUNCTION_NAMES:
-                for node in nodes_set:
-                    if node not in list(weights_x_node.keys()):
-                        fwd_requests[node_from][func][node] = 0
+def complete_fwd_table(weights, invoc_rate_table):
+    """
+    Transform the weights in requests by applying weights * invoc_rate_table
+    :param: invoc_rate_table is the matrix of the invocation rates, indexed by (function, node)
+    Returns the sparse matrices of the forwarded requests, one for each function, indexed by (node from, node to)
+    """
+    fwd_requests = []
+    for f, weights_matrix in enumerate(build_weights_matrices(weights, invoc_rate_table.shape[1])):
+        # Each row is scaled by the invocation rate of the function on the node that forwards the requests
+        weights_matrix.data *= np.repeat(invoc_rate_table[f], np.diff(weights_matrix.indptr))
+
+        # Requests are truncated to integer, as int() does
+        fwd_matrix = weights_matrix.astype(np.int32)
+        fwd_matrix.eliminate_zeros()
+        fwd_requests.append(fwd_matrix)
     return fwd_requests
 
-def create_tables(fwd_requests, minute, strategy_type):
+def create_tables(fwd_requests, minute, strategy_type, export=True):
     """
     Starting by forwarding requests create a table and export it in a CSV file
     Also invocation rate and max rate table are create and exported in the same 
     format
+    Tables are made dense one function at a time, and only when they are exported
     """
-    path = config_manager.SIMULATION_TABLES_OUTPUT_PATH.joinpath(strategy_type, "minute_" + str(minute))
-    create_path_if_not_exists(path)
-    nodes_set = sorted(set(fwd_requests.keys()))
+    nodes_number = fwd_requests[0].shape[0]
+    if not export:
+        for f, func in enumerate(config_manager.FUNCTION_NAMES):
+            print("     > FWD_TABLE FOR FUNC {}: {} FORWARDING ENTRIES".format(func, fwd_requests[f].nnz))
+        return
+
+    path = create_path_if_not_exists(config_manager.SIMULATION_TABLES_OUTPUT_PATH.joinpath(strategy_type, "minute_" + str(minute)))
+
+    # Rows follow the order of the nodes, columns are sorted by node key
+    nodes_keys = get_nodes_keys(nodes_number)
+    sorted_nodes = sorted(range(0, len(nodes_keys)), key=lambda i: nodes_keys[i])
 
     # Foreach function and for each node create a dataframe with forwarded requests
-    for func in config_manager.FUNCTION_NAMES:
-        df_x_func = pd.DataFrame([], index=nodes_set)
-        for node_from in fwd_requests:
-            df_x_func[node_from] = [fwd_requests[node_from][func][k]
-                                    for k in sorted(fwd_requests[node_from][func].keys())]
-        # Invert rows and columns
-        df_x_func = df_x_func.T
+    for f, func in enumerate(config_manager.FUNCTION_NAMES):
+        df_x_func = pd.DataFrame(fwd_requests[f][:, sorted_nodes].toarray(), index=nodes_keys,
+                                 columns=[nodes_keys[i] for i in sorted_nodes])
         df_x_func.to_csv(path.joinpath(func + ".csv"), sep='\t', encoding='utf-8')
 
         print("     > FWD_TABLE FOR FUNC {}".format(func))
@@ -106,79 +144,207 @@ def run_agent(agent):
     return weights, execution
 
 
-def simulation(nodes_number, config_file, model_type):
+def build_minute_config(nodes_number, config_file, minute, model_proxy):
+    """
+    Build the configuration of all the nodes for the selected minute, with the predicted
+    metrics of each node, and the table of the invocation rate of each function
+    """
+    # Dictionary that contains final json configuration of the current minute
+    minute_config = {}
+
+    # Matrix with the invocation rate of each function (rows) deployed on each node (columns)
+    functions_index = {func: f for f, func in enumerate(config_manager.FUNCTION_NAMES)}
+    simulation_invoc_rate_table = np.zeros((len(config_manager.FUNCTION_NAMES), nodes_number))
+
+    # Features of each node, predicted all together after the loop
+    nodes_features = []
+
+    # Create global configuration file with info of all nodes
+    for i in range(0, nodes_number):
+        key = config_manager.NODE_KEY_PREFIX + str(i)
+        minute_config[key] = {}
+
+        # Add the information about the node type and the neighbours of the current node
+        minute_config[key]["node_type"] = config_file[key]["node_type"]
+        minute_config[key]["neighbours"] =  config_file[key]["neighbours"]
+
+        # Add the information about the load of the current minute
+        minute_config[key]["load"] = config_file[key]["load"][minute]
+
+        features_data = {}
+        for k, value in minute_config[key]["load"].items():
+            # Extracts the load of each group
+            features_data[k] = value["total_rate"]
+
+            # Iterate over the functions of the group
+            for j in range(0, len(minute_config[key]["load"][k]["functions"])):
+                # Populate the dicitonary which contains the load of each function deployed on the node
+                simulation_invoc_rate_table[functions_index[value["functions"][j]["function_name"]], i] = value["functions"][j]["function_rate"]
+
+        # Insert the information about the node type in the features dict
+        features_data["node_type"] = config_manager.NODES_TYPES_IN_MODELS[minute_config[key]["node_type"]]
+        nodes_features.append(features_data)
+
+    # Get the predictions of all the nodes with a single batch
+    nodes_predictions = model_proxy.get_node_predictions_batch(model_proxy.build_features_matrix(nodes_features))
+
+    # Add node metrics to minute_config
+    for i in range(0, nodes_number):
+        key = config_manager.NODE_KEY_PREFIX + str(i)
+        minute_config[key]["node_metrics"] = dict(zip(nodes_predictions.dtype.names, nodes_predictions[i].tolist()))
+
+    return minute_config, simulation_invoc_rate_table
+
+
+class _ListHandler(logging.Handler):
+    """
+    Logging handler that keeps the messages in memory, used by the workers
+    to send the agent logs back to the main process
+    """
+    def __init__(self, messages):
+        super().__init__()
+        self._messages = messages
+
+    def emit(self, record):
+        self._messages.append(record.getMessage())
+
+
+# State of each worker process of the pool, initialized once by _init_worker
+_worker_state = {}
+
+def _init_worker(nodes_number, config_file, model_type):
+    """
+    Initialize a worker of the pool: the instance is received only once and
+    all the models are loaded before running any agent
+    """
+    ModelProxy.preload_models([model_type])
+    model_proxy = ModelProxy()
+    model_proxy.set_model_type(model_type)
+
+    _worker_state["nodes_number"] = nodes_number
+    _worker_state["config_file"] = config_file
+    _worker_state["model_proxy"] = model_proxy
+    _worker_state["instance_index"] = InstanceIndex(config_file)
+    _worker_state["minute_configs"] = {}
+
+def _run_agent_task(task):
+    """
+    Run the agent of a node with a strategy inside a worker of the pool
+    Returns weights, execution time and log messages of the agent
+    """
+    minute, id, strategy_type = task
+
+    # Configuration and shared context of the minute are built once for each worker
+    if minute not in _worker_state["minute_configs"]:
+        minute_config = build_minute_config(_worker_state["nodes_number"], _worker_state["config_file"], minute, _worker_state["model_proxy"])[0]
+        _worker_state["minute_configs"] = {minute: (minute_config, MinuteContext(minute_config, _worker_state["instance_index"]))}
+    minute_config, minute_context = _worker_state["minute_configs"][minute]
+
+    # Deterministic seed for each task, independent of the worker that executes it
+    task_seed = (minute * _worker_state["nodes_number"] + id) * len(config_manager.STRATEGIES) + config_manager.STRATEGIES.index(strategy_type)
+    random.seed(task_seed)
+    np.random.seed(task_seed)
+
+    messages = []
+    logger = logging.getLogger("worker_agent")
+    logger.handlers.clear()
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    logger.addHandler(_ListHandler(messages))
+
+    key = config_manager.NODE_KEY_PREFIX + str(id)
+    strategy = StrategyFactory.create_strategy(strategy_type, key, minute_config, minute_context)
+    agent = Agent(
+        id,
+        logger,
+        strategy,
+        _worker_state["model_proxy"]
+    )
+    weights, execution_time = run_agent(agent)
+    return weights, execution_time, messages
+
+
+def simulation(nodes_number, config_file, model_type, workers=1, export=True, strategies=None, output_format="csv",
+               streaming_analyzer=None):
     """
     This function allow to simulate various strategies for workload distribution
     and use weights to distribuite the load across neighbours
+    With more than one worker, the agents of each minute are executed by a pool of processes
+    With export disabled, complete configurations, forwarding tables and agent logs are not written on disk
+    Strategies to simulate can be selected with strategies (all the strategies by default)
+    With "npz" output format all the tables are exported in a single file instead of a CSV for each table
+    If a streaming analyzer is passed, the forwarding matrices are added to it at the end of each minute
+    Returns the mean execution time of each strategy and the forwarding matrices of each strategy
+    and minute, one sparse matrix for each function indexed by (node from, node to). Matrices are
+    kept only when they are exported in the results file, otherwise None is returned
     """
+    # All the models are loaded in parallel before the first minute
+    start = time.perf_counter()
+    load_times = ModelProxy.preload_models([model_type])
+    print("> MODELS LOADED IN {:0.3f} s ({} FILES)".format(time.perf_counter() - start, len(load_times)))
+    print(load_times.head().to_string())
+
     model_proxy = ModelProxy()
     model_proxy.set_model_type(model_type)
 
+    if strategies is None:
+        strategies = config_manager.STRATEGIES
+
     # Execution time dictionary
     execution_times = {}
 
+    # Forwarding tables of each strategy and minute, kept only to be exported in the results file
+    fwd_tables = {}
+    keep_fwd_tables = export and output_format == "npz"
+
+    # Invocation rates of each minute
+    invoc_rate_tables = []
+
     # Initialize execution time map for each strategy
-    for s in config_manager.STRATEGIES:
+    for s in strategies:
         execution_times[s] = []
+        fwd_tables[s] = []
 
-    for minute in range(0, config_manager.SIMULATION_MINUTES):  # 6 minutes
-        # Dictionary that contains final json configuration of the current minute
-        minute_config = {}
+    # Pool of processes used to run the agents, the instance is sent once to each worker
+    executor = None
+    if workers > 1:
+        executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                       initargs=(nodes_number, config_file, model_type))
+
+    # Functions deployed on each node and neighbours are the same in all the minutes, so they are indexed once
+    instance_index = InstanceIndex(config_file)
 
+    for minute in range(0, config_manager.SIMULATION_MINUTES):  # 6 minutes
         # Dictionaries used for export
         simulation_weights_table = {}
-        simulation_invoc_rate_table = {}        
 
-        # Forwarding requests dictionary
+        # Forwarding requests matrices of each strategy
         fwd_requests = {}
 
         # Initialize maps for each strategy
-        for s in config_manager.STRATEGIES:
+        for s in strategies:
             simulation_weights_table[s] = {}
-            fwd_requests[s] = {}
-
-        # Create global configuration file with info of all nodes
-        for i in range(0, nodes_number):
-            key = config_manager.NODE_KEY_PREFIX + str(i)
-            minute_config[key] = {}
-
-            # Add the information about the node type and the neighbours of the current node
-            minute_config[key]["node_type"] = config_file[key]["node_type"]
-            minute_config[key]["neighbours"] =  config_file[key]["neighbours"]
-
-            # Add the information about the load of the current minute
-            minute_config[key]["load"] = config_file[key]["load"][minute]
-
-            simulation_invoc_rate_table[key] = {}
-
-            features_data = {}
-            for k, value in minute_config[key]["load"].items():
-                # Extracts the load of each group
-                features_data[k] = value["total_rate"]
-
-                # Iterate over the functions of the group
-                for j in range(0, len(minute_config[key]["load"][k]["functions"])):
-                    # Populate the dicitonary which contains the load of each function deployed on the node
-                    simulation_invoc_rate_table[key][value["functions"][j]["function_name"]] = value["functions"][j]["function_rate"]
-
-            # Insert the information about the node type in the features dict
-            features_data["node_type"] = config_manager.NODES_TYPES_IN_MODELS[minute_config[key]["node_type"]]
-
-            # Get node predictions for the selected features
-            node_predictions = model_proxy.get_node_predictions(features_data)
-
-            # Add node metrics to minute_config
-            minute_config[key]["node_metrics"] = node_predictions.to_dict(orient='records')[0]
 
+        minute_config, simulation_invoc_rate_table = build_minute_config(nodes_number, config_file, minute, model_proxy)
+        invoc_rate_tables.append(simulation_invoc_rate_table)
 
+        # Values shared by all the agents of the minute are computed only once
+        minute_context = MinuteContext(minute_config, instance_index)
 
         print("----------------------------------------------------------")
         
 
-        with open(create_path_if_not_exists(config_manager.SIMULATION_COMPLETE_CONFIGURATION_OUTPUT_PATH).joinpath(
-                  'config{}.json'.format(minute)), 'w', encoding='utf-8') as f:
-            json.dump(minute_config, f, ensure_ascii=False, indent=4)
+        if export:
+            with open(create_path_if_not_exists(config_manager.SIMULATION_COMPLETE_CONFIGURATION_OUTPUT_PATH).joinpath(
+                      'config{}.json'.format(minute)), 'w', encoding='utf-8') as f:
+                json.dump(minute_config, f, ensure_ascii=False, indent=4)
 
+        # Fan out the (node, strategy) agent runs of the minute to the workers
+        # Results are collected in the same order of the sequential execution
+        if executor is not None:
+            tasks = [(minute, id, s) for id in range(0, nodes_number) for s in strategies]
+            chunksize = max(1, len(tasks) // (workers * 4))
+            tasks_results = iter(executor.map(_run_agent_task, tasks, chunksize=chunksize))
 
         # Call agent loop for each config that has been previously built
         #
@@ -194,10 +360,13 @@ def simulation(nodes_number, config_file, model_type):
             # for neighbour in neighbours:
             #     config_with_neigh[neighbour] = minute_config[neighbour]
 
+            log_file = None
+            if export:
+                log_file = create_path_if_not_exists(config_manager.SIMULATION_AGENT_LOGGING_BASE_PATH).joinpath("agent_" +
+                           str(id) + ".log")
             logger = get_logger(
                 "agent" + str(id) + "_minute_" + str(minute),
-                create_path_if_not_exists(config_manager.SIMULATION_AGENT_LOGGING_BASE_PATH).joinpath("agent_" +
-                str(id) + ".log"),
+                log_file,
                 logging.INFO
             )
 
@@ -205,34 +374,55 @@ def simulation(nodes_number, config_file, model_type):
             logger.info("-------- MINUTE {} --------".format(minute))
 
             # Execute agent loop for each strategy
-            for s in config_manager.STRATEGIES:
-                # Build correct strategy
-                strategy = StrategyFactory.create_strategy(s, key, minute_config)
+            for s in strategies:
                 logger.info("   > STRATEGY: {} <".format(s))
-                agent = Agent(
-                    id,
-                    logger,
-                    strategy,
-                    model_proxy
-                )
-                #agent.disable_logging() # Disable logging for speed
-                weights, execution_time = run_agent(agent)
+                if executor is not None:
+                    weights, execution_time, messages = next(tasks_results)
+                    for message in messages:
+                        logger.info(message)
+                else:
+                    # Build correct strategy
+                    strategy = StrategyFactory.create_strategy(s, key, minute_config, minute_context)
+                    agent = Agent(
+                        id,
+                        logger,
+                        strategy,
+                        model_proxy
+                    )
+                    #agent.disable_logging() # Disable logging for speed
+                    weights, execution_time = run_agent(agent)
                 execution_times[s].append(execution_time)
                 simulation_weights_table[s][key] = weights
-        for s in config_manager.STRATEGIES:
+
+            # Release the log file of the agent for this minute
+            close_logger(logger)
+        for s in strategies:
             fwd_requests[s] = complete_fwd_table(simulation_weights_table[s], simulation_invoc_rate_table)
 
         print("> START MINUTE {}".format(minute))
 
-        for s in config_manager.STRATEGIES:
+        for s in strategies:
             # Create and export tables for three algorithms
             print(" > {}".format(s))
-            create_tables(fwd_requests[s], minute, s)
+            create_tables(fwd_requests[s], minute, s, export and output_format == "csv")
+            if keep_fwd_tables:
+                fwd_tables[s].append(fwd_requests[s])
+            if streaming_analyzer is not None:
+                streaming_analyzer.add_minute(s, minute, fwd_requests[s])
             print("------------------------------------------------")
 
         print("> END MINUTE {}".format(minute))
 
-    return {k: np.mean(times_for_algo) for k, times_for_algo in execution_times.items()}
+    if executor is not None:
+        executor.shutdown()
+
+    if export and output_format == "npz":
+        export_results_file(config_manager.SIMULATION_RESULTS_FILE, fwd_tables, invoc_rate_tables,
+                            get_nodes_keys(nodes_number), config_manager.FUNCTION_NAMES)
+
+    print("> PREDICTIONS CACHE STATS: {}".format(ModelProxy.get_cache_stats()))
+
+    return {k: np.mean(times_for_algo) for k, times_for_algo in execution_times.items()}, fwd_tables if keep_fwd_tables else None
 
 
 def main(instance_file=""):
@@ -241,12 +431,11 @@ def main(instance_file=""):
 
     # Instance file can come from simulation_controller
     if instance_file == "":
-        instance_file = config_manager.OUTPUT_INSTANCE_JSON_FILE_PATH
+        instance_file = None
 
-    # Read the instance json produced by the instance generator
-    f = open(instance_file)
-    config_file = json.load(f)
-    simulation(config_file["nodes_number"], config_file, model_type)
+    # Read the instance produced by the instance generator (memory mapped in compact format)
+    config_file = load_instance(kargs["instanceformat"], instance_file)
+    simulation(config_file["nodes_number"], config_file, model_type, kargs["workers"], output_format=kargs["outputformat"])
 
 
 
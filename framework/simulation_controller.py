@@ -12,7 +12,6 @@ import random
 from utils.utils import *
 from cli.cli import get_simulation_controller_args
 from configuration.config_manager import ConfigManager 
-import subprocess
 
 config_manager = ConfigManager()
 
@@ -22,6 +21,34 @@ def create_path_if_not_exists(path):
         os.makedirs(path)
     return path
 
+def run_pipeline(nodes_num, edge_prob, overloaded_percentage, seed, model_type, workers=1, export=True, strategies=None,
+                 load_generator="legacy"):
+    """
+    Generate, simulate and analyze an instance in the current process.
+    Data are passed in memory between the steps and the ModelProxy keeps the
+    models loaded between different executions. The forwarding tables of each
+    minute are analyzed as soon as they are produced by the simulation
+    :param: overloaded_percentage is the max percentage of overloaded nodes (between 0 and 100)
+    :param: export allow to write on disk instance, simulation and analyzer artefacts
+    :param: strategies are the strategies to simulate (all the strategies by default)
+    :param: load_generator is the generator of the loads of the instance (legacy, vectorized)
+    Returns the index comparison table of the strategies
+    """
+    # 1) Generate instance configuration using the passed parameters
+    print("> STEP 1 - Generating instance configuration...")
+    instance = instance_generator.generate_instance(nodes_num, edge_prob, overloaded_percentage * 0.01, seed, export,
+                                                    load_generator=load_generator)
+
+    # 2) Single simulation based on configuration generated before, analyzed minute by minute
+    print("> STEP 2 - Simulation of instance...")
+    streaming_analyzer = analyzer.StreamingAnalyzer(instance, model_type, strategies)
+    simulation.simulation(instance["nodes_number"], instance, model_type, workers, export, strategies,
+                          streaming_analyzer=streaming_analyzer)
+
+    # 3) Complete the analysis of the simulation output
+    print("> STEP 3 - Analyze output...")
+    return analyzer.complete_analysis(streaming_analyzer, export)
+
 def main():
     # Get cli args
     kargs = get_simulation_controller_args()
@@ -35,6 +62,20 @@ def main():
         n_of_experiments = 1
     
     model_type = kargs["modeltype"]
+    export = not kargs["noartefacts"]
+
+    # Default values used by the instance generator
+    nodes_num = kargs["nodesnum"]
+    if nodes_num == -1:
+        nodes_num = 10
+    edge_prob = kargs["edgeprob"]
+    if edge_prob == -1.0:
+        edge_prob = 0.1
+
+    # Seeds are extracted before the experiments start, because the
+    # instance generator sets the global seed of numpy
+    seeds = [kargs["seed"] if kargs["seed"] != -1 else np.random.randint(1000000) for _ in range(0, n_of_experiments)]
+
     # Final dataframe containing data for each experiment of the simulation
     final_df = pd.DataFrame()
 
@@ -44,51 +85,37 @@ def main():
     for i in range(1, n_of_experiments + 1):
         exp_path = dir_path.joinpath("exp_{}".format(i))
 
-        seed = kargs["seed"]
-        if seed == -1:
-            seed = np.random.randint(1000000)
+        seed = seeds[i - 1]
         print("Experiment" + str(i))
         for percentage in max_percentage_values:
             print("Percentage: " + str(percentage))
             # Create a dir for each iteration of the simulation
             path = exp_path.joinpath("simulation_with_load_{}".format(percentage))
             os.makedirs(path)
-            
-            # 1) Generate instance configuration using the passed parameters
-            print("> STEP 1 - Generating instance configuration...")
-            subprocess.run(["python", "./instance_generator.py", "-n", str(kargs["nodesnum"]), "-p", str(kargs["edgeprob"]), "-s", str(seed), "-o", str(percentage)])
-
-            # Move instance generator output to final folder
-            copy_dir(config_manager.OUTPUT_INSTANCE_PATH, path)
 
             # Before simulations starts, remove all agent logs file from base foulder
-            remove_dir_content(config_manager.SIMULATION_AGENT_LOGGING_BASE_PATH)
-
+            if export:
+                remove_dir_content(config_manager.SIMULATION_AGENT_LOGGING_BASE_PATH)
 
-            # 2) Single simulation based on configuration file generated before
-            print("> STEP 2 - Simulation of instance...")
-            subprocess.run(["python", "./simulation.py", "-m", model_type])
+            # Steps 1-3) Generate, simulate and analyze the instance
+            df = run_pipeline(nodes_num, edge_prob, percentage, seed, model_type, kargs["workers"], export)
 
+            if export:
+                # Move instance generator output to final folder
+                copy_dir(config_manager.OUTPUT_INSTANCE_PATH, path)
 
-            # 3) Analyze simulation output
-            print("> STEP 3 - Analyze output...")
-            subprocess.run(["python", "./analyzer.py", "-m", model_type])
-
-            
-            # Move analyzer output files to final folder (separated for each iteration)
-            copy_dir(config_manager.ANALYZER_OUTPUT_PATH, path)
+                # Move analyzer output files to final folder (separated for each iteration)
+                copy_dir(config_manager.ANALYZER_OUTPUT_PATH, path)
             
-            # Copy to this foulder also simulation results (weights for each agent)
-            # Also clean src dir of all content (avoiding file overwriting)
-            copy_dir(config_manager.SIMULATION_AGENT_LOGGING_BASE_PATH, path)
-            remove_dir_content(config_manager.SIMULATION_AGENT_LOGGING_BASE_PATH)
+                # Copy to this foulder also simulation results (weights for each agent)
+                # Also clean src dir of all content (avoiding file overwriting)
+                copy_dir(config_manager.SIMULATION_AGENT_LOGGING_BASE_PATH, path)
+                remove_dir_content(config_manager.SIMULATION_AGENT_LOGGING_BASE_PATH)
 
             #time.sleep(2)
 
-            # 4) Load analyzer output file that contains index for comparison
+            # 4) Use the index comparison table returned by the analyzer
             print("> STEP 4 - Load Index df...")
-            df = pd.read_csv(config_manager.INDEX_COMPARISON_FILE,
-                            delimiter=',', header=0, index_col=0)
             df.reset_index(drop=False, inplace=True, names = "Strategy")
             #df.index.name = "strategy"
             percentage_values = [percentage] * len(list(df.index.values))
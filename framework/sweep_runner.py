@@ -0,0 +1,107 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+# Copyright 2021-2025 The DFaaS Authors. All rights reserved.
+# This file is licensed under the AGPL v3.0 or later license. See LICENSE and
+# AUTHORS file for more information.
+
+import os
+import sys
+import itertools
+import pandas as pd
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from configuration.config_manager import ConfigManager
+from simulation_controller import run_pipeline
+from cli.cli import get_sweep_runner_args
+
+config_manager = ConfigManager()
+
+# Parameters that identify a cell of the grid, in the same order of the cells tuples
+CELL_COLUMNS = ["Nodes number", "Edge probability", "Max overloaded percentage", "Model type", "Strategy", "Seed"]
+
+def build_grid(nodes_nums, edge_probs, overloaded_percentages, model_types, strategies, seeds):
+    """
+    Build the list of the cells of the grid, as tuples of parameters
+    """
+    return list(itertools.product(nodes_nums, edge_probs, overloaded_percentages, model_types, strategies, seeds))
+
+def cell_file_name(cell):
+    """
+    Name of the file of the results store that contains the results of a cell
+    """
+    nodes_num, edge_prob, percentage, model_type, strategy, seed = cell
+    return "nodes_{}_edgeprob_{}_overloaded_{}_{}_{}_seed_{}.csv".format(nodes_num, edge_prob, percentage, model_type, strategy, seed)
+
+def _init_worker():
+    """
+    Initialize a worker of the pool, the prints of the simulation steps are discarded
+    """
+    sys.stdout = open(os.devnull, 'w')
+
+def run_cell(cell, load_generator="legacy"):
+    """
+    Run the simulation of a cell without writing the artefacts on disk
+    Returns the cell and its row of the index comparison table
+    """
+    nodes_num, edge_prob, percentage, model_type, strategy, seed = cell
+    df = run_pipeline(nodes_num, edge_prob, percentage, seed, model_type, export=False, strategies=[strategy],
+                      load_generator=load_generator)
+    return cell, df.loc[strategy].tolist()
+
+def checkpoint_cell(cells_path, cell, indexes):
+    """
+    Store the results of a completed cell in the results store
+    The file is written in a temporary file and then renamed, so that a crash
+    never leaves a partial result
+    """
+    df = pd.DataFrame([[*cell, *indexes]], columns=[*CELL_COLUMNS, *config_manager.INDEX_TO_COMPARE])
+    path = cells_path.joinpath(cell_file_name(cell))
+    tmp_path = str(path) + ".tmp"
+    df.to_csv(tmp_path, sep=',', encoding='utf-8', index=False)
+    os.replace(tmp_path, path)
+
+def merge_results(cells_path, grid):
+    """
+    Merge the results of all the cells of the grid in a single table
+    """
+    # Round trip precision keeps the exact values computed by the analyzer
+    return pd.concat([pd.read_csv(cells_path.joinpath(cell_file_name(cell)), float_precision="round_trip")
+                      for cell in grid], ignore_index=True)
+
+def main():
+    kargs = get_sweep_runner_args()
+    print(kargs)
+
+    grid = build_grid(kargs["nodesnum"], kargs["edgeprob"], kargs["overloaded"],
+                      kargs["modeltype"], kargs["strategies"], kargs["seeds"])
+
+    results_path = Path(kargs["results"])
+    cells_path = results_path.joinpath(config_manager.SWEEP_RUNNER_CELLS_DIR_NAME)
+    os.makedirs(cells_path, exist_ok=True)
+
+    # Cells already completed by a previous execution are not executed again
+    pending_cells = [cell for cell in grid if not os.path.exists(cells_path.joinpath(cell_file_name(cell)))]
+    print("> GRID CELLS: {} (completed: {}, pending: {})".format(len(grid), len(grid) - len(pending_cells), len(pending_cells)))
+
+    with ProcessPoolExecutor(max_workers=kargs["workers"], initializer=_init_worker) as executor:
+        futures = [executor.submit(run_cell, cell, kargs["loadgen"]) for cell in pending_cells]
+        for i, future in enumerate(as_completed(futures)):
+            cell, indexes = future.result()
+            checkpoint_cell(cells_path, cell, indexes)
+            print("     > [{}/{}] Completed cell {}".format(i + 1, len(pending_cells), dict(zip(CELL_COLUMNS, cell))))
+
+    # Merge the index comparison tables of all the cells
+    print("> Export final results tables...")
+    final_df = merge_results(cells_path, grid)
+    final_df.to_csv(results_path.joinpath(config_manager.SWEEP_RUNNER_OUTPUT_FILE_NAME), sep=',', encoding='utf-8', index=False)
+
+    # Mean of the indexes over the seeds of each configuration
+    group_columns = [column for column in CELL_COLUMNS if column != "Seed"]
+    mean_df = final_df.drop(columns=["Seed"]).groupby(group_columns, sort=False).mean()
+    mean_df.insert(0, "N of experiments", final_df.groupby(group_columns, sort=False).size())
+    mean_df.reset_index(drop=False, inplace=True)
+    mean_df.to_csv(results_path.joinpath(config_manager.SWEEP_RUNNER_OUTPUT_MEAN_FILE_NAME), sep=',', encoding='utf-8', index=False)
+    print(mean_df)
+
+# Call main program.
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+# Copyright 2021-2025 The DFaaS Authors. All rights reserved.
+# This file is licensed under the AGPL v3.0 or later license. See LICENSE and
+# AUTHORS file for more information.
+
+import os
+import json
+import numpy as np
+from collections.abc import Mapping, Sequence
+from configuration.config_manager import ConfigManager
+
+config_manager = ConfigManager()
+
+# Keys of the instance that do not describe a node
+META_KEYS = ["seed", "nodes_number", "edge_prob", "overloaded_perc"]
+
+# Arrays of the compact format, each one stored in a .npy file of the instance directory:
+# - node_types (node) uint8, index of the type of each node in "nodes_types" of meta.json
+# - neighbours_indptr/neighbours_indices, CSR adjacency: neighbours of node i are indices[indptr[i]:indptr[i+1]]
+# - functions_indptr/functions_indices, same layout for the functions deployed on each node, in the order of the JSON
+# - loads (node, minute, function) int32, rate of each function (0 for the functions not deployed)
+ARRAYS = ["node_types", "neighbours_indptr", "neighbours_indices", "functions_indptr", "functions_indices", "loads"]
+
+def export_compact_instance(instance, path):
+    """
+    Export an instance, in the same format of the JSON instance file, as a directory of NumPy arrays
+    :param: path is the directory of the compact instance
+    """
+    nodes_number = instance["nodes_number"]
+    nodes_keys = [config_manager.NODE_KEY_PREFIX + str(i) for i in range(0, nodes_number)]
+    nodes_indexes = {key: i for i, key in enumerate(nodes_keys)}
+    functions_indexes = {func: i for i, func in enumerate(config_manager.FUNCTION_NAMES)}
+    minutes = len(instance[nodes_keys[0]]["load"])
+
+    node_types = np.zeros(nodes_number, dtype=np.uint8)
+    neighbours_indptr = np.zeros(nodes_number + 1, dtype=np.int64)
+    functions_indptr = np.zeros(nodes_number + 1, dtype=np.int64)
+    neighbours_indices = []
+    functions_indices = []
+    loads = np.zeros((nodes_number, minutes, len(config_manager.FUNCTION_NAMES)), dtype=np.int32)
+
+    for i, key in enumerate(nodes_keys):
+        node = instance[key]
+        node_types[i] = config_manager.NODES_TYPES.index(node["node_type"])
+        neighbours_indices.extend(nodes_indexes[neigh] for neigh in node["neighbours"])
+        neighbours_indptr[i + 1] = len(neighbours_indices)
+
+        # Deployed functions are the same in all the minutes, the order of the first one is kept
+        functions_indices.extend(functions_indexes[function_info["function_name"]]
+                                 for values in node["load"][0].values() for function_info in values["functions"])
+        functions_indptr[i + 1] = len(functions_indices)
+
+        for minute, minute_load in enumerate(node["load"]):
+            for group, values in minute_load.items():
+                for function_info in values["functions"]:
+                    loads[i, minute, functions_indexes[function_info["function_name"]]] = function_info["function_rate"]
+                # The total rate is not stored, so it must be the sum of the functions rates
+                if values["total_rate"] != sum(function_info["function_rate"] for function_info in values["functions"]):
+                    raise Exception("Total rate of group {} of {} at minute {} is not the sum of its functions rates".format(group, key, minute))
+
+    os.makedirs(path, exist_ok=True)
+    arrays = {
+        "node_types": node_types,
+        "neighbours_indptr": neighbours_indptr,
+        "neighbours_indices": np.array(neighbours_indices, dtype=np.int32),
+        "functions_indptr": functions_indptr,
+        "functions_indices": np.array(functions_indices, dtype=np.int32),
+        "loads": loads
+    }
+    for name, array in arrays.items():
+        np.save(os.path.join(path, name + ".npy"), array)
+
+    meta = {k: instance[k] for k in META_KEYS}
+    meta["minutes"] = minutes
+    meta["nodes_types"] = config_manager.NODES_TYPES
+    meta["functions"] = config_manager.FUNCTION_NAMES
+    meta["functions_groups"] = [group for func in config_manager.FUNCTION_NAMES
+                                for group, functions in config_manager.GROUPS.items() if func in functions]
+    with open(os.path.join(path, "meta.json"), 'w', encoding='utf-8') as f:
+        json.dump(meta, f, ensure_ascii=False, indent=4)
+
+class CompactInstance(Mapping):
+    """
+    Read-only view of a compact instance, with the same keys and values of the JSON instance file.
+    Arrays are memory mapped and the dictionaries of each node are built only when requested
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, "meta.json")) as f:
+            self.meta = json.load(f)
+        self.arrays = {name: np.load(os.path.join(path, name + ".npy"), mmap_mode="r") for name in ARRAYS}
+        self._nodes_keys = [config_manager.NODE_KEY_PREFIX + str(i) for i in range(0, self.meta["nodes_number"])]
+        self._nodes_indexes = {key: i for i, key in enumerate(self._nodes_keys)}
+
+    def __reduce__(self):
+        # Processes receive the path and map the arrays again, instead of a copy of them
+        return (CompactInstance, (self.path,))
+
+    def __getitem__(self, key):
+        if key in META_KEYS:
+            return self.meta[key]
+        i = self._nodes_indexes[key]
+        neighbours = self.arrays["neighbours_indices"][self.arrays["neighbours_indptr"][i]:self.arrays["neighbours_indptr"][i + 1]]
+        return {
+            "node_type": self.meta["nodes_types"][self.arrays["node_types"][i]],
+            "neighbours": [self._nodes_keys[neigh] for neigh in neighbours.tolist()],
+            "load": _CompactNodeLoad(self, i)
+        }
+
+    def __iter__(self):
+        yield from META_KEYS
+        yield from self._nodes_keys
+
+    def __len__(self):
+        return len(META_KEYS) + len(self._nodes_keys)
+
+    def get_node_load(self, i, minute):
+        """
+        Method used to build the load of a node in a minute, in the same format of the JSON instance file
+        """
+        functions = self.arrays["functions_indices"][self.arrays["functions_indptr"][i]:self.arrays["functions_indptr"][i + 1]].tolist()
+        rates = self.arrays["loads"][i, minute].tolist()
+        load = {}
+        for func in functions:
+            group = self.meta["functions_groups"][func]
+            if group not in load:
+                load[group] = {"functions": [], "total_rate": 0}
+            load[group]["functions"].append({"function_name": self.meta["functions"][func], "function_rate": rates[func]})
+            load[group]["total_rate"] += rates[func]
+        return load
+
+    def to_json(self):
+        """
+        Method used to convert the instance in a dictionary with the format of the JSON instance file
+        """
+        instance = {}
+        for key, value in self.items():
+            if key in META_KEYS:
+                instance[key] = value
+            else:
+                value["load"] = list(value["load"])
+                instance[key] = value
+        return instance
+
+class _CompactNodeLoad(Sequence):
+    """
+    Load of a node in each minute, built when requested
+    """
+
+    def __init__(self, instance, i):
+        self._instance = instance
+        self._i = i
+
+    def __getitem__(self, minute):
+        if isinstance(minute, slice):
+            return [self[m] for m in range(0, len(self))[minute]]
+        if minute < 0:
+            minute += len(self)
+        if minute < 0 or minute >= len(self):
+            raise IndexError("Minute out of range")
+        return self._instance.get_node_load(self._i, minute)
+
+    def __len__(self):
+        return self._instance.meta["minutes"]
+
+def load_instance(instance_format, path=None):
+    """
+    Load the instance produced by the instance generator
+    With "json" format the whole file is parsed, with "compact" format the arrays are memory mapped
+    :param: path is the instance file or directory (the default output of the instance generator if not passed)
+    """
+    if instance_format == "compact":
+        return CompactInstance(path if path is not None else config_manager.OUTPUT_INSTANCE_COMPACT_PATH)
+    with open(path if path is not None else config_manager.OUTPUT_INSTANCE_JSON_FILE_PATH) as f:
+        return json.load(f)
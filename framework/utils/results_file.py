@@ -0,0 +1,63 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+# Copyright 2021-2025 The DFaaS Authors. All rights reserved.
+# This file is licensed under the AGPL v3.0 or later license. See LICENSE and
+# AUTHORS file for more information.
+
+import os
+import numpy as np
+from scipy import sparse
+
+# Prefix of the arrays that contain the forwarding matrices of each strategy
+FWD_KEY_PREFIX = "fwd_"
+
+def export_results_file(path, fwd_tables, invoc_rate_tables, nodes_keys, functions_names):
+    """
+    Export all the tables of a simulation in a single compressed NPZ file
+    :param: fwd_tables are the forwarding matrices of each strategy, one sparse matrix for each minute and function
+    :param: invoc_rate_tables are the invocation rate matrices, one for each minute
+    The matrices of each strategy are stacked by rows, minute by minute and function by function,
+    and stored as the arrays of a single CSR matrix, so that the file grows with the forwarding entries
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    arrays = {}
+    for s, matrices in fwd_tables.items():
+        stacked = sparse.vstack([fwd_matrix for minute_matrices in matrices for fwd_matrix in minute_matrices], format="csr")
+        arrays[FWD_KEY_PREFIX + s + "_data"] = stacked.data
+        arrays[FWD_KEY_PREFIX + s + "_indices"] = stacked.indices
+        arrays[FWD_KEY_PREFIX + s + "_indptr"] = stacked.indptr
+    np.savez_compressed(
+        path,
+        strategies=np.array(list(fwd_tables.keys())),
+        nodes=np.array(nodes_keys),
+        functions=np.array(functions_names),
+        invoc_rates=np.stack(invoc_rate_tables),
+        **arrays
+    )
+
+def load_results_file(path):
+    """
+    Load the tables exported by export_results_file
+    Returns the forwarding matrices of each strategy, a list of sparse matrices (one for each function,
+    indexed by (node from, node to)) for each minute, the invocation rates, indexed by (minute, function, node),
+    and the keys of nodes and functions
+    """
+    results = np.load(path)
+    nodes_number = len(results["nodes"])
+    functions_number = len(results["functions"])
+    minutes = len(results["invoc_rates"])
+
+    fwd_tables = {}
+    for s in results["strategies"]:
+        s = str(s)
+        stacked = sparse.csr_matrix((results[FWD_KEY_PREFIX + s + "_data"], results[FWD_KEY_PREFIX + s + "_indices"],
+                                     results[FWD_KEY_PREFIX + s + "_indptr"]),
+                                    shape=(minutes * functions_number * nodes_number, nodes_number))
+        # Rows of the matrix of each minute and function
+        fwd_tables[s] = [[stacked[(minute * functions_number + f) * nodes_number:(minute * functions_number + f + 1) * nodes_number]
+                          for f in range(0, functions_number)] for minute in range(0, minutes)]
+    return {
+        "fwd_tables": fwd_tables,
+        "invoc_rates": results["invoc_rates"],
+        "nodes": results["nodes"].tolist(),
+        "functions": results["functions"].tolist()
+    }
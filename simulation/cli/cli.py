@@ -4,6 +4,9 @@
 # AUTHORS file for more information.
 
 import argparse
+from configuration.config_manager import ConfigManager
+
+config_manager = ConfigManager()
 
 def parse_arguments():
     """
@@ -18,9 +21,13 @@ def parse_arguments():
                         help="Optional param that represent probability of creating an edge")
     parser.add_argument('-i', '--instance', type=str, default="", required=False,
                         help="Optional param that represent path of an existing json instance file")
+    parser.add_argument('-t', '--topology', type=str, default="gnp", required=False,
+                        help="Optional param that represent the generator of the network graph (gnp, fast_gnp, geometric, knn). Default value is \"gnp\"")
 
     args = parser.parse_args()
 
+    if args.topology not in config_manager.GRAPH_TOPOLOGIES:
+        raise parser.error("Topology can only be \"gnp\" \"fast_gnp\" \"geometric\" or \"knn\"")
     if args.nodesnum != -1 and args.nodesnum <= 0:
         raise parser.error("Nodes number must be integer, greater than 0")
     if args.seed != -1 and args.seed <= 0:
@@ -27,6 +27,7 @@ class ConfigManager(object):
     NODES_TYPE = ["node_1", "node_2", "node_3"] # Nodes type used in experiments
     NODES_TYPE_PROBABILITY_DISTRIBUTION = [0.5, 0.3, 0.2]
     NODE_KEY_PREFIX = "node_"
+    GRAPH_TOPOLOGIES = ["gnp", "fast_gnp", "geometric", "knn"] # Generators of the network graph of the instance
 
     # Constants used in simulation script
     SIMULATION_MINUTES = 7
@@ -82,6 +83,10 @@ class ConfigManager(object):
 
     # DB path
     EXPERIMENT_DB_PATH = simulation_dir.joinpath("database_manager", "db_file", "experiment_db")
+    DATA_LOADER_PARSE_WORKERS = 1 # Processes used to parse the data files while creating the db (1 to parse them sequentially)
+    USE_MATERIALIZED_CONFIG_METRICS = True # Answer the configuration requests from the metrics of all the configurations, computed once
+    USE_CONFIG_REQUEST_CACHE = True # Cache the metrics of the configuration requests, in memory and on disk
+    CONFIG_REQUEST_CACHE_PATH = simulation_dir.joinpath("database_manager", "db_file", "config_request_cache") # Invalidated when the db file changes
 
     # Mapping info
     NODE_CONFIGURATIONS = {
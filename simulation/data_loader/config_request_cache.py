@@ -0,0 +1,114 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+# Copyright 2021-2025 The DFaaS Authors. All rights reserved.
+# This file is licensed under the AGPL v3.0 or later license. See LICENSE and
+# AUTHORS file for more information.
+
+import os
+import pickle
+import sqlite3
+import hashlib
+
+from data_loader.request.config_request import ConfigRequest
+
+
+class ConfigRequestCache:
+    """
+    Cache of the metrics returned for each configuration request.
+    Entries are kept in memory, shared by all the instances of the same process,
+    and stored on disk in a SQLite file, shared by different executions of the simulation.
+    All the entries are discarded when the experiment database file changes
+    """
+
+    # Entries in memory and fingerprint of the database they have been computed from
+    __entries = {}
+    __entries_db_fingerprint = None
+
+    def __init__(self, db_path, cache_path) -> None:
+        self.__db_fingerprint = self.get_db_fingerprint(db_path)
+        self.__hits = 0
+        self.__disk_hits = 0
+        self.__misses = 0
+
+        if ConfigRequestCache.__entries_db_fingerprint != self.__db_fingerprint:
+            ConfigRequestCache.__entries = {}
+            ConfigRequestCache.__entries_db_fingerprint = self.__db_fingerprint
+
+        self.__connection = sqlite3.connect(cache_path)
+        with self.__connection:
+            self.__connection.execute("CREATE TABLE IF NOT EXISTS `CACHE_INFO` (`DbFingerprint` TEXT NOT NULL)")
+            self.__connection.execute("CREATE TABLE IF NOT EXISTS `CACHE` (`Key` TEXT NOT NULL PRIMARY KEY, `Value` BLOB NOT NULL)")
+
+            # Entries stored on disk for another version of the database are discarded
+            stored_fingerprint = self.__connection.execute("SELECT `DbFingerprint` FROM `CACHE_INFO`").fetchone()
+            if stored_fingerprint is None or stored_fingerprint[0] != self.__db_fingerprint:
+                self.__connection.execute("DELETE FROM `CACHE`")
+                self.__connection.execute("DELETE FROM `CACHE_INFO`")
+                self.__connection.execute("INSERT INTO `CACHE_INFO` (`DbFingerprint`) VALUES (?)", (self.__db_fingerprint,))
+
+    @staticmethod
+    def get_db_fingerprint(db_path) -> str:
+        """
+        Fingerprint of the database file, that changes when the file is written
+        :db_path: path of the experiment database
+        """
+        stat = os.stat(db_path)
+        return "{}:{}".format(stat.st_size, stat.st_mtime_ns)
+
+    @staticmethod
+    def get_key(config_request: ConfigRequest) -> str:
+        """
+        Hash of the canonical key of a configuration request, that does not depend
+        on the order of the functions in the request
+        :config_request: configuration request
+        """
+        return hashlib.sha256(config_request.get_canonical_key().encode("utf-8")).hexdigest()
+
+    def get(self, config_request: ConfigRequest):
+        """
+        Get the metrics of a configuration request, looking in memory and then on disk
+        :config_request: configuration request
+        :return: the two dataframes of node's and function's metrics, None if the request is not cached
+        """
+        key = self.get_key(config_request)
+        entry = ConfigRequestCache.__entries.get(key)
+
+        if entry is None:
+            row = self.__connection.execute("SELECT `Value` FROM `CACHE` WHERE `Key` = ?", (key,)).fetchone()
+            if row is None:
+                self.__misses += 1
+                return None
+            entry = pickle.loads(row[0])
+            ConfigRequestCache.__entries[key] = entry
+            self.__disk_hits += 1
+
+        self.__hits += 1
+        # Copies are returned, so that callers cannot modify the cached entries
+        return entry[0].copy(), entry[1].copy()
+
+    def put(self, config_request: ConfigRequest, df_node, df_func) -> None:
+        """
+        Store the metrics of a configuration request in memory and on disk
+        :config_request: configuration request
+        :df_node: dataframe of node's metrics
+        :df_func: dataframe of function's metrics
+        """
+        key = self.get_key(config_request)
+        entry = (df_node.copy(), df_func.copy())
+        ConfigRequestCache.__entries[key] = entry
+
+        with self.__connection:
+            self.__connection.execute("INSERT OR REPLACE INTO `CACHE` (`Key`, `Value`) VALUES (?, ?)",
+                                      (key, pickle.dumps(entry, protocol=pickle.HIGHEST_PROTOCOL)))
+
+    def get_stats(self) -> dict:
+        """
+        Statistics of the lookups made through this instance
+        :return: dict with hits (from memory or disk), hits from disk, misses and hit rate (%)
+        """
+        lookups = self.__hits + self.__misses
+        return {
+            "hits": self.__hits,
+            "disk_hits": self.__disk_hits,
+            "misses": self.__misses,
+            "hit_rate": 100 * self.__hits / lookups if lookups > 0 else 0.0
+        }
@@ -4,13 +4,75 @@
 # AUTHORS file for more information.
 
 import datetime
+import time
 
 import pandas as pd
 import os
 import json
+from concurrent.futures import ProcessPoolExecutor
 
 from configuration.config_manager import ConfigManager
 from database_manager.exp_db_manager import ExpDbManager
+from data_loader.config_request_cache import ConfigRequestCache
+
+def parse_data_file(file_path):
+    """
+    Parse a json data file into the rows to push on db, without accessing the db,
+    so that files can be parsed by a pool of processes
+    Functions are referred by name, since their ids are known only by the DataLoader
+    :file_path: path of the json data file
+    :return: the node type and, for each experiment instant, a tuple with its timestamp, its metrics
+             (name, type, unit, val, desc, function name or None) and its deploys
+             (function name, max_rate, num_replicas, wl, margin, state)
+    """
+    config_manager = ConfigManager()
+
+    with open(file_path) as f:
+        json_file = json.load(f)  # Return json file as a dictionary
+
+    # Parse input section
+    # Note: all other data from "input" section are discarded
+    # because replicas and wl can be obtained from single minute metrics
+    node_type = json_file["input"]["node"]
+
+    # Parse output section
+    exp_instants = []
+    for idx, exp_instant in enumerate(json_file["output"]):
+        if "timestamp" in exp_instant:
+            timestamp = exp_instant["timestamp"]
+        else:
+            now = datetime.datetime.now()
+            timestamp = datetime.datetime(now.year, now.month, now.day, 0, 0, idx)
+
+        metrics = []
+        deploys = []
+        for metric in ["ram_usage", "cpu_usage"]:
+            metrics.append((
+                metric, "node", config_manager.NODES_METRICS_UNIT[metric],
+                round(exp_instant[metric] * 100, 2), config_manager.NODES_METRICS[metric], None
+            ))
+
+        for func in exp_instant["functions"]:
+            func_name = func["name"]
+            if func_name in config_manager.FUNCTION_NAMES:
+                deploys.append((
+                    func_name, func["max_rate"], func["service_count"], func["invoc_rate"], func["margin"], func["state"]
+                ))
+
+                for key, value in func.items():
+                    if key != "name" and key not in config_manager.DEPLOY_DATA:
+                        if key in ["ram_xfunc", "cpu_xfunc"]:
+                            value = round(value * 100, 2)
+
+                        metrics.append((
+                            key, "func", config_manager.FUNCTION_METRICS_UNIT[key],
+                            value, config_manager.FUNCTION_METRICS[key], func_name
+                        ))
+
+        exp_instants.append((timestamp, metrics, deploys))
+
+    return node_type, exp_instants
+
 
 class DataLoader:
     """
@@ -31,6 +93,7 @@ class DataLoader:
 
             print("Creating tables...")
             self.__db_manager.create_tables()
+            self.__db_manager.enable_wal()
             print("Done")
 
             print("Loading data from disk...")
@@ -40,83 +103,92 @@ class DataLoader:
         else:
             print("DB file already exist")
 
+        # Indexes are created after loading the data, and added to db files created without them
+        self.__db_manager.create_indexes()
+
+        # Metrics of all the configurations are computed once, also for db files created without them
+        if self.__config_manager.USE_MATERIALIZED_CONFIG_METRICS and not self.__db_manager.has_config_metrics():
+            start = time.perf_counter()
+            configs_number = self.__db_manager.materialize_config_metrics()
+            print("Materialized metrics of {} configurations in {:0.2f} s".format(configs_number, time.perf_counter() - start))
+
+        self.__db_manager.checkpoint()
+
+        # The cache is created when the db file is complete, since it is invalidated by changes to the file
+        self.__cache = None
+        if self.__config_manager.USE_CONFIG_REQUEST_CACHE:
+            self.__cache = ConfigRequestCache(self.__config_manager.EXPERIMENT_DB_PATH,
+                                              self.__config_manager.CONFIG_REQUEST_CACHE_PATH)
+
     def get_metric_for_configuration(self, config_request) -> pd.DataFrame and pd.DataFrame:
         """
         This method returns all metrics gathered for a specific configuration of a node
         :config_request: configuration request
         :return: two dataframe, one for node's metrics and another for function's metrics
         """
-        df_node, df_func = self.__db_manager.get_metrics(config_request)
+        cached = self.__cache.get(config_request) if self.__cache is not None else None
+        if cached is not None:
+            df_node, df_func = cached
+        else:
+            if self.__config_manager.USE_MATERIALIZED_CONFIG_METRICS:
+                df_node, df_func = self.__db_manager.get_config_metrics(config_request)
+            else:
+                df_node, df_func = self.__db_manager.get_metrics(config_request)
+            if self.__cache is not None:
+                self.__cache.put(config_request, df_node, df_func)
 
         if df_node.empty and df_func.empty:
             print("Experiment with this type of configuration does not exist in the database...")
 
         return df_node, df_func
 
-    def _parse_file(self, json_file) -> None:
+    def get_cache_stats(self) -> dict:
         """
-        This method parse a json data file and push data on db
+        This method returns the statistics of the cache of the configuration requests
+        :return: dict with hits, disk_hits, misses and hit_rate, None if the cache is disabled
         """
-        # Parse input section
-        # Note: all other data from "input" section are discarded
-        # because replicas and wl can be obtained from single minute metrics
-        node_type = json_file["input"]["node"]
-
-        # Parse output section
-        for idx, exp_instant in enumerate(json_file["output"]):
-            node_ram_usage = json_file["output"][idx]["ram_usage"]
-            node_cpu_usage = json_file["output"][idx]["cpu_usage"]
-
-            if "timestamp" in json_file["output"][idx]:
-                timestamp = json_file["output"][idx]["timestamp"]
-            else:
-                now = datetime.datetime.now()
-                timestamp = datetime.datetime(now.year, now.month, now.day, 0, 0, idx)
-
-            exp_instant_id = self.__db_manager.insert_exp_instant(timestamp, self.__nodes_ids[node_type])
-
-            self.__db_manager.insert_metric(
-                "ram_usage", "node", self.__config_manager.NODES_METRICS_UNIT["ram_usage"],
-                round(node_ram_usage*100, 2), self.__config_manager.NODES_METRICS["ram_usage"],
-                exp_instant_id, node_id=self.__nodes_ids[node_type]
-            )
-            self.__db_manager.insert_metric(
-                "cpu_usage", "node", self.__config_manager.NODES_METRICS_UNIT["cpu_usage"],
-                round(node_cpu_usage * 100, 2), self.__config_manager.NODES_METRICS["cpu_usage"],
-                exp_instant_id, node_id=self.__nodes_ids[node_type]
-            )
-
-            for _, func in enumerate(json_file["output"][idx]["functions"]):
-                func_name = func["name"]
-                if func_name in self.__config_manager.FUNCTION_NAMES:
-                    self.__db_manager.insert_deploy(
-                        exp_instant_id, self.__functions_ids[func_name], func["max_rate"],
-                        func["service_count"], func["invoc_rate"], func["margin"], func["state"]
-                    )
-
-                    for key, value in func.items():
-                        if key != "name" and key not in self.__config_manager.DEPLOY_DATA:
-                            if key in ["ram_xfunc", "cpu_xfunc"]:
-                                value = round(value * 100, 2)
-
-                            self.__db_manager.insert_metric(
-                                key, "func", self.__config_manager.FUNCTION_METRICS_UNIT[key],
-                                value, self.__config_manager.FUNCTION_METRICS[key], exp_instant_id,
-                                function_id=self.__functions_ids[func_name]
-                            )
+        return self.__cache.get_stats() if self.__cache is not None else None
 
     def _load_data(self) -> None:
         """
-        This method read all files in data directory and parse each one of them
+        This method read all files in data directory and parse each one of them.
+        Files are parsed before writing on db (by a pool of processes if DATA_LOADER_PARSE_WORKERS > 1),
+        then the rows of each file are inserted in a single transaction
         """
+        start = time.perf_counter()
+
         data_dir = self.__config_manager.DATA_DIR
+        files_paths = []
         for node_type in self.__config_manager.NODES_TYPE:
             for path, _, files in os.walk(os.path.join(data_dir, node_type)):
                 for config in files:
                     if config.endswith(".json"):
-                        f = open(os.path.join(path, config))
-                        json_doc = json.load(f)  # Return json file as a dictionary
-                        self._parse_file(json_doc)
+                        files_paths.append(os.path.join(path, config))
+
+        workers = self.__config_manager.DATA_LOADER_PARSE_WORKERS
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                parsed_files = list(executor.map(parse_data_file, files_paths))
+        else:
+            parsed_files = [parse_data_file(file_path) for file_path in files_paths]
+
+        rows = 0
+        for node_type, exp_instants in parsed_files:
+            node_id = self.__nodes_ids[node_type]
+            exp_instants_rows = []
+            for timestamp, metrics, deploys in exp_instants:
+                # Node metrics refer to the node, function metrics to the function
+                metrics_rows = [(name, type, unit, val, desc, node_id, None) if func_name is None else
+                                (name, type, unit, val, desc, None, self.__functions_ids[func_name])
+                                for name, type, unit, val, desc, func_name in metrics]
+                deploys_rows = [(self.__functions_ids[func_name], *deploy) for func_name, *deploy in deploys]
+                exp_instants_rows.append((timestamp, metrics_rows, deploys_rows))
+
+            rows += self.__db_manager.insert_exp_instants(node_id, exp_instants_rows)
+
+        execution = time.perf_counter() - start
+        print("Loaded {} rows from {} files in {:0.2f} s ({:0.0f} rows/s)".format(
+            rows, len(files_paths), execution, rows / execution))
 
     def _load_static_data(self) -> None:
         """
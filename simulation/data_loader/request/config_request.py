@@ -3,6 +3,9 @@
 # This file is licensed under the AGPL v3.0 or later license. See LICENSE and
 # AUTHORS file for more information.
 
+import json
+
+
 class ConfigRequest:
     """
     Class that represents a configuration request by the simulator.
@@ -26,5 +29,18 @@ class ConfigRequest:
         """
         return self.__func_requests
 
+    def get_canonical_key(self):
+        """
+        Get a representation of the request that does not depend on the order of the functions,
+        used as key of the metrics of a configuration
+        Integral workloads are represented as integers, as they are stored in the db
+        """
+        functions = sorted(
+            [func.get_name(), func.get_replicas_num(),
+             int(func.get_wl()) if isinstance(func.get_wl(), float) and func.get_wl().is_integer() else func.get_wl()]
+            for func in self.__func_requests
+        )
+        return json.dumps([self.__node_type, functions])
+
     def __str__(self):
         return "Node type: {} -- [ {} ]".format(self.__node_type, self.__func_requests)
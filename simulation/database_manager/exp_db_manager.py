@@ -11,6 +11,7 @@ import pandas as pd
 from pathlib import Path
 from .db_manager import DbManager
 from data_loader.request.config_request import ConfigRequest
+from data_loader.request.function_request import FunctionRequest
 from configuration.config_manager import ConfigManager
 
 
@@ -22,46 +23,76 @@ class ExpDbManager(DbManager):
     """
 
     __config_manager = ConfigManager()
-    __exp_ids_for_func = {}
 
     def __init__(self, db_path) -> None:
         super().__init__(db_path)
 
-    def __execute_insert_create_query(self, query: str):
+        # SQL templates are read from disk only once, indexed by file name without extension
+        self.__queries = {
+            path.stem: path.read_text() for path in Path(self.__config_manager.SQL_FILE_PATH_DIR).glob("*.sql")
+        }
+
+        # Connection shared by all the queries, opened by the first query so that the db file is not created before
+        self.__connection = None
+
+    def __get_connection(self) -> sqlite3.Connection:
         """
-        Method used to execute a generic query
-        :query: string representation of query to be executed
+        Method used to get the connection to the database, opened only once
         """
-        conn = sqlite3.connect(self._DbManager__path)
-        cursor = conn.cursor()
-        cursor.execute(query)
-        conn.commit()
-        return cursor.lastrowid
+        if self.__connection is None:
+            self.__connection = sqlite3.connect(self._DbManager__path)
+        return self.__connection
 
-    def __select_exp_ids_for_func(self):
+    def close(self) -> None:
         """
-        Method used to populate a dict that maps for each function a list of experiment ids that contain this function
+        Close the connection to the database, a new one is opened by the next query
         """
-        for func in self.__config_manager.FUNCTION_NAMES:
-            query = Path(self.__config_manager.SQL_FILE_PATH_DIR.joinpath("select_exp_ids_for_func.sql")).read_text().format(func)
+        if self.__connection is not None:
+            self.__connection.close()
+            self.__connection = None
 
-            conn = sqlite3.connect(self._DbManager__path)
-            c = conn.cursor()
-            c.execute(query)
+    def enable_wal(self) -> None:
+        """
+        Use the write-ahead log as journal of the database, so that each transaction
+        is not synced to disk with its own journal file
+        """
+        conn = self.__get_connection()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
 
-            # Get list of ids for next queries
-            id_list = [str(el[0]) for el in c.fetchall()]
-            self.__exp_ids_for_func[func] = id_list
+    def checkpoint(self) -> None:
+        """
+        Write the transactions of the write-ahead log in the database file,
+        so that the file does not change later when the connection is closed
+        """
+        self.__get_connection().execute("PRAGMA wal_checkpoint(TRUNCATE)")
 
+    def __execute_insert_create_query(self, query: str, params=()):
+        """
+        Method used to execute a generic query
+        :query: string representation of query to be executed
+        :params: values bound to the placeholders of the query
+        """
+        conn = self.__get_connection()
+        cursor = conn.cursor()
+        cursor.execute(query, params)
+        conn.commit()
+        return cursor.lastrowid
 
     def create_tables(self) -> None:
         """ Create tables for experiment database """
-        self.__execute_insert_create_query(Path(self.__config_manager.SQL_FILE_PATH_DIR.joinpath("create_table_node.sql")).read_text())
-        self.__execute_insert_create_query(Path(self.__config_manager.SQL_FILE_PATH_DIR.joinpath("create_table_function_type.sql")).read_text())
-        self.__execute_insert_create_query(Path(self.__config_manager.SQL_FILE_PATH_DIR.joinpath("create_table_function.sql")).read_text())
-        self.__execute_insert_create_query(Path(self.__config_manager.SQL_FILE_PATH_DIR.joinpath("create_table_exp_instant.sql")).read_text())
-        self.__execute_insert_create_query(Path(self.__config_manager.SQL_FILE_PATH_DIR.joinpath("create_table_metric.sql")).read_text())
-        self.__execute_insert_create_query(Path(self.__config_manager.SQL_FILE_PATH_DIR.joinpath("create_table_deploy.sql")).read_text())
+        self.__execute_insert_create_query(self.__queries["create_table_node"])
+        self.__execute_insert_create_query(self.__queries["create_table_function_type"])
+        self.__execute_insert_create_query(self.__queries["create_table_function"])
+        self.__execute_insert_create_query(self.__queries["create_table_exp_instant"])
+        self.__execute_insert_create_query(self.__queries["create_table_metric"])
+        self.__execute_insert_create_query(self.__queries["create_table_deploy"])
+
+    def create_indexes(self) -> None:
+        """ Create indexes used by the config requests, if they do not exist """
+        self.__execute_insert_create_query(self.__queries["create_index_deploy"])
+        self.__execute_insert_create_query(self.__queries["create_index_metric"])
+        self.__execute_insert_create_query(self.__queries["create_index_exp_instant"])
 
     def insert_node(self, name: str, ram: float, cpu: float) -> int:
         """
@@ -72,7 +103,7 @@ class ExpDbManager(DbManager):
         :return: last inserted id
         """
         last_id = self.__execute_insert_create_query(
-            Path(self.__config_manager.SQL_FILE_PATH_DIR.joinpath("insert_node.sql")).read_text().format(name, ram, cpu)
+            self.__queries["insert_node"], (name, ram, cpu)
         )
         return last_id
 
@@ -84,7 +115,7 @@ class ExpDbManager(DbManager):
         :return: last inserted id
         """
         last_id = self.__execute_insert_create_query(
-            Path(self.__config_manager.SQL_FILE_PATH_DIR.joinpath("insert_function.sql")).read_text().format(name, description)
+            self.__queries["insert_function"], (name, description)
         )
         return last_id
 
@@ -96,7 +127,7 @@ class ExpDbManager(DbManager):
         :return: last inserted id
         """
         last_id = self.__execute_insert_create_query(
-            Path(self.__config_manager.SQL_FILE_PATH_DIR.joinpath("insert_exp_instant.sql")).read_text().format(ts, node_id)
+            self.__queries["insert_exp_instant"], (str(ts), node_id)
         )
         return last_id
 
@@ -116,11 +147,11 @@ class ExpDbManager(DbManager):
         """
         if function_id is not None and node_id is None:
             last_id = self.__execute_insert_create_query(
-                Path(self.__config_manager.SQL_FILE_PATH_DIR.joinpath("insert_metric_func.sql")).read_text().format(name, type, unit, val, desc, exp_instant_id, function_id)
+                self.__queries["insert_metric_func"], (name, type, unit, val, desc, exp_instant_id, function_id)
             )
         elif node_id is not None and function_id is None:
             last_id = self.__execute_insert_create_query(
-                Path(self.__config_manager.SQL_FILE_PATH_DIR.joinpath("insert_metric_node.sql")).read_text().format(name, type, unit, val, desc, exp_instant_id, node_id)
+                self.__queries["insert_metric_node"], (name, type, unit, val, desc, exp_instant_id, node_id)
             )
         else:
             print("Params function_id and node_id cannot be both not None")
@@ -140,10 +171,105 @@ class ExpDbManager(DbManager):
         :state: state ("Overloaded", "Underloaded") for this function deployed in this experiment instant
         """
         last_id = self.__execute_insert_create_query(
-            Path(self.__config_manager.SQL_FILE_PATH_DIR.joinpath("insert_deploy.sql")).read_text().format(exp_instant_id, function_id, max_rate, num_replicas, wl, margin, state)
+            self.__queries["insert_deploy"], (exp_instant_id, function_id, max_rate, num_replicas, wl, margin, state)
         )
         return last_id
 
+    def insert_exp_instants(self, node_id: int, exp_instants: list) -> int:
+        """
+        Insert experiment instants, with their metrics and deploys, in a single transaction
+        :node_id: id of the node which experiment instants are related to
+        :exp_instants: list of tuples (ts, metrics, deploys), where metrics are tuples
+                       (name, type, unit, val, desc, node_id, function_id) and deploys are tuples
+                       (function_id, max_rate, num_replicas, wl, margin, state)
+        :return: number of inserted rows
+        """
+        conn = self.__get_connection()
+        metrics = []
+        deploys = []
+
+        # Committed at the end of the block, or rolled back if an insert fails
+        with conn:
+            for ts, instant_metrics, instant_deploys in exp_instants:
+                exp_instant_id = conn.execute(self.__queries["insert_exp_instant"], (str(ts), node_id)).lastrowid
+                metrics.extend((name, type, unit, val, desc, exp_instant_id, metric_node_id, function_id)
+                               for name, type, unit, val, desc, metric_node_id, function_id in instant_metrics)
+                deploys.extend((exp_instant_id, *deploy) for deploy in instant_deploys)
+
+            # Rows are inserted in the same order of the single inserts, so they get the same ids
+            conn.executemany(self.__queries["insert_metric"], metrics)
+            conn.executemany(self.__queries["insert_deploy"], deploys)
+
+        return len(exp_instants) + len(metrics) + len(deploys)
+
+    def has_config_metrics(self) -> bool:
+        """
+        Check if the metrics of the configurations have been materialized in CONFIG_METRIC table
+        """
+        row = self.__get_connection().execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'CONFIG_METRIC'"
+        ).fetchone()
+        return row is not None
+
+    def materialize_config_metrics(self) -> int:
+        """
+        Compute the metrics of every configuration deployed in the experiment instants and store them
+        in CONFIG_METRIC table, so that a configuration request is answered by a primary key lookup.
+        An experiment instant is selected by a configuration request only if it deploys exactly
+        the requested functions, with the requested replicas and workload, so the configurations
+        of the experiment instants are all the requests with some metrics
+        :return: number of materialized configurations
+        """
+        conn = self.__get_connection()
+
+        # Configuration deployed in each experiment instant
+        instants_configs = {}
+        for exp_instant_id, node_name, func_name, replicas, wl in conn.execute(self.__queries["select_instants_deploys"]):
+            instants_configs.setdefault(exp_instant_id, ConfigRequest(node_name, [])).get_functions().append(
+                FunctionRequest(func_name, replicas, wl)
+            )
+        instants_keys = [(exp_instant_id, config.get_canonical_key()) for exp_instant_id, config in instants_configs.items()]
+
+        # Metrics are aggregated as in get_metrics, grouping also by configuration
+        with conn:
+            conn.execute(self.__queries["create_table_config_metric"])
+            conn.execute(self.__queries["create_table_instant_config"])
+            conn.executemany(self.__queries["insert_instant_config"], instants_keys)
+            conn.execute(self.__queries["insert_config_metrics"])
+            conn.execute("DROP TABLE `INSTANT_CONFIG`")
+
+        return len(set(key for _, key in instants_keys))
+
+    def get_config_metrics(self, conf_request: ConfigRequest) -> pd.DataFrame and pd.DataFrame:
+        """
+        Method used to get metrics related to a specific configuration request from CONFIG_METRIC table,
+        with the same result of get_metrics
+        :conf_request: configuration request
+        :return: two dataframe, one for node's metrics and another for function's metrics
+        """
+        c = self.__get_connection().cursor()
+        c.execute(self.__queries["select_config_metrics"], (conf_request.get_canonical_key(),))
+        return self.__build_metrics_dataframes(c.fetchall())
+
+    def __build_metrics_dataframes(self, rows) -> pd.DataFrame and pd.DataFrame:
+        """
+        Method used to split the aggregated metrics of a configuration in node's and function's metrics
+        :rows: rows of the aggregated metrics
+        :return: two dataframe, one for node's metrics and another for function's metrics
+        """
+        df = pd.DataFrame(rows,
+                          columns=["MetricName", "Type", "FunctionName", "NodeName",
+                                   "AVG(Value)", "MaxRate", "NumReplicas", "Margin", "State"])
+
+        df_node_metrics = df[df["Type"] == "node"].drop(columns=["FunctionName", "MaxRate",
+                                                                 "NumReplicas", "Margin", "State"])
+        df_func_metrics = df[df["Type"] == "func"].drop(columns=["NodeName"])
+
+        for col in ["MaxRate", "NumReplicas", "Margin"]:
+            df_func_metrics[col] = df_func_metrics[col].astype(int)
+
+        return df_node_metrics, df_func_metrics
+
     # TODO: delete this method
     def select_example(self):
         """
@@ -158,8 +284,7 @@ class ExpDbManager(DbManager):
 
         start = time.perf_counter()
 
-        conn = sqlite3.connect(self._DbManager__path)
-        c = conn.cursor()
+        c = self.__get_connection().cursor()
 
         c.execute('''
                 SELECT e.ID
@@ -229,8 +354,7 @@ class ExpDbManager(DbManager):
         #   1) Selezione delle funzioni che hanno quella determinata ConfigRequets e count = 2
         #   2) Selezione di tutti gli exp ID che comprendono anche funca
         #   3) Rimozione degli ID dai primi che contengono ancge funca e selezione delle metriche con ID rimasti
-        conn = sqlite3.connect(self._DbManager__path)
-        c = conn.cursor()
+        c = self.__get_connection().cursor()
 
         c.execute('''
                     SELECT e.ID
@@ -304,65 +428,36 @@ class ExpDbManager(DbManager):
         :return: two dataframe, one for node's metrics and another for function's metrics
         """
 
-        if not self.__exp_ids_for_func:
-            self.__select_exp_ids_for_func()
-
         func_count = len(conf_request.get_functions())
         node_type = conf_request.get_node_type()
+        func_names = [func_req.get_name() for func_req in conf_request.get_functions()]
 
-        # Select experiment IDs for this specific config request
-        where_condition = "( n.Name = '{}' ) ".format(node_type)
+        # Experiment instants of this specific config request are selected by a subquery:
+        #   instants that have the "func_count" requested functions with the requested workload and replicas,
+        #   excluding (NOT EXISTS) instants that also deploy functions not included in the ConfigRequest
+        # Only the structure of the conditions depends on the request, the values are bound as parameters
+        where_condition = "( n.Name = ? ) "
+        params = [node_type]
 
         if func_count > 0:
             where_condition += "AND ( "
-
-            for idx, func_req in enumerate(conf_request.get_functions()):
-                where_condition += "(       \
-                    f.Name = '{}'      AND \
-                    d.Workload = {}    AND \
-                    d.NumReplicas = {}     \
-                )".format(func_req.get_name(), func_req.get_wl(), func_req.get_replicas_num())
-
-                if idx != func_count - 1:
-                    where_condition += " OR "
-
+            where_condition += " OR ".join(["( f.Name = ? AND d.Workload = ? AND d.NumReplicas = ? )"] * func_count)
             where_condition += ")"
 
-        query = Path(self.__config_manager.SQL_FILE_PATH_DIR.joinpath(
-                     "select_exp_id_for_config.sql")).read_text().format(where_condition, func_count)
-
-        conn = sqlite3.connect(self._DbManager__path)
-        c = conn.cursor()
-        c.execute(query)
+            for func_req in conf_request.get_functions():
+                params.extend([func_req.get_name(), func_req.get_wl(), func_req.get_replicas_num()])
 
-        # Get list of ids for next queries
-        experiments_id_list = [str(el[0]) for el in c.fetchall()]
-
-        # Up to this point there is a tricky problem:
-        #   Selected IDs are referred to experiment instants that has "func_count" or more deployed functions
-        #   Filtering for HAVING COUNT() == 2 does not exclude exp IDs with more functions deployed
-        # Solution: exclude experiments id's referred to functions not included in the ConfigRequest
-        for func in self.__config_manager.FUNCTION_NAMES:
-            if func not in [f.get_name() for f in conf_request.get_functions()]:
-                experiments_id_list = [el for el in experiments_id_list if el not in self.__exp_ids_for_func[func]]
+        params.extend(func_names)
+        params.append(func_count)
+        query = self.__queries["select_metrics_for_config"].format(where_condition, ",".join(["?"] * len(func_names)))
 
         # Select all metrics for this specific config request
-        query = Path(self.__config_manager.SQL_FILE_PATH_DIR.joinpath(
-                     "select_metrics_by_exp_ids.sql")).read_text().format(",".join(experiments_id_list))
-        c.execute(query)
+        c = self.__get_connection().cursor()
+        c.execute(query, params)
 
-        print("Metrics for Experiments {}".format(experiments_id_list))
+        print("Metrics for configuration {}".format(conf_request))
         print("------------------------------------------------------------------------------")
-        df = pd.DataFrame(c.fetchall(),
-                          columns=["MetricName", "Type", "FunctionName", "NodeName",
-                                   "AVG(Value)", "MaxRate", "NumReplicas", "Margin", "State"])
-
-        df_node_metrics = df[df["Type"] == "node"].drop(columns=["FunctionName", "MaxRate",
-                                                                 "NumReplicas", "Margin", "State"])
-        df_func_metrics = df[df["Type"] == "func"].drop(columns=["NodeName"])
-
-        for col in ["MaxRate", "NumReplicas", "Margin"]:
-            df_func_metrics[col] = df_func_metrics[col].astype(int)
+        df_node_metrics, df_func_metrics = self.__build_metrics_dataframes(c.fetchall())
 
         print(df_node_metrics)
         print("------------------------------------------------------------------------------")
@@ -0,0 +1 @@
+CREATE INDEX IF NOT EXISTS `DeployConfigIndex` ON `DEPLOY` (`FunctionID`, `Workload`, `NumReplicas`, `ExpInstantID`);
\ No newline at end of file
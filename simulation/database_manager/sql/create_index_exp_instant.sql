@@ -0,0 +1 @@
+CREATE INDEX IF NOT EXISTS `ExpInstantNodeIndex` ON `EXPERIMENT_INSTANT` (`NodeID`);
\ No newline at end of file
@@ -0,0 +1 @@
+CREATE INDEX IF NOT EXISTS `MetricExpInstantIndex` ON `METRIC` (`ExpInstantID`);
\ No newline at end of file
@@ -0,0 +1,14 @@
+CREATE TABLE IF NOT EXISTS `CONFIG_METRIC` (
+    `ConfigKey` TEXT NOT NULL,
+    `RowNumber` INTEGER NOT NULL,
+    `MetricName` TEXT NOT NULL,
+    `Type` TEXT NOT NULL,
+    `FunctionName` TEXT NULL,
+    `NodeName` TEXT NULL,
+    `AvgValue` REAL NULL,
+    `MaxRate` INTEGER NULL,
+    `NumReplicas` INTEGER NULL,
+    `Margin` INTEGER NULL,
+    `State` TEXT NULL,
+        PRIMARY KEY(`ConfigKey`, `RowNumber`)
+) WITHOUT ROWID;
\ No newline at end of file
@@ -0,0 +1,4 @@
+CREATE TEMP TABLE IF NOT EXISTS `INSTANT_CONFIG` (
+    `ExpInstantID` INTEGER NOT NULL PRIMARY KEY,
+    `ConfigKey` TEXT NOT NULL
+);
\ No newline at end of file
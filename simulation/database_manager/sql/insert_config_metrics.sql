@@ -0,0 +1,12 @@
+INSERT INTO `CONFIG_METRIC`
+SELECT ic.ConfigKey,
+       ROW_NUMBER() OVER (PARTITION BY ic.ConfigKey
+                          ORDER BY m.Name, m.type, f.Name, n.Name, d.MaxRate, d.NumReplicas, d.Margin, d.State),
+       m.Name, m.type, f.Name, n.Name, AVG(m.Value), d.MaxRate, d.NumReplicas, d.Margin, d.State
+FROM METRIC m
+JOIN INSTANT_CONFIG  ic ON m.ExpInstantID = ic.ExpInstantID
+LEFT JOIN FUNCTION   f ON m.FunctionID = f.ID
+LEFT JOIN NODE       n ON m.NodeID = n.ID
+LEFT JOIN DEPLOY     d ON m.ExpInstantID = d.ExpInstantID and
+                          f.ID = d.FunctionID
+GROUP BY ic.ConfigKey, m.Name, m.type, f.Name, n.Name, d.MaxRate, d.NumReplicas, d.Margin, d.State
\ No newline at end of file
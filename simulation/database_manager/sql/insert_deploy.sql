@@ -1,2 +1,2 @@
 INSERT INTO `DEPLOY` ( `ExpInstantID`, `FunctionID`, `MaxRate`, `NumReplicas`, `Workload`, `Margin`, `State` )
-VALUES ( {}, {}, {}, {}, {}, {}, "{}");
\ No newline at end of file
+VALUES ( ?, ?, ?, ?, ?, ?, ?);
\ No newline at end of file
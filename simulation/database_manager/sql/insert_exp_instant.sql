@@ -1,2 +1,2 @@
 INSERT INTO `EXPERIMENT_INSTANT`( `Timestamp`, `NodeID` )
-VALUES ( "{}", {} );
\ No newline at end of file
+VALUES ( ?, ? );
\ No newline at end of file
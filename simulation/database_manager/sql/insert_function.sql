@@ -1,2 +1,2 @@
 INSERT INTO `FUNCTION` ( `Name`, `Description`)
-VALUES ( "{}", "{}" );
\ No newline at end of file
+VALUES ( ?, ? );
\ No newline at end of file
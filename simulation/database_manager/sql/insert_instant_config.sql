@@ -0,0 +1,2 @@
+INSERT INTO `INSTANT_CONFIG` ( `ExpInstantID`, `ConfigKey` )
+VALUES ( ?, ? );
\ No newline at end of file
@@ -0,0 +1,2 @@
+INSERT INTO `METRIC` ( `Name`, `Type`, `Unit`, `Value`, `Description`, `ExpInstantID`, `NodeID`, `FunctionID`)
+VALUES ( ?, ?, ?, ?, ?, ?, ?, ?);
\ No newline at end of file
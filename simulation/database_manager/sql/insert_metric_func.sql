@@ -1,2 +1,2 @@
 INSERT INTO `METRIC` ( `Name`, `Type`, `Unit`, `Value`, `Description`, `ExpInstantID`, `FunctionID`)
-VALUES ( "{}", "{}", "{}", {}, "{}", {}, {});
\ No newline at end of file
+VALUES ( ?, ?, ?, ?, ?, ?, ?);
\ No newline at end of file
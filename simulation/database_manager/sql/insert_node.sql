@@ -1,2 +1,2 @@
 INSERT INTO `NODE` (`Name`, `Ram`, `Cpu`)
-VALUES ( "{}", {}, {} );
\ No newline at end of file
+VALUES ( ?, ?, ? );
\ No newline at end of file
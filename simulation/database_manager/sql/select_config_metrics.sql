@@ -0,0 +1,4 @@
+SELECT `MetricName`, `Type`, `FunctionName`, `NodeName`, `AvgValue`, `MaxRate`, `NumReplicas`, `Margin`, `State`
+FROM `CONFIG_METRIC`
+WHERE `ConfigKey` = ?
+ORDER BY `RowNumber`
\ No newline at end of file
@@ -1,4 +0,0 @@
-SELECT d.ExpInstantID
-FROM DEPLOY     d
-JOIN FUNCTION   f ON d.FunctionID = f.ID
-WHERE f.Name = "{}"
\ No newline at end of file
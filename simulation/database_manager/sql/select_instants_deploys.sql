@@ -0,0 +1,6 @@
+SELECT e.ID, n.Name, f.Name, d.NumReplicas, d.Workload
+FROM EXPERIMENT_INSTANT e
+JOIN NODE               n ON n.ID = e.NodeID
+JOIN DEPLOY             d ON e.ID = d.ExpInstantID
+JOIN FUNCTION           f ON d.FunctionID = f.ID
+ORDER BY e.ID, f.Name
\ No newline at end of file
@@ -0,0 +1,23 @@
+SELECT m.Name, m.type, f.Name, n.Name, AVG(m.Value), d.MaxRate, d.NumReplicas, d.Margin, d.State
+FROM METRIC m
+LEFT JOIN FUNCTION   f ON m.FunctionID = f.ID
+LEFT JOIN NODE       n ON m.NodeID = n.ID
+LEFT JOIN DEPLOY     d ON m.ExpInstantID = d.ExpInstantID and
+                          f.ID = d.FunctionID
+WHERE m.ExpInstantID IN (
+    SELECT e.ID
+    FROM NODE n
+    JOIN EXPERIMENT_INSTANT e ON n.ID = e.NodeID
+    JOIN DEPLOY             d ON e.ID = d.ExpInstantID
+    JOIN FUNCTION           f ON d.FunctionID = f.ID
+    WHERE {} AND
+    NOT EXISTS (
+        SELECT 1
+        FROM DEPLOY     xd
+        JOIN FUNCTION   xf ON xd.FunctionID = xf.ID
+        WHERE xd.ExpInstantID = e.ID AND xf.Name NOT IN ({})
+    )
+    GROUP BY e.ID
+    HAVING COUNT(f.Name) = ?
+)
+GROUP BY m.Name, m.type, f.Name, n.Name, d.MaxRate, d.NumReplicas, d.Margin, d.State
\ No newline at end of file
@@ -9,6 +9,7 @@ import networkx as nx
 import random
 import matplotlib.pyplot as plt
 import numpy as np
+import math
 from cli.cli import get_args
 from itertools import combinations, groupby
 from configuration.config_manager import ConfigManager
@@ -118,6 +119,185 @@ def gnp_random_connected_graph(n, p):
     return G
 
 
+def fast_gnp_random_connected_graph(n, p, rng):
+    """
+    Generates a random connected graph with the same distribution of gnp_random_connected_graph
+    in O(N + E): each node is linked to a random node that follows it, and the pairs of nodes
+    linked with probability p are reached with geometric jumps, instead of testing each pair
+    """
+    keys = [el[0] for el in n]
+    nodes_number = len(keys)
+    G = nx.Graph()
+    G.add_nodes_from(n)
+    if p <= 0:
+        return G
+    if p >= 1:
+        return nx.complete_graph(n, create_using=G)
+
+    # Random edge from each node towards one of the following nodes
+    sources = np.arange(0, nodes_number - 1, dtype=np.int64)
+    forced_targets = rng.integers(sources + 1, nodes_number)
+
+    # Pairs (i, j) with i < j are numbered in row-major order, and the gap between two linked pairs is geometric
+    pairs_number = nodes_number * (nodes_number - 1) // 2
+    batch_size = max(1024, int(pairs_number * p * 1.1))
+    linked_pairs = []
+    last_pair = -1
+    while last_pair < pairs_number:
+        positions = last_pair + np.cumsum(rng.geometric(p, size=batch_size))
+        linked_pairs.append(positions[positions < pairs_number])
+        last_pair = positions[-1]
+    linked_pairs = np.concatenate(linked_pairs)
+
+    # Row i of the pairs starts at i * (2N - i - 1) / 2
+    rows_offsets = sources * (2 * nodes_number - sources - 1) // 2
+    rows = np.searchsorted(rows_offsets, linked_pairs, side="right") - 1
+    columns = linked_pairs - rows_offsets[rows] + rows + 1
+
+    edges = np.concatenate([np.column_stack([sources, forced_targets]), np.column_stack([rows, columns])])
+    add_edges(G, keys, edges)
+    return G
+
+def random_geometric_connected_graph(n, p, rng):
+    """
+    Generates a random geometric graph: nodes are placed uniformly in the unit square, where the
+    distance represents the latency, and linked when closer than a radius that gives about the same
+    mean degree of a gnp graph with probability p. Each disconnected component is linked to the
+    nearest node of the largest one
+    """
+    keys = [el[0] for el in n]
+    nodes_number = len(keys)
+    G = nx.Graph()
+    G.add_nodes_from(n)
+    if p <= 0 or nodes_number < 2:
+        return G
+    if p >= 1:
+        return nx.complete_graph(n, create_using=G)
+
+    points = rng.random((nodes_number, 2))
+    radius = math.sqrt(p * (nodes_number - 1) / (nodes_number * math.pi))
+    sources, targets, _ = close_pairs(points, radius)
+    add_edges(G, keys, np.column_stack([sources, targets]))
+    connect_components(G, keys, points)
+    return G
+
+def knn_connected_graph(n, p, rng):
+    """
+    Generates a k-nearest neighbours graph: nodes are placed uniformly in the unit square, where the
+    distance represents the latency, and each node is linked to the k = p * (N - 1) nearest ones.
+    Each disconnected component is linked to the nearest node of the largest one
+    """
+    keys = [el[0] for el in n]
+    nodes_number = len(keys)
+    G = nx.Graph()
+    G.add_nodes_from(n)
+    if p <= 0 or nodes_number < 2:
+        return G
+    if p >= 1:
+        return nx.complete_graph(n, create_using=G)
+
+    k = min(nodes_number - 1, max(1, round(p * (nodes_number - 1))))
+    points = rng.random((nodes_number, 2))
+
+    # Candidates are the nodes in a radius that contains about 4k nodes
+    sources, targets, distances = close_pairs(points, math.sqrt(4 * k / (nodes_number * math.pi)))
+    sources, targets = np.concatenate([sources, targets]), np.concatenate([targets, sources])
+    distances = np.concatenate([distances, distances])
+
+    # Keep the k nearest candidates of each node
+    order = np.lexsort((targets, distances, sources))
+    sources, targets = sources[order], targets[order]
+    candidates_number = np.bincount(sources, minlength=nodes_number)
+    rank = np.arange(0, len(sources)) - np.repeat(np.cumsum(candidates_number) - candidates_number, candidates_number)
+    edges = [np.column_stack([sources[rank < k], targets[rank < k]])]
+
+    # The few nodes with less than k candidates are compared with all the others
+    for node in np.nonzero(candidates_number < k)[0]:
+        node_distances = np.hypot(*(points - points[node]).T)
+        node_distances[node] = np.inf
+        nearest = np.argsort(node_distances, kind="stable")[:k]
+        edges.append(np.column_stack([np.full(k, node), nearest]))
+
+    add_edges(G, keys, np.concatenate(edges))
+    connect_components(G, keys, points)
+    return G
+
+def close_pairs(points, radius):
+    """
+    Find the pairs of points closer than radius, comparing only the points in the same or in
+    adjacent cells of a grid with side radius
+    Returns the indexes of the two points of each pair and their distance
+    """
+    cells_per_side = max(1, int(math.ceil(1 / radius)))
+    cells = np.minimum((points / radius).astype(np.int64), cells_per_side - 1)
+    cells_ids = cells[:, 0] * cells_per_side + cells[:, 1]
+    order = np.argsort(cells_ids, kind="stable")
+    sorted_cells_ids = cells_ids[order]
+
+    sources, targets = [], []
+    # Half of the adjacent cells, so that each pair of cells is compared only once
+    for dx, dy in [(0, 0), (0, 1), (1, -1), (1, 0), (1, 1)]:
+        neigh_x, neigh_y = cells[:, 0] + dx, cells[:, 1] + dy
+        valid = (neigh_x < cells_per_side) & (neigh_y >= 0) & (neigh_y < cells_per_side)
+        neigh_ids = neigh_x * cells_per_side + neigh_y
+        starts = np.searchsorted(sorted_cells_ids, neigh_ids, side="left")
+        counts = np.where(valid, np.searchsorted(sorted_cells_ids, neigh_ids, side="right") - starts, 0)
+
+        cell_sources = np.repeat(np.arange(0, len(points)), counts)
+        offsets = np.arange(0, counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        cell_targets = order[np.repeat(starts, counts) + offsets]
+        if dx == 0 and dy == 0:
+            same_cell = cell_sources < cell_targets
+            cell_sources, cell_targets = cell_sources[same_cell], cell_targets[same_cell]
+        sources.append(cell_sources)
+        targets.append(cell_targets)
+
+    sources, targets = np.concatenate(sources), np.concatenate(targets)
+    distances = np.hypot(*(points[sources] - points[targets]).T)
+    close = distances <= radius
+    return sources[close], targets[close], distances[close]
+
+def connect_components(G, keys, points):
+    """
+    Link each connected component of the graph to the nearest node of the largest component
+    """
+    indexes = {key: i for i, key in enumerate(keys)}
+    components = sorted((sorted(indexes[key] for key in component) for component in nx.connected_components(G)),
+                        key=len, reverse=True)
+    main_component = np.array(components[0])
+    for component in components[1:]:
+        best = None
+        for node in component:
+            distances = np.hypot(*(points[main_component] - points[node]).T)
+            nearest = np.argmin(distances)
+            if best is None or distances[nearest] < best[0]:
+                best = (distances[nearest], node, main_component[nearest])
+        G.add_edge(keys[best[1]], keys[best[2]])
+        main_component = np.concatenate([main_component, component])
+
+def add_edges(G, keys, edges):
+    """
+    Add to the graph the edges passed as pairs of node indexes, without duplicates and in sorted order
+    """
+    edges = np.unique(np.sort(edges, axis=1), axis=0)
+    G.add_edges_from((keys[i], keys[j]) for i, j in edges.tolist())
+
+def generate_graph(n, p, topology, seed):
+    """
+    Generate the graph of the nodes with the selected topology
+    The legacy "gnp" generator uses the random module, the others a NumPy generator with the passed seed
+    """
+    if topology == "gnp":
+        return gnp_random_connected_graph(n, p)
+    rng = np.random.default_rng(seed)
+    if topology == "fast_gnp":
+        return fast_gnp_random_connected_graph(n, p, rng)
+    if topology == "geometric":
+        return random_geometric_connected_graph(n, p, rng)
+    if topology == "knn":
+        return knn_connected_graph(n, p, rng)
+    raise Exception("Topology {} is not supported".format(topology))
+
 def plot_graph(G):
     """
     Plot graph and export on file
@@ -222,7 +402,7 @@ def main():
         key = config_manager.NODE_KEY_PREFIX + str(i)
         nodes.append((key, {"config": config}))
 
-    G = gnp_random_connected_graph(nodes, probability)
+    G = generate_graph(nodes, probability, kargs["topology"], seed)
 
     # Export an image of graph
     plot_graph(G)
@@ -329,6 +329,11 @@ def simulation(nodes_number, config_file):
 
         print("> END MINUTE {}".format(minute))
 
+    cache_stats = dl.get_cache_stats()
+    if cache_stats is not None:
+        print("> CONFIG REQUEST CACHE: {} hits ({} from disk), {} misses, hit rate {:0.1f}%".format(
+            cache_stats["hits"], cache_stats["disk_hits"], cache_stats["misses"], cache_stats["hit_rate"]))
+
     return {k: np.mean(times_for_algo) for k, times_for_algo in execution_times.items()}
 
 